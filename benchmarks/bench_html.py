@@ -0,0 +1,70 @@
+"""HTML-to-text throughput: parsers.html_to_text vs the BeautifulSoup path.
+
+The BeautifulSoup baseline is what the sources did before: build a tree per
+description, get_text, then normalize_posting's whitespace regex.
+
+Run with:
+    python -m benchmarks.bench_html [--postings N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from src.parsers import CLEAN_RE, html_to_text
+
+SECTIONS = ["About the team", "What you'll do", "What we're looking for", "Nice to have", "Benefits"]
+BULLETS = [
+    "Design and operate batch and streaming pipelines in <b>Python</b> and <b>SQL</b>",
+    "Own our <a href=\"https://example.com/dbt\">dbt</a> models &amp; Airflow DAGs",
+    "Partner with analysts on Power&nbsp;BI and Tableau dashboards",
+    "Experience with Spark, Kafka or Databricks on AWS/GCP",
+    "Ship LLM &amp; RAG prototypes with LangChain",
+    "Competitive salary, equity &amp; 401(k) matching",
+    "Remote-friendly &mdash; we hire across North America",
+]
+
+def lever_description(rng: random.Random) -> str:
+    """A Lever-style description: headed sections of paragraphs and bullet lists."""
+    parts = ["<div>"]
+    for title in rng.sample(SECTIONS, k=rng.randint(3, len(SECTIONS))):
+        parts.append(f"<div><h3>{title}</h3></div>")
+        parts.append("<div><span style=\"font-size: 11pt\">"
+                     + " ".join(rng.choice(BULLETS) for _ in range(2)) + "</span></div>")
+        parts.append("<ul>" + "".join(f"<li>{rng.choice(BULLETS)}</li>"
+                                      for _ in range(rng.randint(3, 8))) + "</ul>")
+        parts.append("<div><br></div>")
+    parts.append("</div>")
+    return "\n".join(parts)
+
+def bs4_text(html: str) -> str:
+    text = BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
+    return CLEAN_RE.sub(" ", text).strip()
+
+def _time(fn, docs: List[str]) -> float:
+    start = time.perf_counter()
+    for d in docs:
+        fn(d)
+    return time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--postings", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    docs = [lever_description(rng) for _ in range(args.postings)]
+    assert all(html_to_text(d) == bs4_text(d) for d in docs)
+
+    slow = _time(bs4_text, docs)
+    fast = _time(html_to_text, docs)
+    kib = sum(len(d) for d in docs) / 1024
+    print(f"{args.postings} descriptions, {kib:.0f} KiB of HTML (outputs identical)")
+    print(f"  beautifulsoup : {args.postings / slow:8.0f} postings/s")
+    print(f"  html_to_text  : {args.postings / fast:8.0f} postings/s  ({slow / fast:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of the single-pass SkillMatcher vs the per-skill regex loop.
+
+Run with:
+    python -m benchmarks.bench_skills [--postings N] [--skills N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import re
+import time
+from typing import List
+
+from src.skills import CANONICAL_SKILLS, SkillMatcher
+from .synthetic import FILLER
+
+def legacy_extract_skills(text: str, whitelist: List[str]) -> List[str]:
+    """The previous implementation: one regex search per skill."""
+    found = []
+    for s in whitelist:
+        pat = re.compile(rf"\b{re.escape(s)}\b", re.IGNORECASE)
+        if pat.search(text):
+            found.append(s.lower())
+    return sorted(set(found))
+
+def make_skills(n: int) -> List[str]:
+    extra = [f"tool{i}" for i in range(max(0, n - len(CANONICAL_SKILLS)))]
+    return (CANONICAL_SKILLS + extra)[:n]
+
+def make_postings(n: int, skills: List[str], words: int = 400, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        toks = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(2, 8)):
+            toks[rng.randrange(words)] = rng.choice(skills).title()
+        out.append(" ".join(toks))
+    return out
+
+def _time(fn, texts: List[str]) -> float:
+    start = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--postings", type=int, default=2000)
+    ap.add_argument("--skills", type=int, default=300)
+    args = ap.parse_args()
+
+    skills = make_skills(args.skills)
+    texts = make_postings(args.postings, skills)
+    matcher = SkillMatcher(skills, aliases={})
+
+    assert all(matcher.find(t) == legacy_extract_skills(t, skills) for t in texts[:200])
+
+    legacy = _time(lambda t: legacy_extract_skills(t, skills), texts)
+    fast = _time(matcher.find, texts)
+    print(f"{args.postings} postings x {len(skills)} skills")
+    print(f"  legacy  : {args.postings / legacy:10.0f} postings/s")
+    print(f"  matcher : {args.postings / fast:10.0f} postings/s  ({legacy / fast:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Benchmark suite: timed scenarios over synthetic postings and a local stub of
+the Lever / Greenhouse APIs, written to a JSON results file so runs can be
+compared.
+
+Run with:
+    python -m benchmarks.run [--postings N] [--only extract_skills,fetch_lever]
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from src.parsers import normalize_posting
+from src.skills import CANONICAL_SKILLS, extract_skills
+from src.sources.greenhouse import GreenhouseSource
+from src.sources.http import HttpClient
+from src.sources.lever import LeverSource
+from src.storage import append_rows
+
+from .stub_boards import StubBoards
+from .synthetic import SyntheticPostings
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+@dataclass
+class Context:
+    args: argparse.Namespace
+    postings: SyntheticPostings
+    stub: StubBoards
+    tmp: str
+
+# name -> setup(ctx) returning the timed callable. The callable returns the
+# number of items processed, or (items, extra stats); an extra "seconds"
+# replaces the measured time when only part of the call should count.
+SCENARIOS: Dict[str, Callable[[Context], Callable[[], object]]] = {}
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+@scenario("extract_skills")
+def _extract_skills(ctx: Context):
+    texts = [ctx.postings.text(i) for i in range(ctx.args.postings)]
+    skills = list(ctx.postings.skills)
+
+    def run():
+        for t in texts:
+            extract_skills(t, whitelist=skills)
+        return len(texts)
+    return run
+
+@scenario("normalize_posting")
+def _normalize_posting(ctx: Context):
+    raws = [ctx.postings.raw(i) for i in range(ctx.args.postings)]
+
+    def run():
+        for raw in raws:
+            normalize_posting(raw)
+        return len(raws)
+    return run
+
+def _fetch(ctx: Context, make_source: Callable[[HttpClient], object]):
+    def run():
+        served, throttled = len(ctx.stub.requests), ctx.stub.throttled
+        client = HttpClient(concurrency=ctx.args.concurrency, min_interval=0, backoff=0.01)
+        try:
+            n = sum(1 for _ in make_source(client).fetch())
+        finally:
+            client.close()
+        expected = ctx.args.boards * ctx.args.jobs_per_board
+        return n, {"requests": len(ctx.stub.requests) - served,
+                   "throttled": ctx.stub.throttled - throttled, "missing": expected - n}
+    return run
+
+def _boards(ctx: Context) -> List[str]:
+    return [f"board{i}" for i in range(ctx.args.boards)]
+
+@scenario("discover_terms")
+def _discover_terms(ctx: Context):
+    from src.discovery import Discovery
+    rows = [{"source": "bench", "url": f"u{i}", "fetched_at": "2024-01-01T00:00:00+00:00",
+             "text": ctx.postings.text(i)} for i in range(ctx.args.postings)]
+
+    def run():
+        discovery = Discovery(":memory:")
+        n = discovery.add(rows)
+        discovery.close()
+        return n
+    return run
+
+@scenario("fetch_lever")
+def _fetch_lever(ctx: Context):
+    def make(client):
+        source = LeverSource(_boards(ctx), client=client)
+        source.API_URL = ctx.stub.url + "/v0/postings/{company}?mode=json"
+        return source
+    return _fetch(ctx, make)
+
+@scenario("fetch_greenhouse")
+def _fetch_greenhouse(ctx: Context):
+    def make(client):
+        source = GreenhouseSource(_boards(ctx), client=client, content="bulk")
+        source.API_URL = ctx.stub.url + "/v1/boards/{token}/jobs"
+        return source
+    return _fetch(ctx, make)
+
+@scenario("append_rows")
+def _append_rows(ctx: Context):
+    rows = ctx.postings.rows(ctx.args.postings)
+    path = os.path.join(ctx.tmp, "append.csv")
+
+    def run():
+        if os.path.exists(path):
+            os.remove(path)
+        append_rows(path, rows)
+        return len(rows)
+    return run
+
+def _jobs_csv(ctx: Context) -> str:
+    path = os.path.join(ctx.tmp, "jobs.csv")
+    if not os.path.exists(path):
+        append_rows(path, ctx.postings.rows(ctx.args.postings))
+    return path
+
+@scenario("load_data")
+def _load_data(ctx: Context):
+    from dashboards.frames import CsvTail
+    path = _jobs_csv(ctx)
+
+    def run():
+        return len(CsvTail(path).load())
+    return run
+
+@scenario("load_data_incremental")
+def _load_data_incremental(ctx: Context):
+    from dashboards.frames import CsvTail
+    path = os.path.join(ctx.tmp, "jobs_tail.csv")
+    extra = ctx.postings.rows(max(1, ctx.args.postings // 100))
+
+    def run():
+        shutil.copyfile(_jobs_csv(ctx), path)
+        tail = CsvTail(path)
+        tail.load()
+        append_rows(path, extra)
+        start = time.perf_counter()
+        tail.load()
+        return len(extra), {"seconds": time.perf_counter() - start}
+    return run
+
+@scenario("filter_df")
+def _filter_df(ctx: Context):
+    import pandas as pd
+    from dashboards.frames import CsvTail, filter_df
+    df = CsvTail(_jobs_csv(ctx)).load()
+    end = df["fetched_at"].max()
+    date_range = (end - pd.Timedelta(days=14), end)
+
+    def run():
+        for skills in (["python"], ["sql", "spark", "dbt"], None):
+            filter_df(df, date_range, ["lever"], None, skills)
+            filter_df(df, None, None, ["acme", "globex"], skills)
+        return 6 * len(df)
+    return run
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=os.path.dirname(__file__), timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def run_suite(args: argparse.Namespace) -> Dict:
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}")
+    postings = SyntheticPostings(seed=args.seed, words=args.words, density=args.density,
+                                 skills=tuple(CANONICAL_SKILLS))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, StubBoards(
+        jobs_per_board=args.jobs_per_board, latency=args.latency, etags=False,
+        throttle_every=args.throttle_every, retry_after=0, describe=postings.description,
+    ) as stub:
+        ctx = Context(args, postings, stub, tmp)
+        for name in names:
+            fn = SCENARIOS[name](ctx)
+            runs, items, extra = [], 0, {}
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                out = fn()
+                elapsed = time.perf_counter() - start
+                items, extra = out if isinstance(out, tuple) else (out, {})
+                runs.append(extra.pop("seconds", elapsed))
+            seconds = statistics.median(runs)
+            results.append({"name": name, "seconds": seconds, "runs": runs, "items": items,
+                            "items_per_s": items / seconds if seconds else None, **extra})
+            print(f"  {name:24s} {seconds * 1000:9.1f} ms  {items / seconds:12.0f} items/s")
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "results": results,
+    }
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Names of scenarios slower than `baseline` by more than `tolerance`."""
+    before = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    print(f"vs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for r in current["results"]:
+        b = before.get(r["name"])
+        if not b or not b["seconds"]:
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"  {r['name']:24s} {ratio:6.2f}x time{flag}")
+        if flag:
+            regressions.append(r["name"])
+    return regressions
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    ap.add_argument("--only", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    ap.add_argument("--postings", type=int, default=2000, help="synthetic postings per scenario")
+    ap.add_argument("--words", type=int, default=300, help="words per description")
+    ap.add_argument("--density", type=float, default=0.02, help="share of words that are skills")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--boards", type=int, default=20, help="stub boards per fetch scenario")
+    ap.add_argument("--jobs-per-board", type=int, default=50)
+    ap.add_argument("--latency", type=float, default=0.02, help="stub response latency (s)")
+    ap.add_argument("--throttle-every", type=int, default=0, help="stub answers every Nth request with a 429")
+    ap.add_argument("--concurrency", type=int, default=4, help="client requests in flight per host")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per scenario; the median is reported")
+    ap.add_argument("--out", help="results file (default: benchmarks/results/<timestamp>.json)")
+    ap.add_argument("--compare", help="earlier results file to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="slowdown reported as a regression")
+    args = ap.parse_args(argv)
+
+    results = run_suite(args)
+    out = args.out or os.path.join(
+        RESULTS_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(results, json.load(f), args.tolerance):
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
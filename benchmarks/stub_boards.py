@@ -0,0 +1,147 @@
+"""Local HTTP stand-in for the job-board APIs, shared by the tests and the
+benchmark suite."""
+from __future__ import annotations
+import hashlib, html, json, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable
+from urllib.parse import urlsplit
+
+class StubBoards:
+    """Local stand-in for the Lever and Greenhouse public APIs.
+
+    Serves `/v0/postings/<company>` and `/v1/boards/<token>/jobs` with
+    `jobs_per_board` postings each (and RSS feeds at `/rss/<name>`), after `latency` seconds, with ETags when
+    `etags` is set. Every `throttle_every`-th request is answered with
+    `throttle_status` (429 by default) and a `Retry-After: <retry_after>`
+    header (none if `retry_after` is None) instead. `describe(key)`, if
+    given, supplies each posting's HTML description (see
+    `benchmarks.synthetic`). Records every request path, the 429s served and
+    the peak number of requests in flight.
+    """
+
+    def __init__(self, jobs_per_board: int = 3, latency: float = 0.0, etags: bool = True,
+                 throttle_every: int = 0, retry_after: float | None = 1, throttle_status: int = 429,
+                 describe: Callable[[str], str] | None = None):
+        self.jobs_per_board = jobs_per_board
+        self.latency = latency
+        self.etags = etags
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.throttle_status = throttle_status
+        self.describe = describe
+        self.feeds: dict[str, int] = {}  # RSS items per feed name, if not jobs_per_board
+        self.throttled = 0
+        self.requests: list[str] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(self.path)
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    throttle = bool(stub.throttle_every) and len(stub.requests) % stub.throttle_every == 0
+                    stub.throttled += throttle
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    if throttle:
+                        self.send_response(stub.throttle_status)
+                        if stub.retry_after is not None:
+                            self.send_header("Retry-After", f"{stub.retry_after:g}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status, body = stub.route(self.path)
+                    xml = isinstance(body, str)
+                    payload = body.encode() if xml else json.dumps(body).encode()
+                    etag = '"%s"' % hashlib.md5(payload).hexdigest()
+                    if status == 200 and stub.etags and self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/rss+xml" if xml else "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    if stub.etags:
+                        self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def lever_job(self, company: str, i: int) -> dict:
+        job = {
+            "text": f"Data Engineer {i}",
+            "hostedUrl": f"https://jobs.lever.co/{company}/{i}",
+            "createdAt": 1700000000000 + i,
+            "categories": {"location": "Remote"},
+        }
+        if self.describe:
+            job["description"] = self.describe(f"lever:{company}:{i}")
+        else:
+            job["descriptionPlain"] = "Python, SQL and Airflow on AWS."
+        return job
+
+    def lever_jobs(self, company: str) -> list[dict]:
+        return [self.lever_job(company, i) for i in range(self.jobs_per_board)]
+
+    def greenhouse_job(self, token: str, i: int, content: bool = True) -> dict:
+        job = {
+            "id": i,
+            "title": f"Analytics Engineer {i}",
+            "absolute_url": f"https://boards.greenhouse.io/{token}/jobs/{i}",
+            "location": {"name": "New York"},
+            "updated_at": "2024-01-01T00:00:00-05:00",
+        }
+        if content and self.describe:
+            job["content"] = html.escape(self.describe(f"greenhouse:{token}:{i}"))
+        elif content:
+            job["content"] = "&lt;p&gt;We use &lt;b&gt;dbt&lt;/b&gt; and Snowflake.&lt;/p&gt;"
+        return job
+
+    def greenhouse_jobs(self, token: str, content: bool = False) -> dict:
+        return {"jobs": [self.greenhouse_job(token, i, content) for i in range(self.jobs_per_board)]}
+
+    def rss_feed(self, name: str) -> str:
+        """RSS 2.0 feed of `feeds[name]` items (default jobs_per_board)."""
+        items = "".join(
+            f"<item><title>Platform Engineer {i}</title><link>https://{name}.example.com/jobs/{i}</link>"
+            f"<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>"
+            f"<description>&lt;p&gt;Python and Kafka&lt;/p&gt;</description></item>"
+            for i in range(self.feeds.get(name, self.jobs_per_board)))
+        return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>{items}</channel></rss>'
+
+    def route(self, path: str) -> tuple[int, object]:
+        url = urlsplit(path)
+        parts = url.path.strip("/").split("/")
+        if parts[:2] == ["v0", "postings"] and len(parts) == 3:
+            return 200, self.lever_jobs(parts[2])
+        if parts[:2] == ["v1", "boards"] and len(parts) >= 4 and parts[3] == "jobs":
+            if len(parts) == 5:
+                return 200, self.greenhouse_job(parts[2], int(parts[4]))
+            return 200, self.greenhouse_jobs(parts[2], content="content=true" in url.query)
+        if parts[0] == "rss" and len(parts) == 2:
+            return 200, self.rss_feed(parts[1])
+        return 404, {"error": "not found"}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
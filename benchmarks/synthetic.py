@@ -0,0 +1,95 @@
+"""Deterministic synthetic postings for the benchmarks.
+
+Every posting is generated from its own key ("lever:acme:3", or an index),
+so the same seed always yields the same corpus and the stub server can
+produce any posting on demand.
+"""
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+from src.skills import CANONICAL_SKILLS, extract_skills
+
+FILLER = (
+    "we are looking for an engineer to join our team and help build reliable "
+    "data products you will work closely with analysts and stakeholders across "
+    "the company to design ship and operate services at scale"
+).split()
+
+SECTIONS = ["About the team", "What you'll do", "What we're looking for", "Nice to have", "Benefits"]
+COMPANIES = ["acme", "globex", "initech", "umbrella", "hooli", "stark", "wayne", "wonka"]
+LOCATIONS = ["Remote", "New York", "London", "Berlin", "San Francisco", None]
+
+@dataclass(frozen=True)
+class SyntheticPostings:
+    """`words` words per description, each a skill mention with probability
+    `density`; descriptions are Lever-style HTML unless `html` is False."""
+
+    seed: int = 7
+    words: int = 300
+    density: float = 0.02
+    skills: Sequence[str] = tuple(CANONICAL_SKILLS)
+    html: bool = True
+
+    def _rng(self, key) -> random.Random:
+        return random.Random(f"{self.seed}:{key}")
+
+    def _tokens(self, rng: random.Random) -> List[str]:
+        return [rng.choice(self.skills).title() if rng.random() < self.density else rng.choice(FILLER)
+                for _ in range(self.words)]
+
+    def text(self, key) -> str:
+        return " ".join(self._tokens(self._rng(key)))
+
+    def description(self, key) -> str:
+        rng = self._rng(key)
+        toks = self._tokens(rng)
+        if not self.html:
+            return " ".join(toks)
+        parts, i = ["<div>"], 0
+        while i < len(toks):
+            parts.append(f"<div><h3>{rng.choice(SECTIONS)}</h3></div>")
+            n = rng.randint(10, 30)
+            parts.append("<div><span style=\"font-size: 11pt\">" + " ".join(toks[i:i + n]) + "</span></div>")
+            i += n
+            items = []
+            for _ in range(rng.randint(2, 6)):
+                n = rng.randint(5, 15)
+                items.append("<li>" + " ".join(
+                    t if t in FILLER else f"<b>{t}</b> &amp;" for t in toks[i:i + n]) + "</li>")
+                i += n
+            parts.append("<ul>" + "".join(items) + "</ul><div><br></div>")
+        parts.append("</div>")
+        return "\n".join(parts)
+
+    def raw(self, i: int) -> Dict:
+        """A raw posting as a source yields it (Lever shape)."""
+        rng = self._rng(f"raw:{i}")
+        company = rng.choice(COMPANIES)
+        return {
+            "source": "lever",
+            "title": f"{rng.choice(['Data', 'ML', 'Analytics', 'Platform'])} Engineer {i}",
+            "company": company,
+            "location": rng.choice(LOCATIONS),
+            "posted_at": f"2024-01-{1 + i % 28:02d}T00:00:00+00:00",
+            "url": f"https://jobs.lever.co/{company}/{i}",
+            "source_id": f"job-{i}",
+            "description_text": None,
+            "description_html": self.description(f"raw:{i}"),
+        }
+
+    def rows(self, n: int, days: int = 60, start: datetime | None = None) -> List[Dict]:
+        """`n` stored rows (skills extracted, fetched_at spread over `days` days)."""
+        start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+        out = []
+        for i in range(n):
+            raw = self.raw(i)
+            out.append({
+                "source": raw["source"], "title": raw["title"], "company": raw["company"],
+                "location": raw["location"], "posted_at": raw["posted_at"], "url": raw["url"],
+                "skills": extract_skills(self.text(f"raw:{i}"), whitelist=list(self.skills)),
+                "fetched_at": (start + timedelta(days=i * days // max(1, n), seconds=i)).isoformat(),
+            })
+        return out
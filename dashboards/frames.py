@@ -0,0 +1,174 @@
+"""Data helpers behind the dashboard: loading jobs.csv incrementally, the
+multi-hot skill matrix, filters and trend aggregation. Free of Streamlit so
+they can be tested and benchmarked on their own."""
+from __future__ import annotations
+import io
+import os
+import threading
+from typing import List, Tuple
+
+import pandas as pd
+
+COLUMNS = ["source", "title", "company", "location", "posted_at", "url", "skills", "fetched_at"]
+
+class CsvTail:
+    """Keeps a parsed, coerced copy of an append-only CSV and, on each
+    `load`, parses only the bytes appended since the previous one.
+
+    The file's (size, mtime) is the version: unchanged means the cached frame
+    is returned as is; a shrunk or replaced file triggers a full re-read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.df = pd.DataFrame(columns=COLUMNS)
+        self.columns: List[str] | None = None
+        self.offset = 0
+        self.version: tuple | None = None
+        self.inode = None
+
+    def load(self) -> pd.DataFrame:
+        with self._lock:
+            try:
+                st_ = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return self.df
+            version = (st_.st_size, st_.st_mtime_ns)
+            if version == self.version:
+                return self.df
+            if st_.st_size < self.offset or st_.st_ino != self.inode:
+                self._reset()
+            try:
+                self._read_tail()
+            except (pd.errors.ParserError, ValueError):
+                self._reset()
+                self._read_tail()
+            self.version, self.inode = version, st_.st_ino
+            return self.df
+
+    def _read_tail(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        # Only complete lines; a partially written last row waits for the next load
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+        chunk = chunk[:end]
+        if self.columns is None:
+            new = pd.read_csv(io.BytesIO(chunk))
+            self.columns = list(new.columns)
+        else:
+            new = pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns)
+        new = _coerce(new)
+        if self.df.empty:
+            self.df = new
+        else:
+            old_skills = skill_columns(self.df)
+            self.df = pd.concat([self.df, new], ignore_index=True)
+            if set(old_skills) != set(skill_columns(new)):
+                # A skill seen on one side only: the other side's rows are False
+                cols = skill_columns(self.df)
+                self.df[cols] = self.df[cols].fillna(False).astype(bool)
+        self.offset += end
+
+
+def _coerce(df: pd.DataFrame) -> pd.DataFrame:
+    # Coerce timestamps (UTC) and clean strings
+    for col in ("posted_at", "fetched_at"):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+    for c in ("source", "title", "company", "location", "url", "skills"):
+        if c in df.columns:
+            df[c] = df[c].fillna("").astype(str)
+    return add_skill_matrix(df)
+
+
+SKILL_PREFIX = "skill:"
+
+
+def add_skill_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse the comma-joined skills once, at load, into one boolean column
+    per skill (`skill:<name>`), so filters and counts are column operations."""
+    if "skills" not in df.columns:
+        return df
+    m = df["skills"].str.lower().str.get_dummies(sep=",").astype(bool)
+    m = m.loc[:, [c for c in m.columns if c.strip()]]
+    m.columns = [SKILL_PREFIX + c.strip() for c in m.columns]
+    return pd.concat([df, m], axis=1)
+
+
+def skill_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in df.columns if c.startswith(SKILL_PREFIX)]
+
+
+def skill_mentions(df: pd.DataFrame, time_col: str | None) -> pd.DataFrame:
+    """Raw-row equivalent of load_skill_counts: daily (period, skill, mentions)
+    summed straight from the skill matrix."""
+    cols = skill_columns(df)
+    if df.empty or not time_col or not cols:
+        return pd.DataFrame(columns=["period", "skill", "mentions"])
+    wide = df[cols].groupby(df[time_col].dt.floor("D")).sum()
+    wide.columns = [c[len(SKILL_PREFIX):] for c in cols]
+    long = wide.stack()
+    long = long[long > 0]
+    long.index.names = ["period", "skill"]
+    return long.rename("mentions").reset_index()
+
+
+def trend_matrix(counts: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """(period x skill) mentions for every skill in one groupby; periods with
+    no mentions are 0 so rolling windows and deltas line up."""
+    if counts.empty:
+        return pd.DataFrame()
+    wide = (
+        counts.groupby([pd.Grouper(key="period", freq=rule), "skill"])["mentions"]
+        .sum()
+        .unstack("skill", fill_value=0)
+    )
+    return wide.asfreq(rule, fill_value=0)
+
+
+def week_over_week(wide: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Latest period vs the same period a week earlier, per skill."""
+    lag = 7 if rule == "D" else 1
+    if len(wide) <= lag:
+        return pd.DataFrame(columns=["latest", "week_ago", "delta", "pct"])
+    latest, ago = wide.iloc[-1], wide.iloc[-1 - lag]
+    out = pd.DataFrame({"latest": latest, "week_ago": ago, "delta": latest - ago})
+    out["pct"] = (out["delta"] / out["week_ago"].where(out["week_ago"] > 0)).round(3)
+    return out.sort_values("delta", ascending=False)
+
+
+def filter_df(
+    df: pd.DataFrame,
+    date_range: Tuple[pd.Timestamp, pd.Timestamp] | None,
+    sources: List[str] | None,
+    companies: List[str] | None,
+    skills: List[str] | None,
+) -> pd.DataFrame:
+    out = df
+    time_col = (
+        "fetched_at"
+        if "fetched_at" in out.columns
+        else ("posted_at" if "posted_at" in out.columns else None)
+    )
+    if time_col and date_range:
+        start, end = date_range
+        out = out[(out[time_col] >= start) & (out[time_col] <= end)]
+
+    if sources:
+        out = out[out["source"].str.lower().isin([s.lower() for s in sources])]
+    if companies:
+        out = out[out["company"].str.lower().isin([c.lower() for c in companies])]
+
+    if skills:
+        cols = [c for c in {SKILL_PREFIX + s.lower() for s in skills} if c in out.columns]
+        out = out[out[cols].any(axis=1)] if cols else out.iloc[0:0]
+
+    return out
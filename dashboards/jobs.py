@@ -0,0 +1,123 @@
+"""Scraper runs started from the dashboard: the ingest pipeline runs in the
+server process on a background thread, so the page stays responsive and can
+show progress while batches land in storage. Free of Streamlit, like
+frames.py."""
+from __future__ import annotations
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import List
+
+from src import scraper
+from src.metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+# Counters that mark a board as done: fetched, skipped as unchanged, or failed
+BOARD_RESULTS = ("postings_fetched", "boards_unchanged", "errors")
+
+
+@dataclass
+class Progress:
+    run: int  # number of the latest run, 0 before the first
+    state: str  # idle | running | done | failed
+    boards_total: int = 0
+    boards_done: int = 0
+    seen: int = 0  # postings flushed to storage so far
+    written: int = 0  # of which new or changed
+    errors: int = 0
+    elapsed: float = 0.0
+    message: str = ""
+
+    @property
+    def rate(self) -> float:
+        """Postings per second."""
+        return self.seen / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+
+class ScrapeJob:
+    """At most one scraper run at a time, on a background thread.
+
+    One instance is shared by every session of a server, so pressing "Run"
+    while a run is in progress attaches to it instead of starting a
+    duplicate. Each run streams into storage batch by batch, exactly like
+    `python -m src.scraper`; `progress()` is safe to call from any thread.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._run = 0
+        self._state = "idle"
+        self._message = ""
+        self._metrics = Metrics()
+        self._sink = None
+        self._boards_total = 0
+        self._t0 = self._t1 = 0.0
+
+    def start(self) -> bool:
+        """Start a run; False if one is already running."""
+        with self._lock:
+            if self._state == "running":
+                return False
+            self._run += 1
+            self._state, self._message = "running", ""
+            self._metrics, self._sink, self._boards_total = Metrics(), None, 0
+            self._t0, self._t1 = time.perf_counter(), 0.0
+            self._thread = threading.Thread(target=self._scrape, name=f"scrape-{self._run}", daemon=True)
+            self._thread.start()
+        return True
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _scrape(self):
+        state, message = "failed", ""
+        try:
+            s = scraper.settings  # one snapshot for the whole run
+            boards = scraper.configured_boards(s)
+            self._boards_total = sum(map(len, boards.values()))
+            if not self._boards_total:
+                state, message = "done", scraper.no_boards_message(s)
+                return
+            workers = s.WORKERS if self.workers is None else self.workers
+            self._sink = sink = scraper.open_sink(self._metrics, s)
+            scraper.run_once(sink, workers, s, mode="dashboard")
+            message = f"Wrote {sink.written} new/changed rows to {sink.store} ({sink.seen - sink.written} unchanged)"
+            if sink.seen:
+                spikes = scraper.alert(sink.counts, s)
+                if spikes:
+                    message += "\nSpikes: " + "; ".join(map(str, spikes))
+            state = "done"
+        except Exception as e:
+            log.exception("dashboard scraper run failed")
+            message = f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                self._state, self._message, self._t1 = state, message, time.perf_counter()
+
+    def progress(self) -> Progress:
+        with self._lock:
+            run, state, message, sink, metrics = self._run, self._state, self._message, self._sink, self._metrics
+            t0, t1 = self._t0, self._t1
+        if run == 0:
+            return Progress(run, state)
+        return Progress(
+            run, state, self._boards_total,
+            boards_done=len(metrics.label_values(BOARD_RESULTS, "source", "board")),
+            seen=sink.seen if sink else 0, written=sink.written if sink else 0,
+            errors=int(metrics.total("errors")),
+            elapsed=(t1 or time.perf_counter()) - t0, message=message,
+        )
+
+    def failed_boards(self) -> List[str]:
+        """"source:board (ErrorType)" for every board with an error this run."""
+        return sorted(f"{source}:{board} ({type_})" for source, board, type_ in
+                      self._metrics.label_values(["errors"], "source", "board", "type"))
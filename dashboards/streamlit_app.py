@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 import os
-import subprocess
+import sys
 from datetime import datetime, timedelta
 from typing import List, Tuple
 
@@ -15,96 +15,147 @@ import streamlit as st
 # ---------- Page config ----------
 st.set_page_config(page_title="Job Skills Demand Monitor", layout="wide")
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.storage import SQLiteStorage, parquet_partitions, read_parquet  # noqa: E402
+from src.rollups import RollupStore  # noqa: E402
+from dashboards.frames import (  # noqa: E402
+    COLUMNS, SKILL_PREFIX, CsvTail, _coerce, filter_df, skill_columns, skill_mentions,
+    trend_matrix, week_over_week,
+)
+from dashboards.jobs import ScrapeJob  # noqa: E402
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "csv")
 DEFAULT_CSV = os.getenv("OUTPUT_CSV", "data/jobs.csv")
+DEFAULT_SQLITE = os.getenv("SQLITE_PATH", "data/jobs.sqlite")
+DEFAULT_PARQUET = os.getenv("PARQUET_ROOT", "data/jobs")
+ROLLUP_PATH = os.getenv("ROLLUP_PATH", "data/rollups.sqlite")
 
 # ---------- Helpers ----------
-@st.cache_data(show_spinner=False)
+@st.cache_resource(show_spinner=False)
+def _csv_tail(csv_path: str) -> CsvTail:
+    return CsvTail(csv_path)
+
+
 def load_data(csv_path: str) -> pd.DataFrame:
-    if not os.path.exists(csv_path):
-        return pd.DataFrame(
-            columns=[
-                "source",
-                "title",
-                "company",
-                "location",
-                "posted_at",
-                "url",
-                "skills",
-                "fetched_at",
-            ]
-        )
-    df = pd.read_csv(csv_path)
-    # Coerce timestamps (UTC) and clean strings
-    for col in ("posted_at", "fetched_at"):
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
-    for c in ("source", "title", "company", "location", "url", "skills"):
-        if c in df.columns:
-            df[c] = df[c].fillna("").astype(str)
-    return df
-
-
-def explode_skills(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty or "skills" not in df.columns:
-        return df.assign(skill=[]).iloc[0:0]
-    tmp = df.copy()
-    tmp["skills"] = tmp["skills"].fillna("")
-    tmp = tmp.assign(skill=tmp["skills"].str.split(",")).explode("skill")
-    tmp["skill"] = tmp["skill"].astype(str).str.strip()
-    tmp = tmp[tmp["skill"] != ""]
-    return tmp
-
-
-def filter_df(
-    df: pd.DataFrame,
+    """jobs.csv as a typed frame, re-parsing only rows appended since the last
+    rerun. Shared across sessions; callers must not modify it in place."""
+    return _csv_tail(csv_path).load()
+
+
+@st.cache_data(show_spinner=False)
+def load_parquet(
+    root: str,
+    date_range: Tuple[pd.Timestamp, pd.Timestamp] | None,
+    version: tuple,
+) -> pd.DataFrame:
+    """Only the partitions inside `date_range`, and only the dashboard's columns.
+    Timestamps arrive typed; skills are joined in Arrow, not per row."""
+    import pyarrow.compute as pc
+
+    start, end = (str(t.date()) for t in date_range) if date_range else (None, None)
+    table = read_parquet(root, start, end, columns=COLUMNS)
+    table = table.set_column(
+        table.schema.get_field_index("skills"), "skills",
+        pc.binary_join(table.column("skills"), ","),
+    )
+    return _coerce(table.to_pandas())
+
+
+def _parquet_version(root: str) -> tuple:
+    # A new part file changes its partition directory's mtime
+    return tuple((day, os.stat(path).st_mtime_ns) for day, path in parquet_partitions(root))
+
+
+@st.cache_resource(show_spinner=False)
+def open_sqlite(db_path: str) -> SQLiteStorage:
+    return SQLiteStorage(db_path)
+
+
+def _sqlite_version(db_path: str) -> tuple:
+    # Changes whenever a writer commits (main file or its WAL)
+    return tuple(
+        os.stat(p).st_mtime_ns if os.path.exists(p) else 0
+        for p in (db_path, db_path + "-wal")
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_sqlite(
+    db_path: str,
     date_range: Tuple[pd.Timestamp, pd.Timestamp] | None,
     sources: List[str] | None,
     companies: List[str] | None,
     skills: List[str] | None,
+    version: tuple,
 ) -> pd.DataFrame:
-    out = df.copy()
-    time_col = (
-        "fetched_at"
-        if "fetched_at" in out.columns
-        else ("posted_at" if "posted_at" in out.columns else None)
-    )
-    if time_col and date_range:
-        start, end = date_range
-        out = out[(out[time_col] >= start) & (out[time_col] <= end)]
+    """Filtered rows straight from the indexed SQLite tables."""
+    start, end = (t.isoformat() for t in date_range) if date_range else (None, None)
+    cols, rows = open_sqlite(db_path).query(start, end, sources, companies, skills)
+    return _coerce(pd.DataFrame.from_records(rows, columns=cols))
 
-    if sources:
-        out = out[out["source"].str.lower().isin([s.lower() for s in sources])]
-    if companies:
-        out = out[out["company"].str.lower().isin([c.lower() for c in companies])]
 
-    if skills:
-        target = {s.lower() for s in skills}
-        out = out[out["skills"].str.lower().apply(
-            lambda x: any(tok.strip() in target for tok in x.split(","))
-        )]
+@st.cache_resource(show_spinner=False)
+def open_rollups(path: str) -> RollupStore:
+    return RollupStore(path)
 
+
+@st.cache_data(show_spinner=False)
+def load_skill_counts(
+    path: str,
+    date_range: Tuple[pd.Timestamp, pd.Timestamp] | None,
+    sources: List[str] | None,
+    companies: List[str] | None,
+    skills: List[str] | None,
+    version: tuple,
+) -> pd.DataFrame:
+    """Daily (period, skill, mentions) from the ingest-time rollups."""
+    start, end = (str(t.date()) for t in date_range) if date_range else (None, None)
+    rows = open_rollups(path).daily_skill_counts(start, end, sources, companies, skills)
+    out = pd.DataFrame.from_records(rows, columns=["period", "skill", "mentions"])
+    out["period"] = pd.to_datetime(out["period"], utc=True)
     return out
 
 
-def run_scraper() -> tuple[bool, str]:
-    """
-    Attempt to run `python -m src.scraper` from repo root.
-    Gracefully handle environments where subprocess is blocked.
-    """
-    try:
-        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        proc = subprocess.run(
-            ["python", "-m", "src.scraper"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True,
-            timeout=180,
-        )
-        ok = proc.returncode == 0
-        out = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr else "")
-        return ok, out.strip()
-    except Exception as e:
-        return False, f"Error: {e}"
+@st.cache_resource(show_spinner=False)
+def scrape_job() -> ScrapeJob:
+    """The server's one scraper job, shared by every session."""
+    return ScrapeJob()
+
+
+def scrape_panel():
+    """Run button and live progress of the shared job. While a run is going
+    this refreshes every 2 s, and reruns the page whenever new batches were
+    stored so the charts pick them up (only the new rows are read)."""
+    job = scrape_job()
+    p = job.progress()
+    if st.button("🚀 Run scraper now", type="primary", use_container_width=True, disabled=p.running):
+        job.start()  # False if another session started one meanwhile: show that one
+        st.rerun()
+    if p.run == 0:
+        return
+    if p.running:
+        frac = min(1.0, p.boards_done / p.boards_total) if p.boards_total else 0.0
+        st.progress(frac, text=f"Run #{p.run}: boards {p.boards_done}/{p.boards_total}")
+    elif p.state == "done":
+        st.success(f"Run #{p.run} finished in {p.elapsed:.0f}s.")
+    else:
+        st.error(f"Run #{p.run} failed after {p.elapsed:.0f}s.")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Postings", f"{p.seen:,}")
+    c2.metric("Per sec", f"{p.rate:.1f}")
+    c3.metric("Errors", f"{p.errors:,}")
+    failed = job.failed_boards()
+    if failed:
+        st.caption("Failed: " + ", ".join(failed[:10]) + (f" +{len(failed) - 10}" if len(failed) > 10 else ""))
+    if p.message:
+        st.code(p.message)
+    seen = (p.run, p.written, p.state)
+    if st.session_state.setdefault("scrape_seen", seen) != seen:
+        st.session_state["scrape_seen"] = seen
+        st.rerun()
 
 
 def df_download_link(df: pd.DataFrame, filename: str = "filtered_jobs.csv"):
@@ -120,37 +171,60 @@ def df_download_link(df: pd.DataFrame, filename: str = "filtered_jobs.csv"):
 
 # ---------- Sidebar ----------
 st.sidebar.title("⚙️ Controls")
-csv_path = st.sidebar.text_input(
-    "CSV path", value=DEFAULT_CSV, help="Path to your data/jobs.csv"
-)
+if STORAGE_BACKEND == "sqlite":
+    db_path = st.sidebar.text_input(
+        "SQLite path", value=DEFAULT_SQLITE, help="Path to your data/jobs.sqlite"
+    )
+elif STORAGE_BACKEND == "parquet":
+    parquet_root = st.sidebar.text_input(
+        "Parquet root", value=DEFAULT_PARQUET, help="Directory of date=YYYY-MM-DD partitions"
+    )
+else:
+    csv_path = st.sidebar.text_input(
+        "CSV path", value=DEFAULT_CSV, help="Path to your data/jobs.csv"
+    )
 refresh_btn = st.sidebar.button("🔄 Reload data", use_container_width=True)
 
-with st.sidebar.expander("Run scraper (optional)"):
-    st.caption("Runs `python -m src.scraper` in the repo root.")
-    if st.button("🚀 Run scraper now", type="primary", use_container_width=True):
-        with st.status("Running scraper...", expanded=True):
-            ok, out = run_scraper()
-            if ok:
-                st.success("Scraper finished.")
-            else:
-                st.error("Scraper failed.")
-            st.code(out or "(no output)")
-
-# Load data (cache-aware)
-df = load_data(csv_path) if not refresh_btn else load_data.clear() or load_data(csv_path)
-
-# ---------- Date range (robust to single-day data) ----------
-time_col = (
-    "fetched_at"
-    if "fetched_at" in df.columns
-    else ("posted_at" if "posted_at" in df.columns else None)
-)
+scraping = scrape_job().progress().running
+with st.sidebar.expander("Run scraper (optional)", expanded=scraping):
+    st.caption("Runs the scraper in the background; it keeps going across reruns and "
+               "there is one run per server at a time.")
+    st.fragment(run_every=2 if scraping else None)(scrape_panel)()
 
 def _to_utc_series(x):
     return pd.to_datetime(x, errors="coerce", utc=True)
 
-if time_col and not df.empty:
-    ts = _to_utc_series(df[time_col])
+# Load data (cache-aware). With SQLite only bounds and filter options are read
+# here; rows are queried once the filters are known.
+if STORAGE_BACKEND == "sqlite":
+    if refresh_btn:
+        load_sqlite.clear()
+    store = open_sqlite(db_path)
+    df = None
+    has_data = len(store) > 0
+    time_col = "fetched_at"
+    ts = _to_utc_series(pd.Series(store.bounds()))
+elif STORAGE_BACKEND == "parquet":
+    # Bounds come from the partition names; rows are read for the chosen range below
+    if refresh_btn:
+        load_parquet.clear()
+    days = [day for day, _ in parquet_partitions(parquet_root)]
+    df = None
+    has_data = bool(days)
+    time_col = "fetched_at"
+    ts = _to_utc_series(pd.Series([days[0], days[-1]] if days else []))
+else:
+    df = load_data(csv_path)
+    has_data = not df.empty
+    time_col = (
+        "fetched_at"
+        if "fetched_at" in df.columns
+        else ("posted_at" if "posted_at" in df.columns else None)
+    )
+    ts = _to_utc_series(df[time_col]) if time_col and has_data else None
+
+# ---------- Date range (robust to single-day data) ----------
+if ts is not None and has_data:
     if ts.notna().any():
         min_dt_utc = ts.min()
         max_dt_utc = ts.max()
@@ -182,19 +256,33 @@ if time_col and not df.empty:
 else:
     date_range = None
 
+if STORAGE_BACKEND == "parquet":
+    df = load_parquet(parquet_root, date_range, _parquet_version(parquet_root))
+
 # ---------- Filters ----------
-sources_all = sorted([s for s in df["source"].unique() if s]) if not df.empty else []
-companies_all = sorted([c for c in df["company"].unique() if c]) if not df.empty else []
+if df is None:
+    sources_all = store.distinct("source")
+    companies_all = store.distinct("company")
+else:
+    sources_all = sorted([s for s in df["source"].unique() if s]) if not df.empty else []
+    companies_all = sorted([c for c in df["company"].unique() if c]) if not df.empty else []
 
 sources_pick = st.sidebar.multiselect(
     "Filter by source", options=sources_all, default=sources_all[:3]
 )
 companies_pick = st.sidebar.multiselect("Filter by company", options=companies_all)
 
-exploded_all = explode_skills(df)
-skills_all = (
-    sorted(exploded_all["skill"].unique().tolist()) if not exploded_all.empty else []
-)
+# Charts come from the daily rollups when the scraper maintains them
+use_rollups = bool(ROLLUP_PATH) and os.path.exists(ROLLUP_PATH) and len(open_rollups(ROLLUP_PATH)) > 0
+if refresh_btn:
+    load_skill_counts.clear()
+
+if use_rollups:
+    skills_all = open_rollups(ROLLUP_PATH).skills()
+elif df is None:
+    skills_all = store.distinct("skill")
+else:
+    skills_all = sorted(c[len(SKILL_PREFIX):] for c in skill_columns(df) if df[c].any())
 skills_pick = st.sidebar.multiselect("Filter by skill(s)", options=skills_all)
 
 agg_period = st.sidebar.selectbox("Trend aggregation", options=["D (daily)", "W (weekly)"], index=0)
@@ -203,18 +291,32 @@ top_n = st.sidebar.slider("Top N skills", min_value=5, max_value=30, value=15)
 # ---------- Main ----------
 st.title("📈 Job Skills Demand Monitor")
 
-if df.empty:
+if not has_data:
     st.info("No data found yet. Run the scraper, then refresh.")
     st.stop()
 
-filtered = filter_df(df, date_range, sources_pick, companies_pick, skills_pick)
-exploded = explode_skills(filtered)
+if df is None:
+    filtered = load_sqlite(
+        db_path, date_range, sources_pick, companies_pick, skills_pick, _sqlite_version(db_path)
+    )
+else:
+    filtered = filter_df(df, date_range, sources_pick, companies_pick, skills_pick)
+
+# Per-day skill mentions for the charts. The rollups are filtered per skill, so
+# with a skill filter they count only the chosen skills.
+if use_rollups:
+    counts = load_skill_counts(
+        ROLLUP_PATH, date_range, sources_pick, companies_pick, skills_pick,
+        _sqlite_version(ROLLUP_PATH),
+    )
+else:
+    counts = skill_mentions(filtered, time_col)
 
 # KPIs
 c1, c2, c3, c4 = st.columns(4)
 c1.metric("Jobs (rows)", f"{len(filtered):,}")
 c2.metric("Unique companies", f"{filtered['company'].nunique():,}")
-c3.metric("Unique skills", f"{exploded['skill'].nunique():,}" if not exploded.empty else "0")
+c3.metric("Unique skills", f"{counts['skill'].nunique():,}" if not counts.empty else "0")
 if date_range:
     c4.metric("Window", f"{date_range[0].date()} → {date_range[1].date()}")
 else:
@@ -224,10 +326,10 @@ st.divider()
 
 # Top skills bar chart
 st.subheader("Top skills in selection")
-if exploded.empty:
+if counts.empty:
     st.warning("No skills found in the current filter.")
 else:
-    top_counts = exploded["skill"].value_counts().head(top_n).sort_values()
+    top_counts = counts.groupby("skill")["mentions"].sum().nlargest(top_n).sort_values()
     fig, ax = plt.subplots()
     top_counts.plot(kind="barh", ax=ax)  # default matplotlib style/colors
     ax.set_xlabel("Mentions")
@@ -238,36 +340,42 @@ st.divider()
 
 # Trends over time
 st.subheader("Skill trends over time")
-if exploded.empty or not time_col:
+if counts.empty or not time_col:
     st.info("Need data with skills and timestamps to plot trends.")
 else:
-    ts = exploded[[time_col, "skill"]].copy().dropna(subset=[time_col])
-    if ts.empty:
+    rule = "D" if agg_period.startswith("D") else "W"
+    # One pass over the counts gives every skill's series
+    wide = trend_matrix(counts, rule)
+    if wide.empty:
         st.info("No timestamps available to chart.")
     else:
-        rule = "D" if agg_period.startswith("D") else "W"
-        # Suggest popular skills (or all) for lines
-        selectable = (
-            top_counts.index.tolist()
-            if "top_counts" in locals() and not top_counts.empty
-            else skills_all
-        )
+        # Suggest skills by popularity in the selection
+        selectable = wide.sum().sort_values(ascending=False).index.tolist()
         chosen_for_trend = st.multiselect(
-            "Choose up to 6 skills for trend lines",
+            "Choose skills for trend lines",
             options=selectable,
-            default=selectable[:4] if selectable else [],
-            max_selections=6,
+            default=selectable[:4],
+            max_selections=30,
+        )
+        smooth = st.slider(
+            "Rolling average (periods)", min_value=1, max_value=14, value=1,
+            help="1 shows raw counts",
         )
         if chosen_for_trend:
+            lines = wide[chosen_for_trend]
+            if smooth > 1:
+                lines = lines.rolling(smooth, min_periods=1).mean()
             fig2, ax2 = plt.subplots()
-            for skill in chosen_for_trend:
-                s = ts[ts["skill"] == skill].set_index(time_col).sort_index()
-                s = s.resample(rule).size()
-                ax2.plot(s.index, s.values, label=skill)  # default matplotlib style/colors
+            lines.plot(ax=ax2)  # default matplotlib style/colors
             ax2.set_xlabel("Date")
             ax2.set_ylabel("Mentions")
-            ax2.legend()
+            ax2.legend(ncol=2 if len(chosen_for_trend) > 10 else 1, fontsize="small")
             st.pyplot(fig2, use_container_width=True)
+
+            wow = week_over_week(wide[chosen_for_trend], rule)
+            if not wow.empty:
+                st.caption("Week-over-week change (latest period)")
+                st.dataframe(wow, use_container_width=True)
         else:
             st.caption("Pick at least one skill to plot.")
 
@@ -306,7 +414,7 @@ st.dataframe(
     height=420,
 )
 
-df_download_link(filtered)
+df_download_link(filtered.drop(columns=skill_columns(filtered)))
 
 st.caption(
     "Tip: add more sources in src/sources/ and configure them via .env (LEVER_COMPANIES, GREENHOUSE_BOARDS)."
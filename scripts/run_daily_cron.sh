@@ -1,6 +1,8 @@
 #!/usr/bin/env bash
 # Add something like this to your crontab (daily at 9am):
 # 0 9 * * * /path/to/repo/scripts/run_daily_cron.sh >> /path/to/repo/cron.log 2>&1
+# To poll boards continuously instead, run `python -m src.scraper serve` under a
+# process supervisor (systemd, supervisord, ...); it stops cleanly on SIGTERM.
 set -euo pipefail
 cd "$(dirname "$0")/.."
 source .venv/bin/activate || true
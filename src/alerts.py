@@ -1,26 +1,170 @@
 from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from email.message import EmailMessage
-import smtplib
+from typing import Dict, Iterable, List
+import math, os, smtplib, sqlite3
 
-def maybe_alert(skill_counts: dict[str, int], target_skill: str, min_mentions: int,
-                sender: str | None, recipient: str | None, app_password: str | None):
-    if not sender or not recipient or not app_password:
-        return
-    mentions = skill_counts.get(target_skill.lower(), 0)
-    if mentions < min_mentions:
-        return
+@dataclass
+class Spike:
+    skill: str
+    mentions: int
+    mean: float  # EWMA of earlier days
+    std: float
+    z: float
 
+    def __str__(self) -> str:
+        return f"{self.skill}: {self.mentions} mentions (usually {self.mean:.1f} ± {self.std:.1f}, z={self.z:.1f})"
+
+class AlertState:
+    """Running statistics per skill, persisted between runs so spikes are
+    found without rereading history.
+
+    Each skill keeps the day being observed with its latest count (a later
+    run on the same day replaces it) plus an exponentially weighted mean and
+    variance of earlier days' counts. When a new day starts, the previous
+    day's count is folded in with weight `alpha`. A count is a spike when it
+    lies `z` standard deviations above the mean, is at least `min_mentions`,
+    and the skill has `min_days` of history; each skill alerts at most once
+    per day.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS skill_stats (
+        skill TEXT PRIMARY KEY, day TEXT NOT NULL, mentions INTEGER NOT NULL,
+        mean REAL NOT NULL, var REAL NOT NULL, days INTEGER NOT NULL, alerted_day TEXT
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str, alpha: float = 0.1, z: float = 3.0, min_days: int = 7,
+                 min_mentions: int = 10):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.alpha, self.z, self.min_days, self.min_mentions = alpha, z, min_days, min_mentions
+        self._db = sqlite3.connect(path)
+        self._db.executescript(self.SCHEMA)
+
+    def observe(self, day: str, counts: Dict[str, int], skills: Iterable[str] = ()) -> List[Spike]:
+        """Record today's mention `counts` (tracked `skills` missing from them
+        count as 0) and return the skills spiking, highest z first."""
+        state = {r[0]: list(r[1:]) for r in self._db.execute(
+            "SELECT skill, day, mentions, mean, var, days, alerted_day FROM skill_stats")}
+        spikes, rows = [], []
+        for skill in set(skills) | set(counts):
+            x = counts.get(skill, 0)
+            prev = state.get(skill)
+            if prev is None:
+                mean, var, days, alerted = 0.0, 0.0, 0, None
+            else:
+                prev_day, prev_x, mean, var, days, alerted = prev
+                if prev_day < day:  # fold the finished day into the running stats
+                    if days == 0:
+                        mean, var = float(prev_x), 0.0
+                    else:
+                        diff = prev_x - mean
+                        mean += self.alpha * diff
+                        var = (1 - self.alpha) * (var + self.alpha * diff * diff)
+                    days += 1
+                elif prev_day > day:
+                    continue  # a late run for a day already folded in
+            rows.append((skill, day, x, mean, var, days, alerted))
+            if days >= self.min_days and x >= self.min_mentions and alerted != day:
+                std = math.sqrt(var)
+                # A flat history (std 0) still needs a real jump, not +1
+                z = (x - mean) / max(std, 1.0, 0.1 * mean)
+                if z >= self.z:
+                    spikes.append(Spike(skill, x, mean, std, z))
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO skill_stats (skill, day, mentions, mean, var, days, alerted_day)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return sorted(spikes, key=lambda s: -s.z)
+
+    def alerted(self, day: str, spikes: Iterable[Spike]):
+        """Mark `spikes` as sent, so later runs today don't repeat them."""
+        with self._db:
+            self._db.executemany("UPDATE skill_stats SET alerted_day = ? WHERE skill = ?",
+                                 [(day, s.skill) for s in spikes])
+
+    def close(self):
+        self._db.close()
+
+def digest(spikes: List[Spike], day: str, sender: str, recipient: str) -> EmailMessage:
+    """All of a run's spikes as one email."""
     msg = EmailMessage()
-    msg["Subject"] = f"[Job Trends] Spike detected: {target_skill} ({mentions} mentions)"
+    names = ", ".join(s.skill for s in spikes[:3]) + (f" +{len(spikes) - 3}" if len(spikes) > 3 else "")
+    msg["Subject"] = f"[Job Trends] {len(spikes)} skill spike{'s' * (len(spikes) != 1)} on {day}: {names}"
     msg["From"] = sender
     msg["To"] = recipient
-    msg.set_content(f"""Heads up!
+    lines = "\n".join(f"- {s}" for s in spikes)
+    msg.set_content(f"""Heads up! Skills mentioned far more than usual on {day}:
 
-Skill: {target_skill}
-Mentions today: {mentions}
+{lines}
 
 — Job Skills Demand Monitor
 """)
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=30) as smtp:
-        smtp.login(sender, app_password)
-        smtp.send_message(msg)
+    return msg
+
+class Mailer:
+    """One SMTP connection, opened on first send and reused until `close`.
+    `security` is "ssl" (SMTP over TLS), "starttls" or "none"; login only
+    happens with a password."""
+
+    def __init__(self, host: str, port: int, security: str = "ssl",
+                 user: str | None = None, password: str | None = None, timeout: float = 30):
+        if security not in ("ssl", "starttls", "none"):
+            raise ValueError(f"security must be ssl, starttls or none, got {security!r}")
+        self.host, self.port, self.security = host, port, security
+        self.user, self.password, self.timeout = user, password, timeout
+        self._smtp: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.security == "ssl":
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                smtp.starttls()
+        if self.password:
+            smtp.login(self.user or "", self.password)
+        return smtp
+
+    def send(self, msg: EmailMessage):
+        if self._smtp is None:
+            self._smtp = self._connect()
+        self._smtp.send_message(msg)
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            self._smtp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def run_alerts(counts: Dict[str, int], settings, day: str | None = None,
+               mailer: Mailer | None = None) -> List[Spike]:
+    """Update the alert state with a run's skill counts and email one digest
+    of any spikes. Returns the spikes found."""
+    if not settings.ALERT_STATE:
+        return []
+    day = day or datetime.now(timezone.utc).date().isoformat()
+    state = AlertState(settings.ALERT_STATE, settings.ALERT_ALPHA, settings.ALERT_Z,
+                       settings.ALERT_MIN_DAYS, settings.ALERT_MIN_MENTIONS)
+    try:
+        spikes = state.observe(day, counts, settings.skills)
+        if spikes and settings.EMAIL_FROM and settings.EMAIL_TO:
+            mailer = mailer or Mailer(settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_SECURITY,
+                                      settings.EMAIL_FROM, settings.EMAIL_APP_PASSWORD)
+            with mailer:
+                mailer.send(digest(spikes, day, settings.EMAIL_FROM, settings.EMAIL_TO))
+            state.alerted(day, spikes)
+        return spikes
+    finally:
+        state.close()
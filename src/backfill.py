@@ -0,0 +1,98 @@
+from __future__ import annotations
+import argparse
+from collections import deque
+from typing import Dict, Iterable, Iterator, List
+
+from .config import settings
+from .extraction_cache import ExtractionCache
+from .rollups import RollupStore
+from .scraper import extract, extract_parallel
+from .storage import Storage, open_storage, posting_key
+from .texts import TextArchive
+
+class Rescanner:
+    """Storage rescan (see `Storage.rewrite_skills`) that re-extracts `skills`
+    from each row's archived description, on `workers` processes when > 1.
+    A row's skills outside `skills` were not rechecked and are kept, so
+    backfilling one new skill adds it without dropping the others. Rows
+    without an archived description are left alone."""
+
+    def __init__(self, texts: TextArchive, skills: List[str], workers: int = 0,
+                 chunk_size: int = 200, cache: ExtractionCache | None = None):
+        self.texts = texts
+        self.skills = skills
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.scanned = 0
+        self.missing = 0
+
+    def __call__(self, rows: Iterable[Dict]) -> Iterator[Dict | None]:
+        # per row in flight: its content hash (None without archived text) and current skills
+        pending: deque = deque()
+        wanted = set(self.skills)
+
+        def raws():
+            for r in rows:
+                h = self.texts.content_hash(r.get("posting_key") or posting_key(r), r.get("fetched_at"))
+                raw = self.texts.raw(h) if h else None
+                pending.append((h if raw is not None else None, r.get("skills", [])))
+                yield raw or {}
+
+        if self.workers > 1:
+            extracted = extract_parallel(raws(), self.skills, self.workers, self.chunk_size, self.cache)
+        else:
+            extracted = extract(raws(), self.skills, self.cache)
+        for norm in extracted:
+            h, current = pending.popleft()
+            if h is None:
+                self.missing += 1
+                yield None
+            else:
+                self.scanned += 1
+                kept = [s for s in current if s not in wanted]
+                yield {"skills": sorted(set(norm["skills"]).union(kept)), "content_hash": h}
+
+def backfill(store: Storage, rescan: Rescanner, rollups: RollupStore | None = None) -> int:
+    """Re-extract skills over all stored history in place, then rebuild the
+    rollups from the result. Returns the number of rows whose skills changed."""
+    changed = store.rewrite_skills(rescan)
+    if rollups is not None:
+        rollups.rebuild(store.iter_rows())
+    return changed
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m src.backfill",
+                                 description="re-extract skills over stored history from the text archive")
+    ap.add_argument("--skills", default=settings.SKILL_LIST,
+                    help="comma-separated skills to re-extract (default: SKILL_LIST);"
+                         " other skills already on a row are kept")
+    ap.add_argument("--workers", type=int, default=settings.WORKERS,
+                    help="extraction processes (default: serial)")
+    ap.add_argument("--chunk-size", type=int, default=200, help="rows per worker task")
+    args = ap.parse_args(argv)
+
+    if not settings.TEXT_ARCHIVE:
+        print("TEXT_ARCHIVE is not set; nothing to backfill from.")
+        return
+    skills = [s.strip().lower() for s in args.skills.split(",") if s.strip()]
+    texts = TextArchive(settings.TEXT_ARCHIVE)
+    cache = (ExtractionCache(settings.EXTRACT_CACHE, settings.EXTRACT_CACHE_MAX_ENTRIES)
+             if settings.EXTRACT_CACHE else None)
+    store = open_storage(settings)
+    rollups = RollupStore(settings.ROLLUP_PATH) if settings.ROLLUP_PATH else None
+    rescan = Rescanner(texts, skills, args.workers, args.chunk_size, cache)
+    try:
+        changed = backfill(store, rescan, rollups)
+    finally:
+        store.close()
+        texts.close()
+        if cache is not None:
+            cache.close()
+        if rollups is not None:
+            rollups.close()
+    print(f"Backfilled {', '.join(skills)} over {rescan.scanned} rows of {store}:"
+          f" {changed} changed, {rescan.missing} without archived text")
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,76 @@
 from __future__ import annotations
 import os
 from dataclasses import dataclass
-from dotenv import load_dotenv
 
-load_dotenv()
+def _load_dotenv():
+    # Same lookup as python-dotenv's find_dotenv (this directory, then up),
+    # but dotenv is only imported when there is a .env to read
+    d = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(d, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(d)
+        if parent == d:
+            return
+        d = parent
+
+_load_dotenv()
 
 @dataclass(frozen=True)
 class Settings:
     USER_AGENT: str = os.getenv("USER_AGENT", "JobSkillsTrendBot/1.0")
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "csv")  # csv | sqlite | parquet
     OUTPUT_CSV: str = os.getenv("OUTPUT_CSV", "data/jobs.csv")
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "data/jobs.sqlite")
+    PARQUET_ROOT: str = os.getenv("PARQUET_ROOT", "data/jobs")
+    WORKERS: int = int(os.getenv("WORKERS", "0"))  # extraction processes; 0/1 = serial
+    BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "1000"))  # rows per storage flush
+    ROLLUP_PATH: str = os.getenv("ROLLUP_PATH", "data/rollups.sqlite")  # empty disables daily rollups
+    METRICS_REPORT: str = os.getenv("METRICS_REPORT", "data/metrics/runs.jsonl")  # JSON line per run
+    METRICS_PROM: str = os.getenv("METRICS_PROM", "")  # Prometheus textfile; both empty disables metrics
+    TEXT_ARCHIVE: str = os.getenv("TEXT_ARCHIVE", "data/texts.sqlite")  # empty disables; needed by backfill
+    EXTRACT_CACHE: str = os.getenv("EXTRACT_CACHE", "data/cache/extract.sqlite")  # empty disables
+    EXTRACT_CACHE_MAX_ENTRIES: int = int(os.getenv("EXTRACT_CACHE_MAX_ENTRIES", "500000"))
+    SCHEDULE_PATH: str = os.getenv("SCHEDULE_PATH", "data/schedule.sqlite")  # serve mode: per-board poll intervals
+    SERVE_INTERVAL: float = float(os.getenv("SERVE_INTERVAL", "3600"))  # seconds; mean poll interval per board
+    SERVE_MIN_INTERVAL: float = float(os.getenv("SERVE_MIN_INTERVAL", "600"))
+    SERVE_MAX_INTERVAL: float = float(os.getenv("SERVE_MAX_INTERVAL", "86400"))
+    SERVE_JITTER: float = float(os.getenv("SERVE_JITTER", "0.1"))  # ± share of the interval
+    DISCOVERY_PATH: str = os.getenv("DISCOVERY_PATH", "data/discovery.sqlite")  # candidate-term counts per day; empty disables
+    DISCOVERY_WIDTH: int = int(os.getenv("DISCOVERY_WIDTH", str(1 << 18)))  # count-min sketch counters per row
+    DISCOVERY_DEPTH: int = int(os.getenv("DISCOVERY_DEPTH", "4"))  # count-min sketch rows
+    DISCOVERY_TERMS: int = int(os.getenv("DISCOVERY_TERMS", "2000"))  # heavy hitters kept per day
+    POSTING_INDEX: str = os.getenv("POSTING_INDEX", "data/postings_index.sqlite")  # empty appends every row
+    SHARD: str = os.getenv("SHARD", "")  # "i/N": take only this slice of the boards, into its own segment files
     SKILL_LIST: str = os.getenv("SKILL_LIST", "python, sql, pandas")
     EMAIL_FROM: str | None = os.getenv("EMAIL_FROM")
     EMAIL_TO: str | None = os.getenv("EMAIL_TO")
     EMAIL_APP_PASSWORD: str | None = os.getenv("EMAIL_APP_PASSWORD")
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "465"))
+    SMTP_SECURITY: str = os.getenv("SMTP_SECURITY", "ssl")  # ssl | starttls | none
+    ALERT_STATE: str = os.getenv("ALERT_STATE", "data/alerts.sqlite")  # per-skill running stats; empty disables alerts
+    ALERT_ALPHA: float = float(os.getenv("ALERT_ALPHA", "0.1"))  # EWMA weight of each new day
+    ALERT_Z: float = float(os.getenv("ALERT_Z", "3"))  # standard deviations above the mean that count as a spike
+    ALERT_MIN_DAYS: int = int(os.getenv("ALERT_MIN_DAYS", "7"))  # days of history before a skill can alert
     ALERT_MIN_MENTIONS: int = int(os.getenv("ALERT_MIN_MENTIONS", "10"))
-    ALERT_TARGET_SKILL: str = os.getenv("ALERT_TARGET_SKILL", "python")
     LEVER_COMPANIES: str = os.getenv("LEVER_COMPANIES", "")
     GREENHOUSE_BOARDS: str = os.getenv("GREENHOUSE_BOARDS", "")
+    SOURCE_BOARDS: str = os.getenv("SOURCE_BOARDS", "")  # "name=a,b;other=c" for any registered source
+    GREENHOUSE_CONTENT: str = os.getenv("GREENHOUSE_CONTENT", "bulk")  # none | bulk | detail
+    GREENHOUSE_CONTENT_CACHE: str = os.getenv("GREENHOUSE_CONTENT_CACHE", "data/cache/greenhouse_content.sqlite")
+    HTTP_CONCURRENCY: int = int(os.getenv("HTTP_CONCURRENCY", "4"))  # in-flight requests per host
+    HTTP_MIN_INTERVAL: float = float(os.getenv("HTTP_MIN_INTERVAL", "0.25"))  # seconds between request starts per host
+    HTTP_MAX_RATE: float = float(os.getenv("HTTP_MAX_RATE", "8"))  # req/s per host the pacing may ramp up to
+    HTTP_BURST: int = int(os.getenv("HTTP_BURST", "1"))  # request starts allowed back to back per host
+    HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "4"))  # retries on 429/5xx/connection errors
+    HTTP_BACKOFF: float = float(os.getenv("HTTP_BACKOFF", "0.5"))  # base seconds of jittered exponential backoff
+    HTTP_MAX_RETRY_AFTER: float = float(os.getenv("HTTP_MAX_RETRY_AFTER", "120"))  # longer Retry-After fails the request
+    HTTP_CACHE: str = os.getenv("HTTP_CACHE", "data/cache/http.sqlite")  # empty disables conditional requests
+    HTTP_CACHE_UNCHANGED: str = os.getenv("HTTP_CACHE_UNCHANGED", "replay")  # replay | skip boards answering 304
 
     @property
     def skills(self) -> list[str]:
@@ -30,4 +84,19 @@ class Settings:
     def greenhouse_list(self) -> list[str]:
         return [s.strip().lower() for s in self.GREENHOUSE_BOARDS.split(",") if s.strip()]
 
+    @property
+    def boards(self) -> dict[str, list[str]]:
+        """Boards per source name: LEVER_COMPANIES, GREENHOUSE_BOARDS, then
+        SOURCE_BOARDS (kept as written; feeds may be case-sensitive URLs)."""
+        out = {"lever": self.lever_list, "greenhouse": self.greenhouse_list}
+        for part in self.SOURCE_BOARDS.split(";"):
+            name, _, names = part.partition("=")
+            if not name.strip():
+                continue
+            have = out.setdefault(name.strip().lower(), [])
+            for b in (b.strip() for b in names.split(",")):
+                if b and b not in have:
+                    have.append(b)
+        return out
+
 settings = Settings()
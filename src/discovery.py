@@ -0,0 +1,329 @@
+from __future__ import annotations
+import argparse, os, re, sqlite3, zlib
+from array import array
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from .parsers import CLEAN_RE, html_to_text
+from .rollups import _day
+from .skills import CANONICAL_SKILLS, SKILL_ALIASES
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+# Words that never start or end a candidate term
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each etc few for from
+further had has have having he her here hers him his how i if in into is it its itself just least
+less may me more most must my new no nor not now of off on once only or other our ours out over own
+per plus same she should so some such than that the their them then there these they this those
+through to too under until up us use used using very via was we well were what when where which
+while who whom why will with within without work working would year years you your yours
+ability able across experience strong team teams role job skills knowledge including include
+""".split())
+
+def candidate_terms(text: str, max_n: int = 3) -> set:
+    """Distinct 1..`max_n`-token n-grams of `text` that could name a skill:
+    no stopword at either end and not purely numeric."""
+    tokens = TOKEN_RE.findall(text.lower())
+    edge = [not (t in STOPWORDS or t.isdigit()) for t in tokens]  # may start/end a term
+    out = set()
+    n = len(tokens)
+    for i in range(n):
+        if not edge[i]:
+            continue
+        gram = tokens[i]
+        out.add(gram)
+        for j in range(i + 1, min(n, i + max_n)):
+            gram += " " + tokens[j]
+            if edge[j]:
+                out.add(gram)
+    return out
+
+class CountMinSketch:
+    """Approximate counts in `depth` x `width` 32-bit counters, whatever the
+    number of distinct keys. Uses conservative update (only the minimal
+    counters grow), so estimates overshoot as little as possible; they never
+    undershoot. Row hashes come from two CRC32s (stable across processes,
+    unlike `hash`)."""
+
+    def __init__(self, width: int = 1 << 18, depth: int = 4, counts: bytes | None = None):
+        self.width, self.depth = width, depth
+        self.table = array("I")
+        if counts is None:
+            self.table.frombytes(bytes(4 * width * depth))
+        else:
+            self.table.frombytes(counts)
+
+    SEED = 0x9E3779B9
+
+    def _cells(self, key: str) -> List[int]:
+        b = key.encode("utf-8")
+        h1, h2 = zlib.crc32(b), zlib.crc32(b, self.SEED) | 1
+        w = self.width
+        return [d * w + (h1 + d * h2) % w for d in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Count `key` and return its new estimate."""
+        return self.add_all((key,), count)[0][1]
+
+    def add_all(self, keys: Iterable[str], count: int = 1) -> List[Tuple[str, int]]:
+        """Count each of `keys`; returns (key, new estimate) pairs. The loop is
+        inlined because it runs for every term of every posting."""
+        table, w, seed, crc32 = self.table, self.width, self.SEED, zlib.crc32
+        rows = [d * w for d in range(self.depth)]
+        out = []
+        for key in keys:
+            b = key.encode("utf-8")
+            h1, h2 = crc32(b), crc32(b, seed) | 1
+            cells = [base + (h1 + d * h2) % w for d, base in enumerate(rows)]
+            est = min([table[c] for c in cells]) + count
+            for c in cells:
+                if table[c] < est:
+                    table[c] = est
+            out.append((key, est))
+        return out
+
+    def estimate(self, key: str) -> int:
+        return min(self.table[c] for c in self._cells(key))
+
+class HeavyHitters:
+    """The ~`k` keys with the highest estimates seen so far. New keys are only
+    admitted above the current floor; pruning back to `k` happens when the set
+    grows 25% past it, so updates stay O(1) amortized."""
+
+    def __init__(self, k: int = 2000, items: Dict[str, int] | None = None):
+        self.k = k
+        self.items: Dict[str, int] = dict(items or {})
+        self.floor = 0
+        if len(self.items) >= k:
+            self._prune()
+
+    def offer(self, key: str, estimate: int):
+        if key in self.items or len(self.items) < self.k or estimate > self.floor:
+            self.items[key] = estimate
+            if len(self.items) > self.k * 1.25:
+                self._prune()
+
+    def _prune(self):
+        kept = sorted(self.items.items(), key=lambda kv: -kv[1])[:self.k]
+        self.items = dict(kept)
+        self.floor = kept[-1][1] if len(kept) >= self.k else 0
+
+    def top(self, n: int | None = None) -> List[Tuple[str, int]]:
+        return sorted(self.items.items(), key=lambda kv: -kv[1])[:n or self.k]
+
+class Discovery:
+    """Candidate-term counts per day (UTC date of fetched_at) in bounded memory.
+
+    `add` takes the rows a run stored and counts, per day, how many postings
+    mention each 1-3 word candidate term, in a count-min sketch feeding a
+    heavy-hitters set. Only new or changed postings are stored, so a term's
+    daily count is over the postings that appeared (or changed) that day:
+    unchanged ones seen again, possibly many times a day in serve mode,
+    aren't counted again. Memory per open day is the sketch (depth x width x 4
+    bytes) plus ~k terms, whatever the vocabulary. `close` persists both:
+    sketches are kept `keep_sketch_days` so later runs the same day keep
+    counting, heavy hitters are kept for the trend report.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS days (
+        day TEXT PRIMARY KEY, postings INTEGER NOT NULL,
+        width INTEGER, depth INTEGER, sketch BLOB
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS terms (
+        day TEXT NOT NULL, term TEXT NOT NULL, postings INTEGER NOT NULL,
+        PRIMARY KEY (day, term)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str, width: int = 1 << 18, depth: int = 4, k: int = 2000,
+                 keep_sketch_days: int = 2, read_only: bool = False):
+        self.path = path
+        self.width, self.depth, self.k = width, depth, k
+        self.keep_sketch_days = keep_sketch_days
+        self.read_only = read_only
+        if read_only:
+            # For reports: never creates, migrates or flushes anything
+            self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(self.SCHEMA)
+        self._open: Dict[str, list] = {}  # day -> [postings, sketch, heavy hitters]
+
+    def _day_state(self, day: str) -> list:
+        state = self._open.get(day)
+        if state is None:
+            row = self._db.execute("SELECT postings, width, depth, sketch FROM days WHERE day = ?",
+                                   (day,)).fetchone()
+            terms = dict(self._db.execute("SELECT term, postings FROM terms WHERE day = ?", (day,)))
+            if row and row[3] is not None and (row[1], row[2]) == (self.width, self.depth):
+                sketch = CountMinSketch(self.width, self.depth, zlib.decompress(row[3]))
+            else:
+                # New day, or an old one whose sketch was dropped: reseed from
+                # its heavy hitters so their counts carry on
+                sketch = CountMinSketch(self.width, self.depth)
+                for term, c in terms.items():
+                    sketch.add(term, c)
+            state = self._open[day] = [row[0] if row else 0, sketch, HeavyHitters(self.k, terms)]
+        return state
+
+    def add(self, rows: Iterable[Dict]) -> int:
+        """Count the candidate terms of stored rows; returns postings counted."""
+        n = 0
+        for r in rows:
+            day = _day(r)
+            text = _text(r)
+            if day is None or not text:
+                continue
+            state = self._day_state(day)
+            state[0] += 1
+            offer = state[2].offer
+            for term, est in state[1].add_all(candidate_terms(text)):
+                offer(term, est)
+            n += 1
+        return n
+
+    def flush(self):
+        with self._db:
+            for day, (postings, sketch, heavy) in self._open.items():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO days (day, postings, width, depth, sketch) VALUES (?, ?, ?, ?, ?)",
+                    (day, postings, sketch.width, sketch.depth, zlib.compress(sketch.table.tobytes(), 1)))
+                self._db.execute("DELETE FROM terms WHERE day = ?", (day,))
+                self._db.executemany("INSERT INTO terms (day, term, postings) VALUES (?, ?, ?)",
+                                     [(day, t, c) for t, c in heavy.top()])
+            # Older days only need their heavy hitters
+            days = [d for (d,) in self._db.execute(
+                "SELECT day FROM days WHERE sketch IS NOT NULL ORDER BY day DESC")]
+            self._db.executemany("UPDATE days SET sketch = NULL WHERE day = ?",
+                                 [(d,) for d in days[self.keep_sketch_days:]])
+        for day in list(self._open):
+            if day not in days[:self.keep_sketch_days]:
+                del self._open[day]
+
+    def daily(self, start: str | None = None, end: str | None = None) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+        """(postings per day, {term: {day: postings mentioning it}}) for days in [start, end]."""
+        where, params = "", []
+        if start or end:
+            where = " WHERE day >= ? AND day <= ?"
+            params = [start or "", end or "9999"]
+        postings = dict(self._db.execute(f"SELECT day, postings FROM days{where}", params))
+        terms: Dict[str, Dict[str, int]] = {}
+        for day, term, c in self._db.execute(f"SELECT day, term, postings FROM terms{where}", params):
+            terms.setdefault(term, {})[day] = c
+        return postings, terms
+
+    def latest_day(self) -> str | None:
+        return self._db.execute("SELECT MAX(day) FROM days").fetchone()[0]
+
+    def merge_from(self, paths: List[str]):
+        """Replace each day found in the archives at `paths` (e.g. shards) with
+        the sum of their counts; repeating a merge gives the same result."""
+        days: Dict[str, int] = {}
+        terms: Dict[Tuple[str, str], int] = {}
+        for path in paths:
+            other = sqlite3.connect(path)
+            try:
+                for day, postings in other.execute("SELECT day, postings FROM days"):
+                    days[day] = days.get(day, 0) + postings
+                for day, term, c in other.execute("SELECT day, term, postings FROM terms"):
+                    terms[(day, term)] = terms.get((day, term), 0) + c
+            finally:
+                other.close()
+        with self._db:
+            self._db.executemany("DELETE FROM terms WHERE day = ?", [(d,) for d in days])
+            self._db.executemany("INSERT OR REPLACE INTO days (day, postings) VALUES (?, ?)",
+                                 list(days.items()))
+            self._db.executemany("INSERT INTO terms (day, term, postings) VALUES (?, ?, ?)",
+                                 [(d, t, c) for (d, t), c in terms.items()])
+
+    def close(self):
+        if not self.read_only:
+            self.flush()
+        self._db.close()
+
+def _text(row: Dict) -> str:
+    if row.get("text"):
+        return row["text"]
+    desc = row.get("description")
+    if not desc:
+        return ""
+    fmt, body = desc
+    return html_to_text(body) if fmt == "html" else CLEAN_RE.sub(" ", body).strip()
+
+def known_terms(skills: Iterable[str] = ()) -> set:
+    """Skill names and aliases already tracked, which the report leaves out."""
+    known = {s.strip().lower() for s in list(CANONICAL_SKILLS) + list(skills) if s.strip()}
+    known |= {a.lower() for aliases in SKILL_ALIASES.values() for a in aliases}
+    return known
+
+def rising(discovery: Discovery, end: str, days: int = 7, baseline: int = 28,
+           min_postings: int = 5, exclude: Iterable[str] = (), limit: int = 30) -> List[Dict]:
+    """Terms whose share of postings over the `days` ending at `end` grew the
+    most against the `baseline` days before, best first. A term missing from a
+    day's heavy hitters counts as 0 that day."""
+    end_d = date.fromisoformat(end)
+    recent_start = (end_d - timedelta(days=days - 1)).isoformat()
+    base_start = (end_d - timedelta(days=days + baseline - 1)).isoformat()
+    postings, terms = discovery.daily(base_start, end)
+    recent_n = sum(c for d, c in postings.items() if d >= recent_start)
+    base_n = sum(c for d, c in postings.items() if d < recent_start)
+    if not recent_n:
+        return []
+    exclude = set(exclude)
+    out = []
+    for term, by_day in terms.items():
+        if term in exclude:
+            continue
+        recent = sum(c for d, c in by_day.items() if d >= recent_start)
+        if recent < min_postings:
+            continue
+        before = sum(c for d, c in by_day.items() if d < recent_start)
+        share, base_share = recent / recent_n, before / base_n if base_n else 0.0
+        # Add-one smoothing so brand-new terms rank high but not infinitely
+        growth = ((recent + 1) / (recent_n + 1)) / ((before + 1) / (base_n + 1))
+        out.append({"term": term, "postings": recent, "share": share,
+                    "baseline_share": base_share, "growth": growth})
+    out.sort(key=lambda r: -r["growth"])
+    return out[:limit]
+
+def main(argv: List[str] | None = None):
+    from .config import settings
+
+    ap = argparse.ArgumentParser(prog="python -m src.discovery")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rep = sub.add_parser("report", help="terms rising fastest that are not in the skill list yet")
+    rep.add_argument("--path", default=settings.DISCOVERY_PATH)
+    rep.add_argument("--end", help="last day of the recent window (default: latest day counted)")
+    rep.add_argument("--days", type=int, default=7, help="recent window in days")
+    rep.add_argument("--baseline", type=int, default=28, help="days before the window to compare against")
+    rep.add_argument("--min-postings", type=int, default=5)
+    rep.add_argument("--top", type=int, default=30)
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"No postings counted in {args.path} yet")
+        return
+    disc = Discovery(args.path, settings.DISCOVERY_WIDTH, settings.DISCOVERY_DEPTH, settings.DISCOVERY_TERMS,
+                     read_only=True)
+    try:
+        end = args.end or disc.latest_day()
+        if not end:
+            print(f"No postings counted in {args.path} yet")
+            return
+        rows = rising(disc, end, args.days, args.baseline, args.min_postings,
+                      known_terms(settings.skills), args.top)
+        print(f"Rising terms, {args.days} days to {end} vs the {args.baseline} before:")
+        for r in rows:
+            print(f"  {r['term']:30s} {r['postings']:6d} postings  {r['share']:6.1%}"
+                  f"  (was {r['baseline_share']:.1%})  x{r['growth']:.1f}")
+    finally:
+        disc.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import hashlib, os, sqlite3, time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
+
+from .skills import SKILL_ALIASES
+
+def aliases_fingerprint(aliases: Dict[str, List[str]] | None = None) -> str:
+    """Changes whenever the alias table (and so what a skill matches) changes."""
+    aliases = SKILL_ALIASES if aliases is None else aliases
+    basis = ";".join(f"{k}={','.join(sorted(v))}" for k, v in sorted(aliases.items()))
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()[:16]
+
+class Entry(NamedTuple):
+    checked: FrozenSet[str]  # skills this description was scanned for
+    found: FrozenSet[str]    # the subset of `checked` it mentions
+
+@dataclass
+class ExtractionStats:
+    hits: int = 0     # every active skill already known; parsing skipped
+    partial: int = 0  # parsed, but only the newly added skills were scanned
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.partial + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hit_rate:.0%} hit rate ({self.hits} hits, "
+                f"{self.partial} partial, {self.misses} misses)")
+
+class ExtractionCache:
+    """Extracted skills per raw description, keyed by the description's hash.
+
+    Each entry remembers which skills it was scanned for, so adding a skill to
+    SKILL_LIST only rescans for that skill and removing one costs nothing. A
+    change to the alias table invalidates everything. Entries beyond
+    `max_entries` are evicted least recently used first, on `flush`.
+    """
+
+    FLUSH_EVERY = 1000
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS skill_sets (
+        id INTEGER PRIMARY KEY, fingerprint TEXT NOT NULL UNIQUE, skills TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS entries (
+        content_hash TEXT PRIMARY KEY,
+        skill_set INTEGER NOT NULL REFERENCES skill_sets(id),
+        found TEXT NOT NULL,
+        used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_entries_used ON entries(used);
+    """
+
+    def __init__(self, path: str, max_entries: int = 500_000):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self.SCHEMA)
+        self.max_entries = max_entries
+        self.aliases_fp = aliases_fingerprint()
+        self.stats = ExtractionStats()
+        self._sets: Dict[int, FrozenSet[str]] = {}
+        self._set_ids: Dict[FrozenSet[str], int] = {}
+        prefix = self.aliases_fp + ":"
+        for sid, fp, skills in self._db.execute("SELECT id, fingerprint, skills FROM skill_sets"):
+            if fp.startswith(prefix):
+                s = frozenset(x for x in skills.split(",") if x)
+                self._sets[sid], self._set_ids[s] = s, sid
+        self._pending: Dict[str, Tuple[int, str]] = {}
+        self._touched: List[str] = []
+
+    def _set_id(self, skills: FrozenSet[str]) -> int:
+        sid = self._set_ids.get(skills)
+        if sid is None:
+            joined = ",".join(sorted(skills))
+            fp = f"{self.aliases_fp}:{hashlib.sha1(joined.encode('utf-8')).hexdigest()}"
+            self._db.execute("INSERT OR IGNORE INTO skill_sets (fingerprint, skills) VALUES (?, ?)",
+                             (fp, joined))
+            sid = self._db.execute("SELECT id FROM skill_sets WHERE fingerprint = ?", (fp,)).fetchone()[0]
+            self._sets[sid], self._set_ids[skills] = skills, sid
+        return sid
+
+    def get(self, content_hash: str) -> Entry | None:
+        pending = self._pending.get(content_hash)
+        row = pending or self._db.execute(
+            "SELECT skill_set, found FROM entries WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        if row is None or row[0] not in self._sets:
+            return None
+        return Entry(self._sets[row[0]], frozenset(x for x in row[1].split(",") if x))
+
+    def lookup(self, content_hash: str, skills: FrozenSet[str]) -> Tuple[Entry | None, List[str] | None]:
+        """(entry, skills found) when the entry covers every skill in `skills`,
+        else (entry or None, None). Counts the hit."""
+        entry = self.get(content_hash)
+        if entry is not None and skills <= entry.checked:
+            self.stats.hits += 1
+            self._touched.append(content_hash)
+            self._maybe_flush()
+            return entry, sorted(entry.found & skills)
+        return entry, None
+
+    def record(self, content_hash: str, skills: FrozenSet[str], found: Iterable[str],
+               previous: Entry | None = None):
+        """Store the result of scanning for `skills`, merged with `previous`."""
+        found = frozenset(found)
+        if previous is not None:
+            self.stats.partial += 1
+            checked = previous.checked | skills
+            found = found | (previous.found - skills)
+        else:
+            self.stats.misses += 1
+            checked = skills
+        self._pending[content_hash] = (self._set_id(checked), ",".join(sorted(found)))
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._pending) + len(self._touched) >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries (content_hash, skill_set, found, used) VALUES (?, ?, ?, ?)",
+                [(h, sid, found, now) for h, (sid, found) in self._pending.items()],
+            )
+            self._db.executemany("UPDATE entries SET used = ? WHERE content_hash = ?",
+                                 [(now, h) for h in self._touched])
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM entries WHERE content_hash IN"
+                    " (SELECT content_hash FROM entries ORDER BY used LIMIT ?)", (excess,))
+        self._pending.clear()
+        self._touched.clear()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self._db.close()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+import json, os, threading, time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str, labels: Labels):
+        self.metrics, self.stage, self.labels = metrics, stage, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._observe(self.stage, self.labels, time.perf_counter() - self.start)
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NO_TIMER = _NoTimer()
+
+class Metrics:
+    """Per-run stage timers and labelled counters.
+
+    `timer(stage, **labels)` times a block; `observe` adds a duration measured
+    elsewhere (e.g. in a worker process); `inc` bumps a counter such as
+    postings or errors by type and board. Thread-safe. When disabled every
+    call returns immediately, so instrumented hot paths cost one attribute
+    check.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: Dict[Tuple[str, Labels], List[float]] = defaultdict(lambda: [0, 0.0])
+        self.counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+
+    def timer(self, stage: str, **labels: Any):
+        if not self.enabled:
+            return _NO_TIMER
+        return _Timer(self, stage, _labels(labels))
+
+    def observe(self, stage: str, seconds: float, calls: int = 1, **labels: Any):
+        if self.enabled:
+            self._observe(stage, _labels(labels), seconds, calls)
+
+    def _observe(self, stage: str, labels: Labels, seconds: float, calls: int = 1):
+        with self._lock:
+            s = self.stages[(stage, labels)]
+            s[0] += calls
+            s[1] += seconds
+
+    def inc(self, name: str, value: float = 1, **labels: Any):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] += value
+
+    def error(self, exc: BaseException, **labels: Any):
+        self.inc("errors", type=type(exc).__name__, **labels)
+
+    # ---------- summaries ----------
+    def stage_totals(self) -> Dict[str, float]:
+        """Seconds per stage, summed over labels."""
+        out: Dict[str, float] = defaultdict(float)
+        for (stage, _), (_, seconds) in self.stages.items():
+            out[stage] += seconds
+        return dict(out)
+
+    def total(self, name: str, **labels: Any) -> float:
+        want = set(_labels(labels))
+        with self._lock:  # may be read while a run is still counting
+            return sum(v for (n, lb), v in self.counters.items() if n == name and want <= set(lb))
+
+    def label_values(self, names: Iterable[str], *keys: str) -> Set[Tuple[str, ...]]:
+        """Distinct values of the labels `keys` over the counters `names`,
+        e.g. every (source, board) with a fetch result so far."""
+        names = set(names)
+        with self._lock:
+            labelsets = [dict(lb) for n, lb in self.counters if n in names]
+        return {tuple(lb[k] for k in keys) for lb in labelsets if all(k in lb for k in keys)}
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        """The run as one JSON-serializable record."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_s": round(time.perf_counter() - self._t0, 6),
+            "stages": [{"stage": s, **dict(lb), "calls": c, "seconds": round(t, 6)}
+                       for (s, lb), (c, t) in sorted(self.stages.items())],
+            "counters": [{"name": n, **dict(lb), "value": v}
+                         for (n, lb), v in sorted(self.counters.items())],
+            **extra,
+        }
+
+    def write_report(self, path: str, **extra: Any) -> Dict[str, Any]:
+        """Append this run's report as one line of `path` (JSON lines)."""
+        record = self.report(**extra)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        return record
+
+    def prometheus(self, prefix: str = "jobskills") -> str:
+        """The run in Prometheus text exposition format (for node_exporter's
+        textfile collector): gauges describing the latest run."""
+        def fmt(labels: Labels) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+        lines = [
+            f"# HELP {prefix}_run_timestamp_seconds Start of the latest run.",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {self.started_at.timestamp():.3f}",
+            f"# HELP {prefix}_run_duration_seconds Wall time of the latest run.",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {time.perf_counter() - self._t0:.6f}",
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage in the latest run.",
+            f"# TYPE {prefix}_stage_seconds gauge",
+        ]
+        stages = sorted(self.stages.items())
+        lines += [f"{prefix}_stage_seconds{fmt(_labels({'stage': s, **dict(lb)}))} {t:.6f}"
+                  for (s, lb), (_, t) in stages]
+        lines += [f"# HELP {prefix}_stage_calls Timed calls per pipeline stage in the latest run.",
+                  f"# TYPE {prefix}_stage_calls gauge"]
+        lines += [f"{prefix}_stage_calls{fmt(_labels({'stage': s, **dict(lb)}))} {c}"
+                  for (s, lb), (c, _) in stages]
+        names = sorted({n for n, _ in self.counters})
+        for name in names:
+            lines += [f"# HELP {prefix}_{name} Count of {name.replace('_', ' ')} in the latest run.",
+                      f"# TYPE {prefix}_{name} gauge"]
+            lines += [f"{prefix}_{name}{fmt(lb)} {int(v) if float(v).is_integer() else v}"
+                      for (n, lb), v in sorted(self.counters.items()) if n == name]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the textfile atomically, so the collector never reads half a file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+# Shared disabled instance, the default wherever metrics are optional
+NO_METRICS = Metrics(enabled=False)
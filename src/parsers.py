@@ -1,18 +1,107 @@
 from __future__ import annotations
-import re
-from typing import Dict, Any
+import hashlib, re
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Tuple
 
 CLEAN_RE = re.compile(r"\s+", re.MULTILINE)
 
-def normalize_posting(raw: Dict[str, Any]) -> Dict[str, Any]:
+class _TextExtractor(HTMLParser):
+    """Collects the text nodes of an HTML fragment in a single streaming pass.
+
+    Mirrors `BeautifulSoup(html, "html.parser").get_text(" ", strip=True)`:
+    text inside script/style/template/rt/rp is dropped, comments, doctypes and
+    processing instructions are ignored, CDATA sections are kept.
+    """
+
+    HIDDEN = frozenset({"script", "style", "template", "rt", "rp"})
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._buf: List[str] = []
+        self._hidden: List[str] = []
+
+    def _flush(self):
+        if self._buf:
+            text = "".join(self._buf).strip()
+            self._buf = []
+            if text and not self._hidden:
+                self.parts.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in self.HIDDEN:
+            self._hidden.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in self._hidden:
+            # Close the innermost matching element, and anything left open in it
+            while self._hidden and self._hidden.pop() != tag:
+                pass
+
+    def handle_data(self, data):
+        self._buf.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._buf.append(data[len("CDATA["):])
+            self._flush()
+
+def html_to_text(html: str) -> str:
+    """Visible text of an HTML fragment with whitespace collapsed, in one pass.
+
+    Equal to running `BeautifulSoup(html, "html.parser").get_text(" ", strip=True)`
+    and then the whitespace cleanup in `normalize_posting`, without building a tree.
+    """
+    if not html:
+        return ""
+    if "<" not in html and "&" not in html:
+        return " ".join(html.split())
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    parser._flush()
+    return " ".join(" ".join(parser.parts).split())
+
+def raw_description(raw: Dict[str, Any]) -> Tuple[str, str]:
+    """("text" | "html", body) of the description a posting's text is derived from."""
+    if raw.get("description_text"):
+        return "text", raw["description_text"]
+    return "html", raw.get("description_html") or ""
+
+def description_hash(raw: Dict[str, Any]) -> str:
+    fmt, body = raw_description(raw)
+    return hashlib.sha1(f"{fmt}\x1f{body}".encode("utf-8")).hexdigest()
+
+def normalize_posting(raw: Dict[str, Any], with_text: bool = True) -> Dict[str, Any]:
+    """Normalized posting dict. `with_text=False` skips deriving the
+    description text (text is None), for callers that already know its skills."""
     title = (raw.get("title") or "").strip()
     company = (raw.get("company") or "") or None
     location = (raw.get("location") or "") or None
     posted_at = raw.get("posted_at")
     url = raw.get("url")
-    text = raw.get("description_text") or raw.get("description_html") or ""
+    if not with_text:
+        text = None
+    elif raw.get("description_text"):
+        text = CLEAN_RE.sub(" ", raw["description_text"]).strip()
+    else:
+        text = html_to_text(raw.get("description_html") or "")
 
-    text = CLEAN_RE.sub(" ", text).strip()
     return {
         "source": raw.get("source", "unknown"),
         "title": title,
@@ -20,5 +109,8 @@ def normalize_posting(raw: Dict[str, Any]) -> Dict[str, Any]:
         "location": location,
         "posted_at": posted_at,
         "url": url,
+        "source_id": raw.get("source_id"),
+        "board": raw.get("board"),  # the configured board it came from
+        "content_hash": description_hash(raw),
         "text": text,
     }
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import os, sqlite3
+from collections import Counter
+from datetime import timezone
+from typing import Dict, Iterable, List, Tuple
+
+from .storage import _parse_ts
+
+def _day(row: Dict) -> str | None:
+    ts = _parse_ts(row.get("fetched_at"))
+    return ts.astimezone(timezone.utc).date().isoformat() if ts else None
+
+class RollupStore:
+    """Daily counts maintained at ingest time, so charts never scan raw rows.
+
+    `skill_counts` holds mentions per (day, source, company, skill) and
+    `posting_counts` postings per (day, source, company), where day is the
+    UTC date of fetched_at. `add` folds in just the rows a run stored;
+    `rebuild` recomputes everything from history.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS skill_counts (
+        day TEXT NOT NULL, source TEXT NOT NULL, company TEXT NOT NULL, skill TEXT NOT NULL,
+        mentions INTEGER NOT NULL,
+        PRIMARY KEY (day, source, company, skill)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS posting_counts (
+        day TEXT NOT NULL, source TEXT NOT NULL, company TEXT NOT NULL,
+        postings INTEGER NOT NULL,
+        PRIMARY KEY (day, source, company)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_skill_counts_skill ON skill_counts(skill, day);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self.SCHEMA)
+
+    def add(self, rows: Iterable[Dict]) -> int:
+        """Add the rows' postings and skill mentions; returns rows counted.
+        A row updated in place (`replaces`, see Storage.write) first takes
+        its previous version out, so the counts match `rebuild`."""
+        skills: Counter = Counter()
+        postings: Counter = Counter()
+        n = 0
+        for r in rows:
+            old = r.get("replaces")
+            if old is not None and _day(old) is not None:
+                key = (_day(old), old.get("source") or "", old.get("company") or "")
+                postings[key] -= 1
+                for s in old.get("skills", []):
+                    skills[key + (s,)] -= 1
+            day = _day(r)
+            if day is None:
+                continue
+            key = (day, r.get("source") or "", r.get("company") or "")
+            postings[key] += 1
+            for s in r.get("skills", []):
+                skills[key + (s,)] += 1
+            n += 1
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO skill_counts (day, source, company, skill, mentions) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET mentions = mentions + excluded.mentions",
+                [k + (c,) for k, c in skills.items() if c],
+            )
+            self._db.executemany(
+                "INSERT INTO posting_counts (day, source, company, postings) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET postings = postings + excluded.postings",
+                [k + (c,) for k, c in postings.items() if c],
+            )
+            # Counts taken down to zero go, as rebuild would never write them
+            self._db.executemany(
+                "DELETE FROM skill_counts WHERE day = ? AND source = ? AND company = ? AND skill = ?"
+                " AND mentions <= 0", [k for k, c in skills.items() if c < 0])
+            self._db.executemany(
+                "DELETE FROM posting_counts WHERE day = ? AND source = ? AND company = ? AND postings <= 0",
+                [k for k, c in postings.items() if c < 0])
+        return n
+
+    def clear(self):
+        with self._db:
+            self._db.execute("DELETE FROM skill_counts")
+            self._db.execute("DELETE FROM posting_counts")
+
+    def rebuild(self, rows: Iterable[Dict], batch_size: int = 10000) -> int:
+        """Replace all rollups with counts over `rows` (e.g. Storage.iter_rows())."""
+        self.clear()
+        n, batch = 0, []
+        for r in rows:
+            batch.append(r)
+            if len(batch) >= batch_size:
+                n += self.add(batch)
+                batch = []
+        return n + self.add(batch)
+
+    # ---------- reads (used by the dashboard) ----------
+    def _where(self, start: str | None, end: str | None,
+               sources: List[str] | None, companies: List[str] | None,
+               skills: List[str] | None = None) -> Tuple[str, list]:
+        where, params = [], []
+        if start:
+            where.append("day >= ?")
+            params.append(start)
+        if end:
+            where.append("day <= ?")
+            params.append(end)
+        for col, values in (("source", sources), ("company", companies), ("skill", skills)):
+            if values:
+                where.append(f"{col} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def daily_skill_counts(self, start: str | None = None, end: str | None = None,
+                           sources: List[str] | None = None, companies: List[str] | None = None,
+                           skills: List[str] | None = None) -> List[Tuple[str, str, int]]:
+        """(day, skill, mentions) summed over the matching sources/companies."""
+        where, params = self._where(start, end, sources, companies, skills)
+        return self._db.execute(
+            f"SELECT day, skill, SUM(mentions) FROM skill_counts{where} GROUP BY day, skill ORDER BY day",
+            params,
+        ).fetchall()
+
+    def postings(self, start: str | None = None, end: str | None = None,
+                 sources: List[str] | None = None, companies: List[str] | None = None) -> int:
+        where, params = self._where(start, end, sources, companies)
+        return self._db.execute(f"SELECT COALESCE(SUM(postings), 0) FROM posting_counts{where}",
+                                params).fetchone()[0]
+
+    def skills(self) -> List[str]:
+        return [r[0] for r in self._db.execute("SELECT DISTINCT skill FROM skill_counts ORDER BY skill")]
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM posting_counts").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+def main(argv: List[str] | None = None):
+    import argparse
+    from .config import settings
+    from .storage import open_storage
+
+    ap = argparse.ArgumentParser(prog="python -m src.rollups")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    reb = sub.add_parser("rebuild", help="recompute rollups from the configured storage's history")
+    reb.add_argument("--path", default=settings.ROLLUP_PATH)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "rebuild":
+        store, rollups = open_storage(settings), RollupStore(args.path)
+        n = rollups.rebuild(store.iter_rows())
+        print(f"Rebuilt rollups in {args.path} from {n} rows of {store}")
+        store.close()
+        rollups.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import os, random, sqlite3, time
+from typing import Dict, List, Tuple
+
+Boards = Dict[str, List[str]]  # source name -> board slugs / tokens
+
+class Schedule:
+    """When to poll each (source, board) next, persisted in SQLite so a
+    restarted daemon keeps what it learned.
+
+    Every board starts at `interval` seconds. A poll that found new or changed
+    postings shrinks its interval by `FASTER`, one that found nothing grows it
+    by `SLOWER`, within [`min_interval`, `max_interval`]; a failed poll keeps
+    it. The mean request rate is capped at what polling every board each
+    `interval` would cost, so fast-moving boards are polled more often at the
+    expense of quiet ones rather than on top of them. Each next poll time is
+    jittered by ±`jitter` of the interval so boards drift apart.
+    """
+
+    FASTER = 0.5
+    SLOWER = 1.25
+
+    def __init__(self, path: str, interval: float = 3600, min_interval: float = 600,
+                 max_interval: float = 86400, jitter: float = 0.1):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.jitter = jitter
+        self._polled_at: float | None = None  # time of the latest poll not yet committed
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS boards ("
+            " source TEXT NOT NULL, board TEXT NOT NULL, interval REAL NOT NULL,"
+            " next_at REAL NOT NULL, polls INTEGER NOT NULL DEFAULT 0,"
+            " changes INTEGER NOT NULL DEFAULT 0, last_changed_at REAL,"
+            " PRIMARY KEY (source, board))"
+        )
+
+    def sync(self, boards: Boards, now: float | None = None):
+        """Track exactly `boards`: new ones are due now, removed ones are dropped."""
+        now = time.time() if now is None else now
+        wanted = {(s, b) for s, names in boards.items() for b in names}
+        known = set(self._db.execute("SELECT source, board FROM boards"))
+        self._db.executemany("DELETE FROM boards WHERE source = ? AND board = ?", known - wanted)
+        self._db.executemany(
+            "INSERT INTO boards (source, board, interval, next_at) VALUES (?, ?, ?, ?)",
+            [(s, b, self.interval, now) for s, b in sorted(wanted - known)],
+        )
+        self._db.commit()
+
+    def due(self, now: float | None = None) -> Boards:
+        now = time.time() if now is None else now
+        out: Boards = {}
+        for source, board in self._db.execute(
+            "SELECT source, board FROM boards WHERE next_at <= ? ORDER BY next_at", (now,)
+        ):
+            out.setdefault(source, []).append(board)
+        return out
+
+    def next_at(self) -> float | None:
+        return self._db.execute("SELECT MIN(next_at) FROM boards").fetchone()[0]
+
+    def intervals(self) -> Dict[Tuple[str, str], float]:
+        return {(s, b): i for s, b, i in self._db.execute("SELECT source, board, interval FROM boards")}
+
+    def polled(self, source: str, board: str, changed: bool | None, now: float | None = None):
+        """Record a poll: `changed` is whether it found new postings, None if it failed."""
+        now = time.time() if now is None else now
+        row = self._db.execute(
+            "SELECT interval FROM boards WHERE source = ? AND board = ?", (source, board)
+        ).fetchone()
+        if row is None:
+            return
+        interval = row[0]
+        self._polled_at = now if self._polled_at is None else max(self._polled_at, now)
+        if changed is not None:
+            interval *= self.FASTER if changed else self.SLOWER
+            interval = min(self.max_interval, max(self.min_interval, interval))
+        self._db.execute(
+            "UPDATE boards SET interval = ?, next_at = ?, polls = polls + 1,"
+            " changes = changes + ?, last_changed_at = CASE WHEN ? THEN ? ELSE last_changed_at END"
+            " WHERE source = ? AND board = ?",
+            (interval, now + self._jittered(interval), int(bool(changed)), bool(changed), now,
+             source, board),
+        )
+
+    def commit(self, now: float | None = None):
+        """Apply the rate cap and save. `now` defaults to the time of the
+        latest poll recorded since the last commit."""
+        now = now if now is not None else self._polled_at if self._polled_at is not None else time.time()
+        self._rebalance(now)
+        self._db.commit()
+        self._polled_at = None
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _rebalance(self, now: float):
+        # Polls per second may not exceed one per board per base interval.
+        # Pending waits stretch by the same factor as the intervals, so the
+        # cap holds from the polls already scheduled, not only later ones.
+        n, rate = self._db.execute("SELECT COUNT(*), SUM(1.0 / interval) FROM boards").fetchone()
+        if n and rate > n / self.interval:
+            self._db.execute(
+                "UPDATE boards SET interval = MIN(:max, interval * :f),"
+                " next_at = CASE WHEN next_at > :now"
+                " THEN :now + (next_at - :now) * MIN(:max, interval * :f) / interval ELSE next_at END",
+                {"max": self.max_interval, "f": rate * self.interval / n, "now": now})
+
+    def close(self):
+        self.commit()
+        self._db.close()
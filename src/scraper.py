@@ -1,60 +1,536 @@
 from __future__ import annotations
-from collections import Counter
-from typing import List, Dict
-from .config import settings
-from .skills import extract_skills
-from .parsers import normalize_posting
-from .storage import append_rows
-from .alerts import maybe_alert
-from .sources.company_rss import CompanyRSSSource
-from .sources.lever import LeverSource
-from .sources.greenhouse import GreenhouseSource
-
-def collect() -> List[Dict]:
-    rows: List[Dict] = []
-
-    # Enable sources as available:
-    sources = []
-
-    # Lever (public postings API)
-    if settings.lever_list:
-        sources.append(LeverSource(settings.lever_list))
-
-    # Greenhouse (public job board API)
-    if settings.greenhouse_list:
-        sources.append(GreenhouseSource(settings.greenhouse_list))
-
-    # (Optional) keep RSS if you add real feeds
-    # sources.append(CompanyRSSSource())
-
-    if not sources:
-        print("No sources configured. Set LEVER_COMPANIES or GREENHOUSE_BOARDS in .env")
-        return rows
+import argparse, logging, signal, threading, time
+from datetime import datetime, timezone
+from collections import Counter, deque
+from itertools import islice
+from time import perf_counter
+from typing import TYPE_CHECKING, List, Dict, Iterable, Iterator
+from .config import Settings, settings
+from .metrics import Metrics, NO_METRICS
+from .skills import extract_skills, get_matcher
+from .parsers import normalize_posting, raw_description
+from .storage import Storage, open_storage, posting_key
+from .extraction_cache import ExtractionCache
+from .rollups import RollupStore
+from .texts import TextArchive
+from .discovery import Discovery
+from .scheduler import Boards, Schedule
+from .shards import parse_shard, save_shard_counts, shard_boards, shard_settings
+from .sources import registry
+
+# Sources, HTTP (requests), process pools and alerting (smtplib) are imported
+# where first needed, so a run with nothing to do starts almost instantly
+if TYPE_CHECKING:
+    from .sources.http import HttpClient
+
+log = logging.getLogger(__name__)
+
+# Functions below taking `s` use those settings (e.g. narrowed to one shard),
+# or the module's `settings` when it is None
+
+def configured_boards(s: Settings | None = None) -> Boards:
+    """Every configured board, or just this process's slice with SHARD set."""
+    s = s or settings
+    boards = s.boards
+    if s.SHARD:
+        boards = shard_boards(boards, *parse_shard(s.SHARD))
+    return boards
+
+def build_sources(client: HttpClient, boards: Boards | None = None, s: Settings | None = None) -> List:
+    """One source per name with boards (by default every configured board),
+    each imported from the registry only now."""
+    s = s or settings
+    boards = configured_boards(s) if boards is None else boards
+    return [registry.create(name, names, client, s) for name, names in boards.items() if names]
+
+def close_sources(sources: List):
+    """Release what sources hold besides the shared client (e.g. caches);
+    `close` is optional for third-party sources."""
+    for source in sources:
+        close = getattr(source, "close", None)
+        if close is not None:
+            close()
+
+def no_boards_message(s: Settings | None = None) -> str:
+    s = s or settings
+    if s.SHARD:
+        return f"No boards fall in shard {s.SHARD}"
+    return "No sources configured. Set LEVER_COMPANIES, GREENHOUSE_BOARDS or SOURCE_BOARDS in .env"
 
+def fetch_raw(sources: Iterable) -> Iterator[Dict]:
     for source in sources:
         for raw in source.fetch():
             raw["source"] = getattr(source, "name", "unknown")
+            yield raw
+
+def _skill_set(skills: List[str]) -> frozenset:
+    return frozenset(s.strip().lower() for s in skills if s.strip())
+
+def _extract_one(raw: Dict, skills: List[str], wanted: frozenset,
+                 cache: ExtractionCache | None, spent: List[float]) -> Dict:
+    """Normalize one raw posting and find its skills, adding the seconds spent
+    normalizing / extracting to `spent`."""
+    t0 = perf_counter()
+    if cache is None:
+        norm = normalize_posting(raw)
+        t1 = perf_counter()
+        norm["skills"] = extract_skills(norm["text"], whitelist=skills)
+    else:
+        norm = normalize_posting(raw, with_text=False)
+        t1 = perf_counter()
+        entry, found = cache.lookup(norm["content_hash"], wanted)
+        if found is None:
+            t = perf_counter()
             norm = normalize_posting(raw)
-            norm["skills"] = extract_skills(norm["text"], whitelist=settings.skills)
-            rows.append(norm)
-    return rows
+            t1 += perf_counter() - t
+            # Only scan for the skills the cached entry hasn't been checked for
+            todo = sorted(wanted - entry.checked) if entry else sorted(wanted)
+            new = extract_skills(norm["text"], whitelist=todo) if todo else []
+            cache.record(norm["content_hash"], frozenset(todo), new, entry)
+            found = sorted(set(new) | ((entry.found & wanted) if entry else set()))
+        norm["skills"] = found
+    spent[0] += t1 - t0
+    spent[1] += perf_counter() - t1
+    return norm
 
-def main():
-    rows = collect()
-    if not rows:
-        print("No rows collected; check your sources/config.")
+def _observe_extraction(metrics: Metrics, spent: List[float], n: int):
+    if n:
+        metrics.observe("normalize", spent[0], n)
+        metrics.observe("extract", spent[1], n)
+
+def extract(raws: Iterable[Dict], skills: List[str], cache: ExtractionCache | None = None,
+            metrics: Metrics | None = None) -> Iterator[Dict]:
+    """Normalize raw postings and extract their skills. With a `cache`,
+    descriptions seen before skip HTML stripping and matching entirely."""
+    wanted, spent, n = _skill_set(skills), [0.0, 0.0], 0
+    try:
+        for raw in raws:
+            norm = _extract_one(raw, skills, wanted, cache, spent)
+            norm["description"] = raw_description(raw)
+            n += 1
+            yield norm
+    finally:
+        _observe_extraction(metrics or NO_METRICS, spent, n)
+
+# Skill list of a pool worker, sent once through the pool initializer
+_worker_skills: List[str] = []
+
+def _init_worker(skills: List[str]):
+    global _worker_skills
+    _worker_skills = skills
+    get_matcher(skills)  # compile the matcher once per worker
+
+def _extract_batch(raws: List[Dict]) -> tuple[List[Dict], List[float]]:
+    # The parent keeps each raw description; don't ship it back
+    wanted, spent = _skill_set(_worker_skills), [0.0, 0.0]
+    return [_extract_one(raw, _worker_skills, wanted, None, spent) for raw in raws], spent
+
+def extract_parallel(raws: Iterable[Dict], skills: List[str], workers: int,
+                     batch_size: int = 200, cache: ExtractionCache | None = None,
+                     metrics: Metrics | None = None) -> Iterator[Dict]:
+    """`extract` on a process pool. Raw postings go out in batches, at most
+    2 * workers batches are in flight, and rows come back in input order, so
+    the output is identical to the serial path. With a `cache`, hits are
+    resolved here and only the misses are sent to the pool."""
+    metrics = metrics or NO_METRICS
+    wanted = _skill_set(skills)
+
+    def resolve(batch: List[Dict]):
+        if cache is None:
+            return [None] * len(batch), batch
+        done, todo = [], []
+        with metrics.timer("cache_lookup"):
+            for raw in batch:
+                norm = normalize_posting(raw, with_text=False)
+                entry, found = cache.lookup(norm["content_hash"], wanted)
+                if found is not None:
+                    norm["skills"] = found
+                    done.append(norm)
+                else:
+                    done.append(None)
+                    todo.append(raw)
+        return done, todo
+
+    def merge(batch: List[Dict], done: List[Dict | None], fut) -> List[Dict]:
+        extracted, spent = fut.result() if fut is not None else ([], [0.0, 0.0])
+        _observe_extraction(metrics, spent, len(extracted))
+        it = iter(extracted)
+        rows = [d if d is not None else next(it) for d in done]
+        for raw, row in zip(batch, rows):
+            row["description"] = raw_description(raw)
+        if cache is not None:
+            for d, row in zip(done, rows):
+                if d is None:
+                    h = row["content_hash"]
+                    cache.record(h, wanted, row["skills"], cache.get(h))
+        return rows
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(skills,)) as pool:
+        pending: deque = deque()
+        for batch in batched(raws, batch_size):
+            done, todo = resolve(batch)
+            pending.append((batch, done, pool.submit(_extract_batch, todo) if todo else None))
+            if len(pending) >= workers * 2:
+                yield from merge(*pending.popleft())
+        while pending:
+            yield from merge(*pending.popleft())
+
+def batched(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+def make_client(metrics: Metrics | None = None, s: Settings | None = None) -> HttpClient:
+    """The pooled client shared by every source, configured from settings."""
+    from .sources.http import HttpClient, ResponseCache
+    s = s or settings
+    return HttpClient(s.USER_AGENT, concurrency=s.HTTP_CONCURRENCY,
+                      min_interval=s.HTTP_MIN_INTERVAL, max_rate=s.HTTP_MAX_RATE,
+                      burst=s.HTTP_BURST, retries=s.HTTP_RETRIES,
+                      backoff=s.HTTP_BACKOFF, max_retry_after=s.HTTP_MAX_RETRY_AFTER,
+                      cache=ResponseCache(s.HTTP_CACHE) if s.HTTP_CACHE else None,
+                      skip_unchanged=s.HTTP_CACHE_UNCHANGED == "skip", metrics=metrics)
+
+def make_extraction_cache(s: Settings | None = None) -> ExtractionCache | None:
+    s = s or settings
+    if not s.EXTRACT_CACHE:
+        return None
+    return ExtractionCache(s.EXTRACT_CACHE, s.EXTRACT_CACHE_MAX_ENTRIES)
+
+def extract_all(sources: List, workers: int, xcache: ExtractionCache | None,
+                metrics: Metrics, s: Settings | None = None) -> Iterator[Dict]:
+    skills = (s or settings).skills
+    if workers > 1:
+        return extract_parallel(fetch_raw(sources), skills, workers, cache=xcache, metrics=metrics)
+    return extract(fetch_raw(sources), skills, cache=xcache, metrics=metrics)
+
+def collect(workers: int = 0, metrics: Metrics | None = None, s: Settings | None = None) -> Iterator[Dict]:
+    """Stream normalized postings (with skills) from every configured source.
+    With `workers` > 1, normalization and skill extraction run on that many
+    processes. Unchanged descriptions reuse their skills from EXTRACT_CACHE."""
+    metrics = metrics or NO_METRICS
+    s = s or settings
+    boards = configured_boards(s)
+    if not any(boards.values()):
+        print(no_boards_message(s))
         return
+    client = make_client(metrics, s)
+    xcache = make_extraction_cache(s)
+    sources: List = []
+    try:
+        sources = build_sources(client, boards, s)
+        yield from extract_all(sources, workers, xcache, metrics, s)
+        if client.cache:
+            print(f"HTTP cache: {client.cache.stats}")
+            for name, value in vars(client.cache.stats).items():
+                metrics.inc(f"http_cache_{name}", value)
+        if xcache is not None:
+            print(f"Extraction cache: {xcache.stats}")
+            for name, value in vars(xcache.stats).items():
+                metrics.inc(f"extract_cache_{name}", value)
+    finally:
+        close_sources(sources)
+        client.close()
+        if xcache is not None:
+            xcache.close()
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
 
-    append_rows(settings.OUTPUT_CSV, rows)
-    print(f"Wrote {len(rows)} rows to {settings.OUTPUT_CSV}")
+class DaySkills:
+    """Skills of the distinct postings stored or seen again on one UTC day.
+    The daemon polls each board many times a day; counting every poll would
+    inflate the mentions alerts compare against one-shot runs."""
 
-    counts = Counter()
-    for r in rows:
-        for s in r.get("skills", []):
-            counts[s] += 1
+    def __init__(self, day: str):
+        self.day = day
+        self._skills: Dict[str, List[str]] = {}
+
+    def add(self, rows: Iterable[Dict]):
+        for r in rows:
+            self._skills[posting_key(r)] = r.get("skills", [])
+
+    def counts(self) -> Counter:
+        return Counter(s for skills in self._skills.values() for s in skills)
+
+class Sink:
+    """Writes rows in batches as they stream in: each flush goes to storage
+    (and the rollups and text archive) right away, so a crash late in a run
+    keeps every batch already flushed. Skill counts are kept as rows pass
+    through."""
+
+    def __init__(self, store: Storage, rollups: RollupStore | None = None,
+                 texts: TextArchive | None = None, metrics: Metrics | None = None,
+                 discovery: Discovery | None = None):
+        self.store = store
+        self.rollups = rollups
+        self.texts = texts
+        self.discovery = discovery
+        self.metrics = metrics or NO_METRICS
+        self.counts: Counter = Counter()
+        self.changed: Counter = Counter()  # written rows per (source, board)
+        self.seen = 0
+        self.written = 0
+        self.today: DaySkills | None = None  # set by serve, for the daily alert
+
+    def write(self, batch: List[Dict]):
+        for r in batch:
+            self.counts.update(r.get("skills", []))
+        if self.today is not None:
+            self.today.add(batch)
+        self.seen += len(batch)
+        with self.metrics.timer("store"):
+            written = self.store.write(batch)
+        self.written += len(written)
+        # By the board the schedule knows it as; sources without one use company
+        self.changed.update((r.get("source"), r.get("board") or r.get("company")) for r in written)
+        if self.rollups is not None:
+            with self.metrics.timer("rollups"):
+                self.rollups.add(written)
+        if self.texts is not None:
+            with self.metrics.timer("archive"):
+                self.texts.add(written)
+        if self.discovery is not None:
+            # Like the rollups, only new or changed postings: repeat polls don't inflate term counts
+            with self.metrics.timer("discovery"):
+                self.discovery.add(written)
+
+    def close(self):
+        self.store.close()
+        if self.rollups is not None:
+            self.rollups.close()
+        if self.texts is not None:
+            self.texts.close()
+        if self.discovery is not None:
+            self.discovery.close()
+
+def open_discovery(s: Settings | None = None) -> Discovery | None:
+    s = s or settings
+    if not s.DISCOVERY_PATH:
+        return None
+    return Discovery(s.DISCOVERY_PATH, s.DISCOVERY_WIDTH, s.DISCOVERY_DEPTH, s.DISCOVERY_TERMS)
+
+def open_sink(metrics: Metrics | None = None, s: Settings | None = None) -> Sink:
+    s = s or settings
+    return Sink(open_storage(s),
+                RollupStore(s.ROLLUP_PATH) if s.ROLLUP_PATH else None,
+                TextArchive(s.TEXT_ARCHIVE) if s.TEXT_ARCHIVE else None,
+                metrics, open_discovery(s))
+
+def run(rows: Iterable[Dict], sink: Sink, batch_size: int) -> Sink:
+    try:
+        for batch in batched(rows, batch_size):
+            sink.write(batch)
+    finally:
+        sink.close()
+    return sink
+
+def write_metrics(metrics: Metrics, s: Settings | None = None, **extra) -> Dict | None:
+    """Append the run report to METRICS_REPORT and rewrite METRICS_PROM."""
+    if not metrics.enabled:
+        return None
+    s = s or settings
+    record = metrics.report(**extra)
+    if s.METRICS_REPORT:
+        metrics.write_report(s.METRICS_REPORT, **extra)
+    if s.METRICS_PROM:
+        metrics.write_prometheus(s.METRICS_PROM)
+    return record
+
+def run_once(sink: Sink, workers: int = 0, s: Settings | None = None, **extra) -> Sink:
+    """One collection of every configured board into `sink` (closed at the
+    end), then the run report from `sink.metrics`."""
+    s = s or settings
+    metrics = sink.metrics
+    status = "error"
+    try:
+        run(collect(workers, metrics, s), sink, s.BATCH_SIZE)
+        status = "ok"
+    finally:
+        metrics.inc("postings_seen", sink.seen)
+        metrics.inc("postings_written", sink.written)
+        write_metrics(metrics, s, status=status, workers=workers, store=str(sink.store),
+                      shard=s.SHARD or None, **extra)
+    return sink
+
+def alert(counts: Dict[str, int], s: Settings | None = None, day: str | None = None) -> List:
+    """Spikes in a run's (or with `day`, that day's) skill counts. A shard
+    sees only its slice of the boards, so it leaves its counts for
+    `python -m src.shards merge` to combine and alert on once."""
+    s = s or settings
+    if s.SHARD:
+        save_shard_counts(s, counts, day)
+        return []
+    from .alerts import run_alerts
+    return run_alerts(counts, s, day)
+
+def _alert_on_new_day(sink: Sink, s: Settings):
+    """Once the UTC day rolls over, alert on the day just finished."""
+    day = utc_day()
+    if sink.today is None or day == sink.today.day:
+        return
+    done, sink.today = sink.today, DaySkills(day)
+    try:
+        spikes = alert(done.counts(), s, done.day)
+        if spikes:
+            log.info("spikes on %s: %s", done.day, "; ".join(map(str, spikes)))
+    except Exception:
+        log.exception("alerts for %s failed", done.day)
+
+def poll(due: Boards, client: HttpClient, sink: Sink, schedule: Schedule,
+         xcache: ExtractionCache | None, workers: int = 0, s: Settings | None = None) -> Metrics:
+    """One daemon pass: fetch the `due` boards into the open `sink` and
+    reschedule each by whether it had new or changed postings."""
+    s = s or settings
+    # Always on: per-board errors tell a failed poll from a quiet board
+    metrics = Metrics()
+    client.metrics = sink.metrics = metrics
+    seen, written = sink.seen, sink.written
+    sink.changed.clear()
+    status = "error"
+    sources: List = []
+    try:
+        sources = build_sources(client, due, s)
+        for batch in batched(extract_all(sources, workers, xcache, metrics, s), s.BATCH_SIZE):
+            sink.write(batch)
+        status = "ok"
+    finally:
+        close_sources(sources)
+        if xcache is not None:
+            xcache.flush()
+        if sink.discovery is not None:
+            sink.discovery.flush()
+        now = time.time()
+        for source, boards in due.items():
+            for board in boards:
+                failed = status != "ok" or metrics.total("errors", source=source, board=board) > 0
+                schedule.polled(source, board, None if failed else sink.changed[(source, board)] > 0, now)
+        schedule.commit()
+        metrics.inc("postings_seen", sink.seen - seen)
+        metrics.inc("postings_written", sink.written - written)
+        if s.METRICS_REPORT or s.METRICS_PROM:
+            write_metrics(metrics, s, status=status, mode="serve", workers=workers,
+                          boards=sum(map(len, due.values())), store=str(sink.store))
+    log.info("polled %d boards: %d rows, %d new/changed", sum(map(len, due.values())),
+             sink.seen - seen, sink.written - written)
+    return metrics
+
+def serve(stop: threading.Event | None = None, workers: int = 0, max_passes: int | None = None,
+          s: Settings | None = None):
+    """Poll each configured board on its own adaptive schedule (see
+    `Schedule`) until `stop` is set, keeping the HTTP session, caches and
+    storage open between passes. A pass in progress finishes before stopping.
+    Spike alerts run once a day, when the UTC day rolls over, on the skills
+    of the distinct postings seen that day."""
+    s = s or settings
+    stop = stop or threading.Event()
+    schedule = Schedule(s.SCHEDULE_PATH, s.SERVE_INTERVAL,
+                        s.SERVE_MIN_INTERVAL, s.SERVE_MAX_INTERVAL, s.SERVE_JITTER)
+    schedule.sync(configured_boards(s))
+    if schedule.next_at() is None:
+        print(no_boards_message(s))
+        schedule.close()
+        return
+    client, xcache, sink = make_client(s=s), make_extraction_cache(s), open_sink(s=s)
+    sink.today = DaySkills(utc_day())
+    passes = 0
+    try:
+        while not stop.is_set():
+            _alert_on_new_day(sink, s)
+            due = schedule.due()
+            if not due:
+                # Wake up periodically anyway so a stop request is never missed for long
+                stop.wait(min(60.0, max(0.0, schedule.next_at() - time.time())))
+                continue
+            try:
+                poll(due, client, sink, schedule, xcache, workers, s)
+            except Exception:
+                log.exception("poll failed; boards rescheduled")
+            _alert_on_new_day(sink, s)
+            passes += 1
+            if max_passes is not None and passes >= max_passes:
+                break
+    finally:
+        sink.close()
+        client.close()
+        if xcache is not None:
+            xcache.close()
+        schedule.close()
+        log.info("stopped after %d passes", passes)
+
+def _stop_on_signals(stop: threading.Event):
+    def handler(signum, frame):
+        log.info("received %s, stopping after the current pass", signal.Signals(signum).name)
+        stop.set()
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
+
+def _profile_summary(path: str, limit: int = 15):
+    import pstats
+    print(f"Profile written to {path}; top {limit} by cumulative time:")
+    pstats.Stats(path).sort_stats("cumulative").print_stats(limit)
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m src.scraper")
+    ap.add_argument("command", nargs="?", default="run", choices=("run", "serve"),
+                    help="run: one collection of every board (default); "
+                         "serve: keep polling each board on its own adaptive schedule")
+    ap.add_argument("--workers", type=int, default=settings.WORKERS,
+                    help="processes for normalization + skill extraction (default: serial)")
+    ap.add_argument("--shard", metavar="i/N", default=settings.SHARD,
+                    help="take only shard i of N (boards split by a stable hash), writing to "
+                         "per-shard segment files; combine them with `python -m src.shards merge`")
+    ap.add_argument("--profile", metavar="PATH",
+                    help="profile the run with cProfile and write pstats to PATH "
+                         "(main thread only; fetch threads and workers are not traced)")
+    args = ap.parse_args(argv)
+    s = settings
+    if args.shard:
+        try:
+            i, n = parse_shard(args.shard)
+        except ValueError as e:
+            ap.error(str(e))
+        s = shard_settings(settings, i, n)
+
+    if args.command == "serve":
+        stop = threading.Event()
+        _stop_on_signals(stop)
+        serve(stop, args.workers, s=s)
+        return
+    if not any(configured_boards(s).values()):
+        print(no_boards_message(s))  # before opening any store, cache or connection
+        return
+
+    metrics = Metrics(enabled=bool(s.METRICS_REPORT or s.METRICS_PROM))
+    sink = open_sink(metrics, s)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    try:
+        if profiler:
+            profiler.enable()
+        run_once(sink, args.workers, s)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+    if profiler:
+        _profile_summary(args.profile)
+    if metrics.enabled:
+        stages = ", ".join(f"{k} {v:.2f}s" for k, v in sorted(metrics.stage_totals().items()))
+        errors = int(metrics.total("errors"))
+        print(f"Stages: {stages or 'none'}" + (f"; {errors} errors (see the run report)" if errors else ""))
+    if not sink.seen:
+        print("No rows collected; check your sources/config.")
+        return
+    print(f"Wrote {sink.written} new/changed rows to {sink.store} ({sink.seen - sink.written} unchanged)")
 
-    maybe_alert(counts, settings.ALERT_TARGET_SKILL, settings.ALERT_MIN_MENTIONS,
-                settings.EMAIL_FROM, settings.EMAIL_TO, settings.EMAIL_APP_PASSWORD)
+    spikes = alert(sink.counts, s)
+    if spikes:
+        print("Spikes: " + "; ".join(map(str, spikes)))
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     main()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+import argparse, hashlib, json, os, sqlite3
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from .config import Settings, settings
+from .discovery import Discovery
+from .rollups import RollupStore
+from .storage import open_storage, posting_fingerprint, posting_key
+from .texts import TextArchive
+
+# Settings holding a file or directory each shard keeps for itself. Shards
+# never share a writable file, so N of them can run at once on one machine
+# (or on N machines sharing a disk) without locking. A shard's ALERT_STATE
+# segment only names where it leaves its skill counts (see save_shard_counts);
+# alerts and term discovery need every board, so they run once, at merge.
+SEGMENT_PATHS = (
+    "OUTPUT_CSV", "SQLITE_PATH", "PARQUET_ROOT", "POSTING_INDEX", "ROLLUP_PATH", "TEXT_ARCHIVE",
+    "HTTP_CACHE", "EXTRACT_CACHE", "GREENHOUSE_CONTENT_CACHE", "SCHEDULE_PATH", "METRICS_PROM", "ALERT_STATE",
+)
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """"i/N" -> (i, N), with 0 <= i < N."""
+    try:
+        i, n = (int(p) for p in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {spec!r}") from None
+    if not 0 <= i < n:
+        raise ValueError(f"shard index must be in [0, {n}), got {spec!r}")
+    return i, n
+
+def shard_of(source: str, board: str, n: int) -> int:
+    """Stable shard of a board: the same on every machine and Python run
+    (unlike `hash`), so each board always lands on the same shard."""
+    digest = hashlib.sha1(f"{source}:{board.strip().lower()}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n
+
+def shard_boards(boards: Dict[str, List[str]], i: int, n: int) -> Dict[str, List[str]]:
+    return {source: [b for b in names if shard_of(source, b, n) == i]
+            for source, names in boards.items()}
+
+def segment_path(path: str, i: int, n: int) -> str:
+    """`data/jobs.csv` -> `data/jobs.shard-1-of-4.csv` (directories get the suffix too)."""
+    if not path or path == ":memory:":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{i}-of-{n}{ext}"
+
+def shard_settings(base: Settings, i: int, n: int) -> Settings:
+    """`base` narrowed to shard i of n: its boards only, its own segment files."""
+    return replace(base, SHARD=f"{i}/{n}", DISCOVERY_PATH="",
+                   **{name: segment_path(getattr(base, name), i, n) for name in SEGMENT_PATHS})
+
+def counts_path(s: Settings) -> str:
+    """`data/alerts.shard-1-of-4.sqlite` -> `data/alerts.shard-1-of-4.counts.json`."""
+    return os.path.splitext(s.ALERT_STATE)[0] + ".counts.json" if s.ALERT_STATE else ""
+
+def save_shard_counts(s: Settings, counts: Dict[str, int], day: str | None = None):
+    """Leave a shard run's skill counts for `merge_alerts`; a later run on
+    the same day replaces them, as it would in the alert state."""
+    path = counts_path(s)
+    if not path:
+        return
+    day = day or datetime.now(timezone.utc).date().isoformat()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"day": day, "counts": dict(counts)}, f)
+    os.replace(path + ".tmp", path)
+
+def data_path(s: Settings) -> str:
+    """Where the selected storage backend keeps its postings."""
+    return {"csv": s.OUTPUT_CSV, "sqlite": s.SQLITE_PATH, "parquet": s.PARQUET_ROOT}[s.STORAGE_BACKEND]
+
+class MergeLedger:
+    """Every posting version ((key, fingerprint) pair) already folded into a
+    unified store. Segments keep history, so an edited posting appears once
+    per version; the ledger makes each version go in exactly once, however
+    often a merge is repeated."""
+
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS merged (key TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+                         " PRIMARY KEY (key, fingerprint)) WITHOUT ROWID")
+
+    def known(self, versions: List[tuple]) -> set:
+        """Those of `versions` already merged."""
+        keys = sorted({k for k, _ in versions})
+        found = set()
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[i:i + self.LOOKUP_CHUNK]
+            found.update(self._db.execute(
+                f"SELECT key, fingerprint FROM merged WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+        return found & set(versions)
+
+    def add(self, versions: List[tuple]):
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO merged (key, fingerprint) VALUES (?, ?)", versions)
+
+    def clear(self):
+        with self._db:
+            self._db.execute("DELETE FROM merged")
+
+    def close(self):
+        self._db.close()
+
+def ledger_path(s: Settings) -> str:
+    """`data/jobs.csv` -> `data/jobs.csv.merged.sqlite`, next to the unified store."""
+    return data_path(s) + ".merged.sqlite"
+
+def _distinct_keys(rows: List[Dict]) -> List[List[Dict]]:
+    """Split `rows` into runs where no posting appears twice, keeping order:
+    a store takes only the last version of a posting within one write."""
+    runs, keys = [[]], set()
+    for r in rows:
+        k = posting_key(r)
+        if k in keys:
+            runs.append([])
+            keys = set()
+        runs[-1].append(r)
+        keys.add(k)
+    return runs
+
+def _with_descriptions(rows: List[Dict], texts: TextArchive) -> List[Dict]:
+    # Stored rows don't carry their description; term discovery needs it
+    for r in rows:
+        h = texts.content_hash(r.get("posting_key") or posting_key(r), r.get("fetched_at"))
+        raw = texts.raw(h) if h else None
+        if raw:
+            (field, body), = raw.items()
+            r["description"] = (field.removeprefix("description_"), body)
+    return rows
+
+def merge(base: Settings, n: int, batch_size: int = 10000) -> Tuple[int, int]:
+    """Fold the segments of all `n` shards into the unified dataset of `base`,
+    then rebuild its rollups and merge the text archives. Rows new to the
+    unified store are counted for term discovery here, over every shard at
+    once (which needs TEXT_ARCHIVE for their descriptions). Every version
+    of an edited posting is merged, in segment order, and exactly once: a
+    ledger next to the unified store records the versions already folded
+    in, so repeating a merge writes nothing new.
+    Returns (segment rows read, rows new or changed in the unified store)."""
+    base = replace(base, SHARD="")
+    fresh_store = not os.path.exists(data_path(base))
+    store = open_storage(base)
+    ledger = MergeLedger(ledger_path(base))
+    if fresh_store:
+        ledger.clear()  # the unified store was removed: merge everything again
+    texts = TextArchive(base.TEXT_ARCHIVE) if base.TEXT_ARCHIVE else None
+    discovery = None
+    if base.DISCOVERY_PATH and texts is not None:
+        discovery = Discovery(base.DISCOVERY_PATH, base.DISCOVERY_WIDTH, base.DISCOVERY_DEPTH,
+                              base.DISCOVERY_TERMS)
+    read = written = 0
+
+    def flush(batch: List[Dict]):
+        nonlocal read, written
+        versions = [(posting_key(r), posting_fingerprint(r)) for r in batch]
+        done = ledger.known(versions)
+        todo = []
+        for r, v in zip(batch, versions):
+            if v not in done:
+                done.add(v)  # a repeat within the batch goes in once too
+                todo.append(r)
+        for run in _distinct_keys(todo):
+            if run:
+                fresh = store.write(run)
+                written += len(fresh)
+                if discovery is not None:
+                    discovery.add(_with_descriptions(fresh, texts))
+        ledger.add(versions)
+        read += len(batch)
+
+    try:
+        for i in range(n):
+            seg = shard_settings(base, i, n)
+            if not os.path.exists(data_path(seg)):
+                continue
+            if texts is not None and os.path.exists(seg.TEXT_ARCHIVE):
+                texts.merge(seg.TEXT_ARCHIVE)
+            seg_store = open_storage(seg)
+            try:
+                batch: List[Dict] = []
+                for r in seg_store.iter_rows():
+                    batch.append(r)
+                    if len(batch) >= batch_size:
+                        flush(batch)
+                        batch = []
+                if batch:
+                    flush(batch)
+            finally:
+                seg_store.close()
+        if base.ROLLUP_PATH:
+            # Rebuilt from the merged rows, so a board that moved between
+            # shards (N changed) is still counted once
+            rollups = RollupStore(base.ROLLUP_PATH)
+            rollups.rebuild(store.iter_rows())
+            rollups.close()
+    finally:
+        store.close()
+        ledger.close()
+        if texts is not None:
+            texts.close()
+        if discovery is not None:
+            discovery.close()
+    return read, written
+
+def merge_alerts(base: Settings, n: int) -> List:
+    """Run the spike alerts once on the skill counts of the latest day's
+    shard runs, summed over every shard. Returns the spikes found."""
+    runs = []
+    for i in range(n):
+        path = counts_path(shard_settings(base, i, n))
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                runs.append(json.load(f))
+    if not runs:
+        return []
+    day = max(r["day"] for r in runs)
+    counts: Dict[str, int] = {}
+    for r in runs:
+        if r["day"] == day:
+            for skill, c in r["counts"].items():
+                counts[skill] = counts.get(skill, 0) + c
+    from .alerts import run_alerts
+    return run_alerts(counts, replace(base, SHARD=""), day)
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m src.shards")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    mer = sub.add_parser("merge", help="fold every shard's segment into the unified dataset + rollups")
+    mer.add_argument("--shards", type=int, required=True, help="N, the shard count the scrapers ran with")
+    show = sub.add_parser("show", help="list which shard each configured board belongs to")
+    show.add_argument("--shards", type=int, required=True)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "merge":
+        read, written = merge(settings, args.shards)
+        print(f"Merged {read} rows from {args.shards} shard segments into "
+              f"{data_path(settings)} ({written} new/changed)")
+        spikes = merge_alerts(settings, args.shards)
+        if spikes:
+            print("Spikes: " + "; ".join(map(str, spikes)))
+    elif args.cmd == "show":
+        boards = settings.boards
+        for i in range(args.shards):
+            mine = shard_boards(boards, i, args.shards)
+            print(f"{i}/{args.shards}: " + ", ".join(f"{s}:{b}" for s, names in mine.items() for b in names))
+
+if __name__ == "__main__":
+    main()
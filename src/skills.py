@@ -1,6 +1,7 @@
 from __future__ import annotations
 import re
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Iterable, Tuple
 
 # Build a simple case-insensitive mapping of skills -> regex
 CANONICAL_SKILLS = [
@@ -10,17 +11,92 @@ CANONICAL_SKILLS = [
     "mlflow", "dbt", "kafka"
 ]
 
+# Alternate spellings that count as a mention of the canonical skill
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "spark": ["pyspark"],
+    "power bi": ["powerbi"],
+}
+
 SKILL_PATTERNS: Dict[str, re.Pattern] = {
     s: re.compile(rf"\b{re.escape(s)}\b", re.IGNORECASE) for s in CANONICAL_SKILLS
 }
 
+def _trie_regex(terms: Iterable[str]) -> str:
+    """Regex alternation for `terms` with shared prefixes factored out."""
+    trie: dict = {}
+    for t in terms:
+        node = trie
+        for ch in t:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        optional = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+    return emit(trie)
+
+class SkillMatcher:
+    """Finds every tracked skill in a text with a single regex scan.
+
+    Each term keeps the `\\b<term>\\b` semantics of a per-skill search. Matches
+    are found with a lookahead so overlapping terms ("power bi" / "bi") are all
+    reported, and aliases resolve to their canonical skill.
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Dict[str, List[str]] | None = None):
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        self.skills: Tuple[str, ...] = tuple(dict.fromkeys(s.strip().lower() for s in skills if s.strip()))
+        self._canonical: Dict[str, str] = {}
+        for s in self.skills:
+            self._canonical.setdefault(s, s)
+            for alias in aliases.get(s, []):
+                self._canonical.setdefault(alias.strip().lower(), s)
+
+        terms = sorted(self._canonical, key=len, reverse=True)
+        # A longer term matching at a position implies any shorter term that is
+        # itself a whole-word prefix of it ("power bi" implies "power").
+        self._implied: Dict[str, Tuple[str, ...]] = {}
+        for t in terms:
+            implied = {self._canonical[p] for p in terms
+                       if p != t and len(p) < len(t)
+                       and re.match(rf"\b{re.escape(p)}\b", t, re.IGNORECASE)}
+            self._implied[t] = tuple(implied)
+        self._regex = (
+            re.compile(rf"(?=\b({_trie_regex(terms)})\b)", re.IGNORECASE) if terms else None
+        )
+
+    def __call__(self, text: str) -> List[str]:
+        return self.find(text)
+
+    def find(self, text: str) -> List[str]:
+        if not text or self._regex is None:
+            return []
+        found = set()
+        canonical, implied = self._canonical, self._implied
+        for m in self._regex.finditer(text):
+            term = m.group(1).lower()
+            skill = canonical.get(term)
+            if skill is None:
+                continue
+            found.add(skill)
+            found.update(implied[term])
+        return sorted(found)
+
+@lru_cache(maxsize=32)
+def _cached_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+def get_matcher(skills: Iterable[str] | None = None) -> SkillMatcher:
+    """Shared matcher for a skill list, compiled once per distinct list."""
+    return _cached_matcher(tuple(skills or CANONICAL_SKILLS))
+
 def extract_skills(text: str, whitelist: List[str] | None = None) -> List[str]:
     if not text:
         return []
-    targets = whitelist or CANONICAL_SKILLS
-    found = []
-    for s in targets:
-        pat = SKILL_PATTERNS.get(s) or re.compile(rf"\b{re.escape(s)}\b", re.IGNORECASE)
-        if pat.search(text):
-            found.append(s.lower())
-    return sorted(set(found))
+    return get_matcher(whitelist).find(text)
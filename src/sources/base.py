@@ -6,6 +6,7 @@ class BaseSource:
 
     def fetch(self) -> Iterable[Dict[str, Any]]:
         """Yield raw posting dicts with keys:
-        title, company, location, posted_at (iso or None), url, description_html/text
+        title, company, location, posted_at (iso or None), url, description_html/text,
+        and optionally source_id (the board's own job id, used as the posting identity)
         """
         raise NotImplementedError
@@ -1,11 +1,12 @@
 from __future__ import annotations
-import time
+import logging
 from datetime import datetime, timezone
 from typing import Iterable, Dict, Any, List
-import requests
-from bs4 import BeautifulSoup
+from xml.etree import ElementTree
 
+from ..parsers import html_to_text
 from .base import BaseSource
+from .http import HttpClient
 
 RSS_FEEDS: List[str] = [
     # Replace with real company/job RSS feeds you target.
@@ -14,20 +15,28 @@ RSS_FEEDS: List[str] = [
 
 HEADERS = {"User-Agent": "JobSkillsTrendBot/1.0 (+contact@example.com)"}
 
+log = logging.getLogger(__name__)
+
 class CompanyRSSSource(BaseSource):
     name = "company_rss"
 
+    def __init__(self, feeds: List[str] | None = None, client: HttpClient | None = None):
+        self.feeds = list(RSS_FEEDS if feeds is None else feeds)
+        self.client = client or HttpClient(HEADERS["User-Agent"], timeout=20)
+
     def fetch(self) -> Iterable[Dict[str, Any]]:
-        for feed_url in RSS_FEEDS:
+        # Feeds go through the shared client, so per-host pacing, Retry-After
+        # and backoff apply here as they do for the JSON boards.
+        for feed_url, resp in self.client.map(((url, url) for url in self.feeds), source=self.name):
+            if isinstance(resp, Exception):
+                log.warning("company_rss: %s failed: %s", feed_url, resp)
+                continue
             try:
-                resp = requests.get(feed_url, headers=HEADERS, timeout=20)
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, "xml")
-                for item in soup.find_all("item"):
-                    title = (item.title.get_text(strip=True) if item.title else "Untitled")
-                    link = (item.link.get_text(strip=True) if item.link else None)
-                    pubdate = item.pubDate.get_text(strip=True) if item.pubDate else None
-                    desc_html = item.description.get_text() if item.description else ""
+                for item in ElementTree.fromstring(resp.content).iter("item"):
+                    title = (item.findtext("title") or "").strip() or "Untitled"
+                    link = (item.findtext("link") or "").strip() or None
+                    pubdate = (item.findtext("pubDate") or "").strip() or None
+                    desc_html = item.findtext("description") or ""
 
                     yield {
                         "title": title,
@@ -35,11 +44,12 @@ class CompanyRSSSource(BaseSource):
                         "location": None,
                         "posted_at": _to_iso(pubdate),
                         "url": link,
+                        "board": feed_url,
                         "description_html": desc_html,
-                        "description_text": BeautifulSoup(desc_html, "html.parser").get_text(" ", strip=True),
+                        "description_text": html_to_text(desc_html),
                     }
-                time.sleep(1.0)  # politeness
-            except Exception:
+            except Exception as e:
+                log.warning("company_rss: %s failed: %s", feed_url, e)
                 continue
 
 def _to_iso(datestr: str | None) -> str | None:
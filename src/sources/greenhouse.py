@@ -1,40 +1,169 @@
 from __future__ import annotations
-from typing import Iterable, Dict, Any, List
-import os, time, requests
+from typing import Iterable, Dict, Any, List, Tuple
+import html, logging, os, sqlite3, threading
+
+from ..parsers import html_to_text
+from .http import HttpClient
 
 HEADERS = {"User-Agent": os.getenv("USER_AGENT", "JobSkillsTrendBot/1.0")}
 
+log = logging.getLogger(__name__)
+
+# How job descriptions are obtained:
+#   "none"   - listing only; skills are scanned in title + location
+#   "bulk"   - one listing call per board with ?content=true
+#   "detail" - listing without content, then one call per new/updated job (cached)
+CONTENT_MODES = ("none", "bulk", "detail")
+
+def _content_to_text(content: str | None) -> str:
+    # The boards API returns the description as HTML-escaped HTML
+    if not content:
+        return ""
+    return html_to_text(html.unescape(content))
+
+class ContentCache:
+    """Job description text keyed by (board, job id), valid for one `updated_at`."""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS content ("
+            " board TEXT NOT NULL, job_id TEXT NOT NULL, updated_at TEXT, text TEXT NOT NULL,"
+            " PRIMARY KEY (board, job_id))"
+        )
+
+    def get(self, board: str, job_id: Any, updated_at: str | None) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT updated_at, text FROM content WHERE board = ? AND job_id = ?",
+                (board, str(job_id)),
+            ).fetchone()
+        if row is None or row[0] != updated_at:
+            return None
+        return row[1]
+
+    def put(self, board: str, job_id: Any, updated_at: str | None, text: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO content (board, job_id, updated_at, text) VALUES (?, ?, ?, ?)",
+                (board, str(job_id), updated_at, text),
+            )
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
 class GreenhouseSource:
     name = "greenhouse"
+    API_URL = "https://boards-api.greenhouse.io/v1/boards/{token}/jobs"
+    JOB_URL = "https://boards-api.greenhouse.io/v1/boards/{token}/jobs/{job_id}"
 
-    def __init__(self, boards: List[str]):
+    def __init__(self, boards: List[str], client: HttpClient | None = None,
+                 content: str = "none", cache: ContentCache | None = None):
         # boards are Greenhouse board tokens like "airbnb"
+        if content not in CONTENT_MODES:
+            raise ValueError(f"content must be one of {CONTENT_MODES}, got {content!r}")
         self.boards = [b.strip() for b in boards if b.strip()]
+        self.client = client or HttpClient(HEADERS["User-Agent"])
+        self.content = content
+        self.cache = cache
+
+    @classmethod
+    def from_settings(cls, boards: List[str], client: HttpClient, settings) -> "GreenhouseSource":
+        cache = (ContentCache(settings.GREENHOUSE_CONTENT_CACHE)
+                 if settings.GREENHOUSE_CONTENT == "detail" else None)
+        return cls(boards, client=client, content=settings.GREENHOUSE_CONTENT, cache=cache)
+
+    def close(self):
+        """Close the content cache; the client is the caller's to close."""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
 
     def fetch(self) -> Iterable[Dict[str, Any]]:
-        for token in self.boards:
-            url = f"https://boards-api.greenhouse.io/v1/boards/{token}/jobs"
+        suffix = "?content=true" if self.content == "bulk" else ""
+        metrics = self.client.metrics
+        urls = ((token, self.API_URL.format(token=token) + suffix) for token in self.boards)
+        for token, r in self.client.map(urls, source=self.name):
+            if isinstance(r, Exception):
+                log.warning("greenhouse: %s failed: %s", token, r)
+                continue
+            if self.client.unchanged(r):
+                metrics.inc("boards_unchanged", source=self.name, board=token)
+                continue
             try:
-                r = requests.get(url, headers=HEADERS, timeout=30)
-                r.raise_for_status()
                 data = r.json() or {}
-                for job in data.get("jobs", []):
-                    title = job.get("title") or "Untitled"
-                    url_j = job.get("absolute_url")
-                    # Greenhouse puts location as dict with name
-                    loc = (job.get("location") or {}).get("name")
-                    updated = job.get("updated_at")
-                    company = token  # lightweight proxy; you can map tokens -> nice names
-
-                    # Greenhouse job description requires another call for full text; use title+location for skill scan seed
-                    yield {
-                        "title": title,
-                        "company": company,
-                        "location": loc,
-                        "posted_at": updated,
-                        "url": url_j,
-                        "description_text": f"{title} @ {loc or ''}",
-                    }
-                time.sleep(0.5)
-            except Exception:
+            except ValueError as e:
+                metrics.error(e, source=self.name, board=token)
+                log.warning("greenhouse: %s returned invalid JSON: %s", token, e)
                 continue
+            jobs = data.get("jobs", [])
+            metrics.inc("postings_fetched", len(jobs), source=self.name, board=token)
+            if self.content == "detail":
+                yield from self._with_details(token, jobs)
+            else:
+                for job in jobs:
+                    yield self._posting(token, job, _content_to_text(job.get("content")) or None)
+
+    def _with_details(self, token: str, jobs: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        """Attach descriptions to `jobs`, downloading only those not cached for
+        their current `updated_at`. Detail calls share the client's per-host cap."""
+        missing: Dict[Any, Dict[str, Any]] = {}
+        for job in jobs:
+            text = self.cache.get(token, job.get("id"), job.get("updated_at")) if self.cache else None
+            if text is not None or job.get("id") is None:
+                yield self._posting(token, job, text)
+            else:
+                missing[job["id"]] = job
+
+        urls: Iterable[Tuple[Any, str]] = (
+            (job_id, self.JOB_URL.format(token=token, job_id=job_id)) for job_id in missing
+        )
+        for job_id, r in self.client.map(urls, cache=False, source=self.name, board=token):
+            job = missing[job_id]
+            text = None
+            if isinstance(r, Exception):
+                log.warning("greenhouse: %s job %s failed: %s", token, job_id, r)
+            else:
+                try:
+                    detail = r.json() or {}
+                except ValueError as e:
+                    self.client.metrics.error(e, source=self.name, board=token)
+                    log.warning("greenhouse: %s job %s returned invalid JSON: %s", token, job_id, e)
+                else:
+                    text = _content_to_text(detail.get("content"))
+                    if self.cache:
+                        # Keyed by the listing's updated_at, as looked up above; the
+                        # detail endpoint may format or round it differently
+                        self.cache.put(token, job_id, job.get("updated_at"), text)
+            yield self._posting(token, job, text)
+        if self.cache:
+            self.cache.commit()
+
+    def _posting(self, token: str, job: Dict[str, Any], text: str | None) -> Dict[str, Any]:
+        title = job.get("title") or "Untitled"
+        url_j = job.get("absolute_url")
+        # Greenhouse puts location as dict with name
+        loc = (job.get("location") or {}).get("name")
+        updated = job.get("updated_at")
+        company = token  # lightweight proxy; you can map tokens -> nice names
+
+        # Without a description (content mode "none" or a failed detail call),
+        # use title+location as the skill scan seed
+        return {
+            "title": title,
+            "company": company,
+            "location": loc,
+            "posted_at": updated,
+            "url": url_j,
+            "source_id": job.get("id"),
+            "board": token,
+            "description_text": text or f"{title} @ {loc or ''}",
+        }
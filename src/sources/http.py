@@ -0,0 +1,352 @@
+from __future__ import annotations
+import os, random, sqlite3, threading, time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Iterable, Iterator, Tuple, Dict, Any, Hashable
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..metrics import Metrics, NO_METRICS
+
+class _HostGate:
+    """Per-host politeness: at most `concurrency` requests in flight, started
+    from a token bucket holding `burst` tokens refilled at `rate` per second
+    (0 = unlimited).
+
+    The rate adapts: every `INCREASE_AFTER` consecutive successes it grows by
+    `INCREASE` up to `max_rate`; a throttling response cuts it by `DECREASE`
+    (down to `min_rate`) and blocks the host until its Retry-After has passed.
+    """
+
+    INCREASE_AFTER = 10
+    INCREASE = 1.25
+    DECREASE = 0.5
+
+    def __init__(self, concurrency: int, rate: float, max_rate: float | None = None,
+                 burst: int = 1, min_rate: float = 0.2):
+        self.slots = threading.BoundedSemaphore(max(1, concurrency))
+        self.rate = rate
+        self.max_rate = max(rate, max_rate or rate)
+        self.min_rate = min(rate, min_rate)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.blocked_until = 0.0
+        self._stamp = time.monotonic()
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return how long to wait for one."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if not self.rate:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def __enter__(self):
+        self.slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    wait = self._take()
+                if wait <= 0:
+                    return self
+                time.sleep(wait)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def __exit__(self, *exc):
+        self.slots.release()
+
+    def succeeded(self):
+        with self._lock:
+            self._streak += 1
+            if self.rate and self._streak >= self.INCREASE_AFTER:
+                self.rate = min(self.max_rate, self.rate * self.INCREASE)
+                self._streak = 0
+
+    def throttled(self, delay: float):
+        """The host pushed back: slow down and hold every request for `delay` seconds."""
+        with self._lock:
+            self._streak = 0
+            if self.rate:
+                self.rate = max(self.min_rate, self.rate * self.DECREASE)
+                self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+def retry_after(r: requests.Response) -> float | None:
+    """Seconds the server asked us to wait (Retry-After as seconds or an HTTP date)."""
+    value = r.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+@dataclass
+class CacheStats:
+    hits: int = 0         # 304 Not Modified, body replayed from disk
+    misses: int = 0       # full download
+    bytes_saved: int = 0  # cached body bytes not downloaded again
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.bytes_saved / 1024:.1f} KiB saved"
+
+class ResponseCache:
+    """Disk-backed store of response bodies and their validators (ETag /
+    Last-Modified), used to make conditional requests."""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+            " content_type TEXT, body BLOB NOT NULL)"
+        )
+        self.stats = CacheStats()
+
+    def validators(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def replay(self, url: str, r: requests.Response) -> requests.Response | None:
+        """Turn a 304 response into a 200 carrying the cached body; None if
+        there is no cached body for `url`."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_type, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.stats.hits += 1
+            self.stats.bytes_saved += len(row[1])
+        r.status_code = 200
+        r._content = bytes(row[1])
+        if row[0]:
+            r.headers["Content-Type"] = row[0]
+        r.from_cache = True
+        return r
+
+    def store(self, url: str, r: requests.Response):
+        etag, modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        with self._lock:
+            self.stats.misses += 1
+            if not etag and not modified:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, content_type, body)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (url, etag, modified, r.headers.get("Content-Type"), r.content),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class HttpClient:
+    """Pooled HTTP client shared by the sources.
+
+    One `requests.Session` keeps connections alive across boards, and
+    `map` fetches many URLs on a thread pool while each host is limited to
+    `concurrency` in-flight requests. Request starts are paced per host,
+    beginning at one every `min_interval` seconds and adapting between that
+    and `max_rate` per second (see `_HostGate`); `min_interval=0` disables
+    pacing.
+
+    429s, 5xx responses and connection errors are retried up to `retries`
+    times. The wait is the response's Retry-After, else full-jitter
+    exponential backoff from `backoff` seconds. A 429/503 also slows the whole
+    host down. A Retry-After above `max_retry_after` fails the request at once.
+
+    With a `ResponseCache`, requests are made conditional and a 304 is
+    returned as the cached 200 with `response.from_cache = True` (a 304 whose
+    body is no longer cached is fetched again, unconditionally). If
+    `skip_unchanged` is set, sources drop such boards instead of re-parsing them.
+
+    Requests made through `map` are timed (stage "fetch") and their bytes and
+    failures counted in `metrics`, labelled by source and board.
+    """
+
+    RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+    THROTTLE_STATUS = frozenset({429, 503})
+
+    def __init__(self, user_agent: str = "JobSkillsTrendBot/1.0", concurrency: int = 4,
+                 min_interval: float = 0.25, timeout: float = 30, max_workers: int | None = None,
+                 cache: ResponseCache | None = None, skip_unchanged: bool = False,
+                 metrics: Metrics | None = None, max_rate: float | None = None, burst: int = 1,
+                 retries: int = 4, backoff: float = 0.5, max_backoff: float = 30,
+                 max_retry_after: float = 120):
+        self.cache = cache
+        self.metrics = metrics or NO_METRICS
+        self.skip_unchanged = skip_unchanged
+        self.concurrency = max(1, concurrency)
+        self.min_interval = min_interval
+        self.max_rate = max_rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.max_workers = max_workers or self.concurrency * 2
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._gates: Dict[str, _HostGate] = {}
+        self._gates_lock = threading.Lock()
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlsplit(url).netloc
+        with self._gates_lock:
+            gate = self._gates.get(host)
+            if gate is None:
+                rate = 1 / self.min_interval if self.min_interval > 0 else 0.0
+                gate = self._gates[host] = _HostGate(self.concurrency, rate, self.max_rate, self.burst)
+            return gate
+
+    def rates(self) -> Dict[str, float]:
+        """Current request rate per host (req/s; 0 = unpaced)."""
+        with self._gates_lock:
+            return {host: gate.rate for host, gate in self._gates.items()}
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retry(self, gate: _HostGate, url: str, attempt: int, reason: str,
+               delay: float | None = None, throttle: bool = False):
+        delay = self._backoff(attempt) if delay is None else delay
+        self.metrics.inc("retries", host=urlsplit(url).netloc, reason=reason)
+        if throttle:
+            gate.throttled(delay)  # every request to the host waits it out
+        else:
+            time.sleep(delay)
+
+    VALIDATORS = ("If-None-Match", "If-Modified-Since")
+
+    def get(self, url: str, cache: bool = True, conditional: bool = True,
+            **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        cache_ = self.cache if cache else None
+        plain = {k: v for k, v in kwargs.get("headers", {}).items() if k not in self.VALIDATORS}
+        if cache_:
+            kwargs["headers"] = {**cache_.validators(url), **kwargs.get("headers", {})} if conditional else plain
+        gate = self._gate(url)
+        r = self._request(url, gate, kwargs)
+        if cache_ and r.status_code == 304:
+            gate.succeeded()
+            replayed = cache_.replay(url, r)
+            if replayed is not None:
+                return replayed
+            # The body behind our validators is gone (cache pruned or deleted
+            # meanwhile): fetch it in full, once, which caches it again
+            r.close()
+            r = self._request(url, gate, {**kwargs, "headers": plain})
+        if r.status_code == 304:
+            # Not modified without validators to match (or none we can replay)
+            r.close()
+            raise requests.HTTPError(f"304 Not Modified with nothing cached for url: {url}", response=r)
+        r.raise_for_status()
+        gate.succeeded()
+        r.from_cache = False
+        if cache_:
+            cache_.store(url, r)
+        return r
+
+    def _request(self, url: str, gate: _HostGate, kwargs: Dict[str, Any]) -> requests.Response:
+        """One GET through the host gate, retried on connection errors and
+        retryable statuses."""
+        for attempt in range(self.retries + 1):
+            try:
+                with gate:
+                    r = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                self._retry(gate, url, attempt, type(e).__name__)
+                continue
+            if r.status_code not in self.RETRY_STATUS or attempt == self.retries:
+                break
+            delay = retry_after(r)
+            if delay is not None and delay > self.max_retry_after:
+                break
+            r.close()
+            self._retry(gate, url, attempt, str(r.status_code), delay,
+                        throttle=r.status_code in self.THROTTLE_STATUS)
+        return r
+
+    def unchanged(self, r: requests.Response) -> bool:
+        """True when `r` was replayed from cache and the caller may skip it."""
+        return self.skip_unchanged and getattr(r, "from_cache", False)
+
+    def _fetch(self, url: str, cache: bool, labels: Dict[str, Any]) -> requests.Response:
+        with self.metrics.timer("fetch", **labels):
+            r = self.get(url, cache)
+        if self.metrics.enabled and not r.from_cache:
+            self.metrics.inc("bytes_downloaded", len(r.content), **labels)
+        return r
+
+    def map(self, requests_: Iterable[Tuple[Hashable, str]], cache: bool = True,
+            source: str | None = None, board: str | None = None) -> Iterator[Tuple[Hashable, requests.Response | Exception]]:
+        """Fetch `(key, url)` pairs concurrently, yielding `(key, response)` as
+        each finishes. Failures are yielded as the exception instead of raised,
+        so one bad board doesn't stop the stream. At most `2 * max_workers`
+        requests are queued at once. Metrics are labelled with `source` and
+        `board` (by default, each request's key)."""
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch") as pool:
+            it = iter(requests_)
+            pending: Dict[Future, Hashable] = {}
+
+            def fill():
+                for key, url in islice(it, window - len(pending)):
+                    labels = {"source": source, "board": board if board is not None else key}
+                    pending[pool.submit(self._fetch, url, cache, labels)] = key
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    key = pending.pop(fut)
+                    exc = fut.exception()
+                    if exc is not None:
+                        self.metrics.error(exc, source=source, board=board if board is not None else key)
+                    yield key, (exc if exc is not None else fut.result())
+                fill()
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
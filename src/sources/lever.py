@@ -1,11 +1,13 @@
 from __future__ import annotations
 from typing import Iterable, Dict, Any, List
-import os, time
-import requests
-from bs4 import BeautifulSoup  # only to strip HTML if needed
+import logging, os
+
+from .http import HttpClient
 
 HEADERS = {"User-Agent": os.getenv("USER_AGENT", "JobSkillsTrendBot/1.0")}
 
+log = logging.getLogger(__name__)
+
 def _ms_to_iso(ms: int | None) -> str | None:
     if not ms:
         return None
@@ -17,39 +19,52 @@ def _ms_to_iso(ms: int | None) -> str | None:
 
 class LeverSource:
     name = "lever"
+    API_URL = "https://api.lever.co/v0/postings/{company}?mode=json"
 
-    def __init__(self, companies: List[str]):
+    def __init__(self, companies: List[str], client: HttpClient | None = None):
         # companies are Lever account slugs, like "openai"
         self.companies = [c.strip() for c in companies if c.strip()]
+        self.client = client or HttpClient(HEADERS["User-Agent"])
 
     def fetch(self) -> Iterable[Dict[str, Any]]:
-        for comp in self.companies:
-            url = f"https://api.lever.co/v0/postings/{comp}?mode=json"
+        metrics = self.client.metrics
+        urls = ((comp, self.API_URL.format(company=comp)) for comp in self.companies)
+        for comp, r in self.client.map(urls, source=self.name):
+            if isinstance(r, Exception):
+                log.warning("lever: %s failed: %s", comp, r)
+                continue
+            if self.client.unchanged(r):
+                metrics.inc("boards_unchanged", source=self.name, board=comp)
+                continue
             try:
-                r = requests.get(url, headers=HEADERS, timeout=30)
-                r.raise_for_status()
-                for job in r.json():
-                    title = job.get("text") or job.get("title") or "Untitled"
-                    url_j = job.get("hostedUrl") or job.get("applyUrl") or job.get("url")
-                    created = _ms_to_iso(job.get("createdAt"))
-                    # Lever often nests location in "categories"
-                    cats = job.get("categories") or {}
-                    location = (cats.get("location") or "").strip() or None
-                    company = comp
-
-                    # Prefer plain text description if present; else sanitize
-                    desc = job.get("descriptionPlain") or job.get("description") or ""
-                    if "descriptionPlain" not in job and desc:
-                        desc = BeautifulSoup(desc, "html.parser").get_text(" ", strip=True)
-
-                    yield {
-                        "title": title,
-                        "company": company,
-                        "location": location,
-                        "posted_at": created,
-                        "url": url_j,
-                        "description_text": desc,
-                    }
-                time.sleep(0.5)
-            except Exception:
+                jobs = r.json()
+            except ValueError as e:
+                metrics.error(e, source=self.name, board=comp)
+                log.warning("lever: %s returned invalid JSON: %s", comp, e)
                 continue
+            metrics.inc("postings_fetched", len(jobs), source=self.name, board=comp)
+            yield from self._postings(comp, jobs)
+
+    def _postings(self, comp: str, jobs: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        for job in jobs:
+            title = job.get("text") or job.get("title") or "Untitled"
+            url_j = job.get("hostedUrl") or job.get("applyUrl") or job.get("url")
+            created = _ms_to_iso(job.get("createdAt"))
+            # Lever often nests location in "categories"
+            cats = job.get("categories") or {}
+            location = (cats.get("location") or "").strip() or None
+            company = comp
+
+            # Prefer plain text description if present; else normalize_posting
+            # strips the HTML one
+            yield {
+                "title": title,
+                "company": company,
+                "location": location,
+                "posted_at": created,
+                "url": url_j,
+                "source_id": job.get("id"),
+                "board": comp,
+                "description_text": job.get("descriptionPlain") or None,
+                "description_html": job.get("description") or "",
+            }
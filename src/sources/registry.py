@@ -0,0 +1,49 @@
+from __future__ import annotations
+import importlib
+from typing import Any, Dict, List
+
+# Built-in sources as "module:attribute", imported only when configured
+BUILTIN: Dict[str, str] = {
+    "lever": "src.sources.lever:LeverSource",
+    "greenhouse": "src.sources.greenhouse:GreenhouseSource",
+    "company_rss": "src.sources.company_rss:CompanyRSSSource",
+}
+
+# Third-party packages register sources under this entry point group, e.g. in
+# their pyproject.toml:
+#   [project.entry-points."jobskills.sources"]
+#   workable = "jobskills_workable:WorkableSource"
+ENTRY_POINT_GROUP = "jobskills.sources"
+
+_loaded: Dict[str, Any] = {}
+
+def _entry_points() -> Dict[str, Any]:
+    from importlib.metadata import entry_points
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+def available() -> List[str]:
+    """Names of every known source, built-in or installed (nothing is imported)."""
+    return sorted(set(BUILTIN) | set(_entry_points()))
+
+def load(name: str) -> Any:
+    """The source class (or factory) registered as `name`, imported on first use."""
+    if name not in _loaded:
+        if name in BUILTIN:
+            module, _, attr = BUILTIN[name].partition(":")
+            _loaded[name] = getattr(importlib.import_module(module), attr)
+        else:
+            ep = _entry_points().get(name)
+            if ep is None:
+                raise ValueError(f"unknown source {name!r}; available: {', '.join(available())}")
+            _loaded[name] = ep.load()
+    return _loaded[name]
+
+def create(name: str, boards: List[str], client, settings) -> Any:
+    """An instance of source `name` for `boards`. Sources needing more than
+    the board list and the shared client provide a
+    `from_settings(boards, client, settings)` classmethod."""
+    cls = load(name)
+    factory = getattr(cls, "from_settings", None)
+    if factory is not None:
+        return factory(boards, client, settings)
+    return cls(boards, client=client)
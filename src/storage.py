@@ -1,22 +1,735 @@
 from __future__ import annotations
-import os, csv
+import os, csv, hashlib, json, sqlite3
+from collections import deque
 from datetime import datetime, timezone
-from typing import List, Dict
+from itertools import tee
+from typing import List, Dict, Iterable, Iterator, Callable
+
+# Maps stored rows (in order) to an update per row: {"skills": [...],
+# "content_hash": ...}, or None to leave the row as it is.
+Rescan = Callable[[Iterable[Dict]], Iterator[Dict | None]]
 
 def ensure_csv(path: str):
     if not os.path.exists(path):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         with open(path, "w", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             w.writerow(["source","title","company","location","posted_at","url","skills","fetched_at"])
 
 def append_rows(path: str, rows: List[Dict]):
     ensure_csv(path)
+    now = datetime.now(timezone.utc).isoformat()
     with open(path, "a", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         for r in rows:
-            w.writerow([
-                r.get("source"), r.get("title"), r.get("company"), r.get("location"),
-                r.get("posted_at"), r.get("url"), ",".join(r.get("skills", [])),
-                datetime.now(timezone.utc).isoformat()
-            ])
+            w.writerow(_csv_record(r, now))
+
+def _csv_record(r: Dict, now: str) -> list:
+    return [
+        r.get("source"), r.get("title"), r.get("company"), r.get("location"),
+        r.get("posted_at"), r.get("url"), ",".join(r.get("skills", [])),
+        r.get("fetched_at") or now
+    ]
+
+def posting_key(row: Dict) -> str:
+    """Stable identity of a posting: its URL, else the board's job id, else a
+    hash of the fields that describe it. URL comes first because it is the
+    only identifier stored in jobs.csv history."""
+    source = row.get("source") or "unknown"
+    if row.get("url"):
+        return f"{source}:url:{row['url']}"
+    if row.get("source_id") not in (None, ""):
+        return f"{source}:id:{row['source_id']}"
+    basis = "\x1f".join(str(row.get(k) or "") for k in ("company", "title", "location"))
+    return f"{source}:hash:{hashlib.sha1(basis.encode('utf-8')).hexdigest()}"
+
+def posting_fingerprint(row: Dict) -> str:
+    """Hash of the stored content; a new value means the posting changed."""
+    parts = [str(row.get(k) or "") for k in ("title", "company", "location", "posted_at", "url")]
+    parts.append(",".join(row.get("skills", [])))
+    # The raw description's hash when known (text may be skipped on cache hits)
+    parts.append(row.get("content_hash") or row.get("text") or "")
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class PostingIndex:
+    """Persistent map of posting identity -> (fingerprint, first_seen, last_seen).
+
+    Lets ingestion tell new and changed postings apart from ones already
+    stored without rereading the CSV. One file can serve several outputs:
+    `store` names the one this index tracks (e.g. "csv:data/jobs.csv"), so
+    switching backend or output path doesn't skip rows it never received.
+    """
+
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str, store: str = ""):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.store = store
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        cols = [c[1] for c in self._db.execute("PRAGMA table_info(postings)")]
+        with self._db:
+            if cols and "store" not in cols:
+                # Index from before namespacing: adopt it for the first store that opens it
+                self._db.execute("ALTER TABLE postings RENAME TO postings_legacy")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " store TEXT NOT NULL, key TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+                " first_seen TEXT NOT NULL, last_seen TEXT NOT NULL, PRIMARY KEY (store, key))"
+            )
+            if cols and "store" not in cols:
+                self._db.execute("INSERT INTO postings SELECT ?, key, fingerprint, first_seen, last_seen"
+                                 " FROM postings_legacy", (store,))
+                self._db.execute("DROP TABLE postings_legacy")
+
+    def _fingerprints(self, keys: List[str]) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[i:i + self.LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            out.update(self._db.execute(
+                f"SELECT key, fingerprint FROM postings WHERE store = ? AND key IN ({marks})",
+                [self.store, *chunk],
+            ).fetchall())
+        return out
+
+    def changes(self, rows: Iterable[Dict]) -> tuple[List[Dict], List[tuple]]:
+        """(rows that are new or whose content changed, in input order; the
+        (key, fingerprint) entries to `commit` once those rows are stored).
+        Nothing is recorded yet, so a failed write can simply be retried."""
+        keyed: Dict[str, tuple] = {}
+        for r in rows:
+            keyed[posting_key(r)] = (r, posting_fingerprint(r))  # last duplicate wins
+        known = self._fingerprints(list(keyed))
+        fresh = [r for k, (r, fp) in keyed.items() if known.get(k) != fp]
+        return fresh, [(k, fp) for k, (_, fp) in keyed.items()]
+
+    def commit(self, entries: List[tuple], seen_at: str | None = None):
+        """Record `changes` entries as seen at `seen_at`. Unchanged postings
+        only have `last_seen` bumped."""
+        seen_at = seen_at or datetime.now(timezone.utc).isoformat()
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO postings (store, key, fingerprint, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(store, key) DO UPDATE SET fingerprint = excluded.fingerprint,"
+                " last_seen = excluded.last_seen",
+                [(self.store, k, fp, seen_at, seen_at) for k, fp in entries],
+            )
+
+    def upsert(self, rows: Iterable[Dict], seen_at: str | None = None) -> List[Dict]:
+        """`changes` and `commit` in one step: record `rows` as seen and return
+        those that are new or changed."""
+        fresh, entries = self.changes(rows)
+        self.commit(entries, seen_at)
+        return fresh
+
+    def refingerprint(self, rows: Iterable[Dict]):
+        """Store the current fingerprint of rows rewritten in place (backfill),
+        so the next run doesn't see them as changed."""
+        with self._db:
+            self._db.executemany("UPDATE postings SET fingerprint = ? WHERE store = ? AND key = ?",
+                                 [(posting_fingerprint(r), self.store, posting_key(r)) for r in rows])
+
+    def seen(self, key: str) -> tuple[str, str] | None:
+        """(first_seen, last_seen) for a posting key, or None if never seen."""
+        return self._db.execute(
+            "SELECT first_seen, last_seen FROM postings WHERE store = ? AND key = ?", (self.store, key)
+        ).fetchone()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM postings WHERE store = ?", (self.store,)).fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+def ingest_rows(path: str, rows: List[Dict], index: PostingIndex) -> int:
+    """Append only new or changed postings to `path`; returns how many were
+    written. The index is updated only once the rows are on disk."""
+    fresh, entries = index.changes(rows)
+    if fresh:
+        append_rows(path, fresh)
+    index.commit(entries)
+    return len(fresh)
+
+COLUMNS = ["source", "title", "company", "location", "posted_at", "url", "skills", "fetched_at"]
+
+def _apply(rows: Iterable[Dict], rescan: Rescan) -> Iterator[tuple[Dict, bool | None]]:
+    """(row, skills changed) with each row's rescan update applied in place;
+    None instead of a bool for rows the rescan left alone."""
+    ahead, rows = tee(rows)
+    for row, update in zip(rows, rescan(ahead)):
+        if update is None:
+            yield row, None
+            continue
+        changed = sorted(update["skills"]) != sorted(row.get("skills", []))
+        row.update(update)
+        yield row, changed
+
+def _stamp(rows: List[Dict]) -> List[Dict]:
+    """Give every row a fetched_at (now, unless it already has one)."""
+    now = datetime.now(timezone.utc).isoformat()
+    for r in rows:
+        if not r.get("fetched_at"):
+            r["fetched_at"] = now
+    return rows
+
+class Storage:
+    """Where normalized postings are written. `write` returns the rows that
+    were stored as new or changed, each carrying the fetched_at it was
+    stored under. Backends that update a posting in place (SQLite) also set
+    `replaces` on it: the overwritten version's source, company, skills and
+    fetched_at, so derived counts can take it back out."""
+
+    path: str
+
+    def write(self, rows: List[Dict]) -> List[Dict]:
+        raise NotImplementedError
+
+    def iter_rows(self) -> Iterable[Dict]:
+        """Every stored row, oldest partition/insert first, skills as a list."""
+        raise NotImplementedError
+
+    def rewrite_skills(self, rescan: Rescan) -> int:
+        """Pass every stored row through `rescan` and store the new skills in
+        place. Returns the number of rows whose skills changed."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __str__(self) -> str:
+        return self.path
+
+class CSVStorage(Storage):
+    def __init__(self, path: str, index: PostingIndex | None = None):
+        self.path = path
+        self.index = index
+
+    def write(self, rows: List[Dict]) -> List[Dict]:
+        if self.index is None:
+            fresh, entries = _stamp(rows), None
+        else:
+            fresh, entries = self.index.changes(_stamp(rows))
+        if fresh:
+            append_rows(self.path, fresh)
+        if entries is not None:
+            # Only now: rows marked as seen but never stored would be skipped for good
+            self.index.commit(entries)
+        return fresh
+
+    def iter_rows(self) -> Iterable[Dict]:
+        if os.path.exists(self.path):
+            yield from read_csv_rows(self.path)
+
+    def rewrite_skills(self, rescan: Rescan) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        now = datetime.now(timezone.utc).isoformat()
+        tmp, changed, latest = self.path + ".tmp", 0, {}
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(COLUMNS)
+            for r, ch in _apply(read_csv_rows(self.path), rescan):
+                w.writerow(_csv_record(r, now))
+                changed += bool(ch)
+                if ch is not None:
+                    latest[posting_key(r)] = r
+        os.replace(tmp, self.path)
+        if self.index is not None:
+            self.index.refingerprint(latest.values())
+        return changed
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+
+class SQLiteStorage(Storage):
+    """One row per posting identity, with skills normalized into
+    `postings_skills`. Writes go through batched upserts in a single
+    transaction; reads filter on indexed columns."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS postings (
+        id INTEGER PRIMARY KEY,
+        posting_key TEXT NOT NULL UNIQUE,
+        fingerprint TEXT NOT NULL,
+        source TEXT, title TEXT, company TEXT, location TEXT,
+        posted_at TEXT, url TEXT, skills TEXT,
+        fetched_at TEXT NOT NULL, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS postings_skills (
+        skill TEXT NOT NULL,
+        posting_id INTEGER NOT NULL REFERENCES postings(id) ON DELETE CASCADE,
+        PRIMARY KEY (skill, posting_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_postings_fetched_at ON postings(fetched_at);
+    CREATE INDEX IF NOT EXISTS idx_postings_source ON postings(source, fetched_at);
+    CREATE INDEX IF NOT EXISTS idx_postings_company ON postings(company, fetched_at);
+    CREATE INDEX IF NOT EXISTS idx_postings_skills_posting ON postings_skills(posting_id);
+    """
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(self.SCHEMA)
+
+    def _existing(self, keys: List[str]) -> Dict[str, tuple]:
+        out: Dict[str, tuple] = {}
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[i:i + self.LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for key, pid, fp in self._db.execute(
+                f"SELECT posting_key, id, fingerprint FROM postings WHERE posting_key IN ({marks})", chunk
+            ):
+                out[key] = (pid, fp)
+        return out
+
+    def write(self, rows: List[Dict]) -> List[Dict]:
+        now = datetime.now(timezone.utc).isoformat()
+        # key -> (latest row, its fingerprint, first seen, last seen) within this batch
+        keyed: Dict[str, tuple] = {}
+        for r in rows:
+            key, ts = posting_key(r), r.get("fetched_at") or now
+            prev = keyed.get(key)
+            if prev is None:
+                keyed[key] = (r, posting_fingerprint(r), ts, ts)
+            elif ts >= prev[3]:
+                keyed[key] = (r, posting_fingerprint(r), min(prev[2], ts), ts)
+            else:
+                keyed[key] = prev[:2] + (min(prev[2], ts), prev[3])
+        existing = self._existing(list(keyed))
+
+        inserts, updates, touches = [], [], []
+        for key, (r, fp, first, last) in keyed.items():
+            fields = (r.get("source"), r.get("title"), r.get("company"), r.get("location"),
+                      r.get("posted_at"), r.get("url"), ",".join(r.get("skills", [])))
+            if key not in existing:
+                inserts.append((key, fp) + fields + (last, first, last))
+            elif existing[key][1] != fp:
+                updates.append((fp,) + fields + (last, first, last, existing[key][0]))
+            else:
+                touches.append((first, last, existing[key][0]))
+
+        previous = self._previous([existing[k][0] for k in keyed if k in existing and existing[k][1] != keyed[k][1]])
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO postings (posting_key, fingerprint, source, title, company, location,"
+                " posted_at, url, skills, fetched_at, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", inserts)
+            self._db.executemany(
+                "UPDATE postings SET fingerprint = ?, source = ?, title = ?, company = ?, location = ?,"
+                " posted_at = ?, url = ?, skills = ?, fetched_at = ?,"
+                " first_seen = min(first_seen, ?), last_seen = max(last_seen, ?) WHERE id = ?", updates)
+            self._db.executemany(
+                "UPDATE postings SET first_seen = min(first_seen, ?), last_seen = max(last_seen, ?)"
+                " WHERE id = ?", touches)
+
+            changed = [k for k, (_, fp, _, _) in keyed.items() if existing.get(k, (None, None))[1] != fp]
+            ids = {k: v[0] for k, v in self._existing(changed).items()}
+            self._db.executemany("DELETE FROM postings_skills WHERE posting_id = ?",
+                                 [(ids[k],) for k in changed if k in existing])
+            self._db.executemany(
+                "INSERT OR IGNORE INTO postings_skills (skill, posting_id) VALUES (?, ?)",
+                [(s, ids[k]) for k in changed for s in keyed[k][0].get("skills", [])])
+        written = []
+        for k in changed:
+            r, _, _, last = keyed[k]
+            r["fetched_at"] = last
+            if k in existing:
+                r["replaces"] = previous[existing[k][0]]
+            written.append(r)
+        return written
+
+    def _previous(self, ids: List[int]) -> Dict[int, Dict]:
+        """The stored version of rows about to be updated, as the rollups count them."""
+        out: Dict[int, Dict] = {}
+        for i in range(0, len(ids), self.LOOKUP_CHUNK):
+            chunk = ids[i:i + self.LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for pid, source, company, skills, fetched_at in self._db.execute(
+                f"SELECT id, source, company, skills, fetched_at FROM postings WHERE id IN ({marks})", chunk
+            ):
+                out[pid] = {"source": source, "company": company, "fetched_at": fetched_at,
+                            "skills": [s for s in (skills or "").split(",") if s]}
+        return out
+
+    # ---------- reads (used by the dashboard) ----------
+    def bounds(self) -> tuple[str | None, str | None]:
+        return self._db.execute("SELECT min(fetched_at), max(fetched_at) FROM postings").fetchone()
+
+    def distinct(self, column: str) -> List[str]:
+        if column == "skill":
+            sql = "SELECT DISTINCT skill FROM postings_skills ORDER BY skill"
+        elif column in ("source", "company"):
+            sql = f"SELECT DISTINCT {column} FROM postings WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}"
+        else:
+            raise ValueError(f"unsupported column {column!r}")
+        return [r[0] for r in self._db.execute(sql)]
+
+    def query(self, start: str | None = None, end: str | None = None,
+              sources: List[str] | None = None, companies: List[str] | None = None,
+              skills: List[str] | None = None) -> tuple[List[str], List[tuple]]:
+        """Rows (in COLUMNS order) matching the filters; every filter is an
+        indexed lookup. Skill filters match postings with any of `skills`."""
+        where, params = [], []
+        if start:
+            where.append("fetched_at >= ?")
+            params.append(start)
+        if end:
+            where.append("fetched_at <= ?")
+            params.append(end)
+        for col, values in (("source", sources), ("company", companies)):
+            if values:
+                where.append(f"{col} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        if skills:
+            where.append("id IN (SELECT posting_id FROM postings_skills"
+                         f" WHERE skill IN ({','.join('?' * len(skills))}))")
+            params.extend(s.lower() for s in skills)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM postings"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return COLUMNS, self._db.execute(sql, params).fetchall()
+
+    def iter_rows(self) -> Iterable[Dict]:
+        cur = self._db.execute(f"SELECT {', '.join(COLUMNS)} FROM postings ORDER BY id")
+        for values in cur:
+            r = dict(zip(COLUMNS, values))
+            r["skills"] = [s for s in (r["skills"] or "").split(",") if s]
+            yield r
+
+    def _pages(self, size: int) -> Iterator[Dict]:
+        # Keyset pages, each fully fetched, so updates can run in between
+        last = 0
+        while True:
+            page = self._db.execute(
+                f"SELECT id, posting_key, {', '.join(COLUMNS)} FROM postings WHERE id > ?"
+                " ORDER BY id LIMIT ?", (last, size)).fetchall()
+            if not page:
+                return
+            for pid, key, *values in page:
+                r = dict(zip(COLUMNS, values), id=pid, posting_key=key)
+                r["skills"] = [s for s in (r["skills"] or "").split(",") if s]
+                yield r
+            last = page[-1][0]
+
+    def _update_skills(self, rows: List[Dict]):
+        with self._db:
+            self._db.executemany("UPDATE postings SET skills = ?, fingerprint = ? WHERE id = ?",
+                                 [(",".join(r["skills"]), posting_fingerprint(r), r["id"]) for r in rows])
+            self._db.executemany("DELETE FROM postings_skills WHERE posting_id = ?",
+                                 [(r["id"],) for r in rows])
+            self._db.executemany("INSERT OR IGNORE INTO postings_skills (skill, posting_id) VALUES (?, ?)",
+                                 [(s, r["id"]) for r in rows for s in r["skills"]])
+
+    def rewrite_skills(self, rescan: Rescan, batch_size: int = 1000) -> int:
+        changed, batch = 0, []
+        for r, ch in _apply(self._pages(batch_size), rescan):
+            if ch is None:
+                continue
+            changed += ch
+            batch.append(r)
+            if len(batch) >= batch_size:
+                self._update_skills(batch)
+                batch = []
+        if batch:
+            self._update_skills(batch)
+        return changed
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+def _parse_ts(value) -> datetime | None:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+def parquet_schema():
+    import pyarrow as pa
+    ts = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("source", pa.dictionary(pa.int32(), pa.string())),
+        ("title", pa.string()),
+        ("company", pa.dictionary(pa.int32(), pa.string())),
+        ("location", pa.dictionary(pa.int32(), pa.string())),
+        ("posted_at", ts),
+        ("url", pa.string()),
+        ("skills", pa.list_(pa.string())),
+        ("fetched_at", ts),
+    ])
+
+def _parquet_table(items: List[tuple]):
+    """Table of (row, fetched_at datetime) pairs in `parquet_schema`."""
+    import pyarrow as pa
+
+    cols = {
+        "source": [r.get("source") for r, _ in items],
+        "title": [r.get("title") for r, _ in items],
+        "company": [r.get("company") for r, _ in items],
+        "location": [r.get("location") for r, _ in items],
+        "posted_at": [_parse_ts(r.get("posted_at")) for r, _ in items],
+        "url": [r.get("url") for r, _ in items],
+        "skills": [list(r.get("skills", [])) for r, _ in items],
+        "fetched_at": [ts for _, ts in items],
+    }
+    return pa.Table.from_pydict(cols, schema=parquet_schema())
+
+class ParquetStorage(Storage):
+    """Date-partitioned Parquet files: `<root>/date=YYYY-MM-DD/part-*.parquet`,
+    partitioned by fetched_at (UTC). Each write adds one part per day touched;
+    `compact` merges them. Needs pyarrow."""
+
+    def __init__(self, root: str, index: PostingIndex | None = None):
+        self.path = root
+        self.index = index
+        recover_parquet(root)
+
+    def write(self, rows: List[Dict]) -> List[Dict]:
+        import pyarrow.parquet as pq
+
+        if self.index is None:
+            fresh, entries = _stamp(rows), None
+        else:
+            fresh, entries = self.index.changes(_stamp(rows))
+        now = datetime.now(timezone.utc)
+        by_day: Dict[str, List[tuple]] = {}
+        for r in fresh:
+            fetched = _parse_ts(r["fetched_at"]) or now
+            by_day.setdefault(fetched.date().isoformat(), []).append((r, fetched))
+
+        for day, items in by_day.items():
+            part_dir = os.path.join(self.path, f"date={day}")
+            os.makedirs(part_dir, exist_ok=True)
+            name = f"part-{now.strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}.parquet"
+            # Readers only see complete parts
+            tmp = os.path.join(part_dir, f".{name}.tmp")
+            pq.write_table(_parquet_table(items), tmp)
+            os.replace(tmp, os.path.join(part_dir, name))
+        if entries is not None:
+            # After every part is in place, so a failed write leaves its rows unseen
+            self.index.commit(entries)
+        return fresh
+
+    def iter_rows(self) -> Iterable[Dict]:
+        for _, r in self._partition_rows():
+            yield r
+
+    def _partition_rows(self) -> Iterator[tuple[str, Dict]]:
+        # One partition in memory at a time
+        for day, _ in parquet_partitions(self.path):
+            for r in read_parquet(self.path, day, day).to_pylist():
+                for col in ("posted_at", "fetched_at"):
+                    if r[col] is not None:
+                        r[col] = r[col].isoformat()
+                yield day, r
+
+    def rewrite_skills(self, rescan: Rescan) -> int:
+        """Partitions with changed rows are rewritten as a single part."""
+        days: deque = deque()
+
+        def rows():
+            for day, r in self._partition_rows():
+                days.append(day)
+                yield r
+
+        changed, latest = 0, {}
+        day, items, dirty = None, [], False
+        for r, ch in _apply(rows(), rescan):
+            d = days.popleft()
+            if d != day:
+                if dirty:
+                    self._replace_partition(day, items)
+                day, items, dirty = d, [], False
+            items.append((r, _parse_ts(r["fetched_at"])))
+            dirty |= bool(ch)
+            changed += bool(ch)
+            if ch is not None:
+                latest[posting_key(r)] = r
+        if dirty:
+            self._replace_partition(day, items)
+        if self.index is not None:
+            self.index.refingerprint(latest.values())
+        return changed
+
+    def _replace_partition(self, day: str, items: List[tuple]):
+        _swap_parts(os.path.join(self.path, f"date={day}"), _parquet_table(items), "rewritten")
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+
+def parquet_partitions(root: str) -> List[tuple[str, str]]:
+    """(date, directory) for every partition under `root`, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    out = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.startswith("date=") and os.path.isdir(path):
+            out.append((name[len("date="):], path))
+    return sorted(out)
+
+# Written in a partition before one new part replaces all its current parts:
+# {"by": new part, "parts": [replaced parts]}. Once the new part exists the
+# replaced ones are dead, even if a crash left them on disk.
+SUPERSEDED = ".superseded.json"
+
+def _superseded(path: str) -> tuple[dict | None, set]:
+    try:
+        with open(os.path.join(path, SUPERSEDED), encoding="utf-8") as f:
+            marker = json.load(f)
+    except FileNotFoundError:
+        return None, set()
+    done = os.path.exists(os.path.join(path, marker["by"]))
+    return marker, set(marker["parts"]) if done else set()
+
+def _part_files(path: str) -> List[str]:
+    _, dead = _superseded(path)
+    return sorted(os.path.join(path, f) for f in os.listdir(path)
+                  if f.startswith("part-") and f.endswith(".parquet") and f not in dead)
+
+def _finish_swap(path: str):
+    marker, dead = _superseded(path)
+    if marker is None:
+        return
+    for f in dead:
+        try:
+            os.remove(os.path.join(path, f))
+        except FileNotFoundError:
+            pass
+    os.remove(os.path.join(path, SUPERSEDED))
+
+def _swap_parts(path: str, table, label: str):
+    """Replace every part of partition `path` with one part holding `table`.
+    Crash-safe: a marker naming the old parts is written first, so readers
+    skip them as soon as the new part is in place, and `recover_parquet`
+    deletes whatever a crash left behind."""
+    import pyarrow.parquet as pq
+
+    parts = _part_files(path)
+    tmp = os.path.join(path, f".{label}.tmp")
+    pq.write_table(table, tmp)
+    name = f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{label}.parquet"
+    marker = os.path.join(path, SUPERSEDED)
+    with open(marker + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"by": name, "parts": [os.path.basename(p) for p in parts]}, f)
+    os.replace(marker + ".tmp", marker)
+    os.replace(tmp, os.path.join(path, name))
+    _finish_swap(path)
+
+def recover_parquet(root: str):
+    """Finish (or roll back) part swaps a crash interrupted."""
+    for _, path in parquet_partitions(root):
+        if os.path.exists(os.path.join(path, SUPERSEDED)):
+            _finish_swap(path)
+
+def _read_parts(files: List[str], columns: List[str] | None = None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    if columns:
+        schema = pa.schema([schema.field(c) for c in columns])
+    if not files:
+        return schema.empty_table()
+    return pa.concat_tables([pq.read_table(f, columns=columns, schema=schema) for f in files])
+
+def read_parquet(root: str, start: str | None = None, end: str | None = None,
+                 columns: List[str] | None = None):
+    """pyarrow Table of the partitions whose date lies in [start, end]
+    (YYYY-MM-DD strings, inclusive), reading only `columns`."""
+    files = [f for day, path in parquet_partitions(root)
+             if (start is None or day >= start) and (end is None or day <= end)
+             for f in _part_files(path)]
+    return _read_parts(files, columns).unify_dictionaries()
+
+def compact_parquet(root: str, min_parts: int = 2) -> int:
+    """Merge the parts of every partition holding at least `min_parts` files
+    into one file. Returns the number of partitions compacted."""
+    recover_parquet(root)
+    compacted = 0
+    for _, path in parquet_partitions(root):
+        parts = _part_files(path)
+        if len(parts) < min_parts:
+            continue
+        _swap_parts(path, _read_parts(parts).unify_dictionaries(), "compacted")
+        compacted += 1
+    return compacted
+
+def open_storage(settings) -> Storage:
+    """Storage backend selected by `settings.STORAGE_BACKEND`."""
+    if settings.STORAGE_BACKEND == "sqlite":
+        return SQLiteStorage(settings.SQLITE_PATH)
+    if settings.STORAGE_BACKEND not in ("csv", "parquet"):
+        raise ValueError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}")
+    path = settings.OUTPUT_CSV if settings.STORAGE_BACKEND == "csv" else settings.PARQUET_ROOT
+    index = None
+    if settings.POSTING_INDEX:
+        index = PostingIndex(settings.POSTING_INDEX, f"{settings.STORAGE_BACKEND}:{os.path.abspath(path)}")
+    if settings.STORAGE_BACKEND == "csv":
+        return CSVStorage(path, index)
+    return ParquetStorage(path, index)
+
+def read_csv_rows(path: str) -> Iterable[Dict]:
+    """Rows of a jobs.csv as posting dicts (skills split back into a list)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            r["skills"] = [s for s in (r.get("skills") or "").split(",") if s]
+            yield r
+
+def migrate_csv(csv_path: str, storage: Storage, batch_size: int = 10000) -> int:
+    """Copy an existing jobs.csv into `storage` in batches. Repeated postings
+    collapse into one row whose first/last seen span their fetched_at values."""
+    written, batch = 0, []
+    for r in read_csv_rows(csv_path):
+        batch.append(r)
+        if len(batch) >= batch_size:
+            written += len(storage.write(batch))
+            batch = []
+    if batch:
+        written += len(storage.write(batch))
+    return written
+
+def main(argv: List[str] | None = None):
+    import argparse
+    from .config import settings
+
+    ap = argparse.ArgumentParser(prog="python -m src.storage")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    mig = sub.add_parser("migrate", help="copy a jobs.csv into the SQLite or Parquet backend")
+    mig.add_argument("--csv", default=settings.OUTPUT_CSV)
+    mig.add_argument("--to", choices=["sqlite", "parquet"], default="sqlite")
+    mig.add_argument("--db", default=settings.SQLITE_PATH)
+    mig.add_argument("--root", default=settings.PARQUET_ROOT)
+    comp = sub.add_parser("compact", help="merge small Parquet parts within each date partition")
+    comp.add_argument("--root", default=settings.PARQUET_ROOT)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "migrate":
+        # Parquet keeps every CSV row, as history; SQLite collapses repeats
+        store = SQLiteStorage(args.db) if args.to == "sqlite" else ParquetStorage(args.root)
+        n = migrate_csv(args.csv, store)
+        print(f"Migrated {n} postings from {args.csv} to {store}")
+        store.close()
+    elif args.cmd == "compact":
+        n = compact_parquet(args.root)
+        print(f"Compacted {n} partitions under {args.root}")
+
+if __name__ == "__main__":
+    main()
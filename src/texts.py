@@ -0,0 +1,100 @@
+from __future__ import annotations
+import os, sqlite3, zlib
+from typing import Dict, Iterable, Tuple
+
+from .storage import posting_key
+
+class TextArchive:
+    """Raw posting descriptions, zlib-compressed and stored once per content
+    hash, plus which description each stored row was extracted from. Lets a
+    new skill list be backfilled over history without refetching."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS texts (
+        content_hash TEXT PRIMARY KEY, format TEXT NOT NULL, body BLOB NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS posting_texts (
+        key TEXT NOT NULL, fetched_at TEXT NOT NULL, content_hash TEXT NOT NULL,
+        PRIMARY KEY (key, fetched_at)
+    ) WITHOUT ROWID;
+    """
+    LEVEL = 6
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self.SCHEMA)
+
+    def add(self, rows: Iterable[Dict]) -> int:
+        """Archive the descriptions of stored rows (as returned by
+        `Storage.write`); rows without one are skipped. Returns rows linked."""
+        texts: Dict[str, tuple] = {}
+        links = []
+        for r in rows:
+            h, desc = r.get("content_hash"), r.get("description")
+            if not h or desc is None:
+                continue
+            links.append((r.get("posting_key") or posting_key(r), r["fetched_at"], h))
+            texts.setdefault(h, desc)
+        known = set()
+        hashes = list(texts)
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            known.update(h for (h,) in self._db.execute(
+                f"SELECT content_hash FROM texts WHERE content_hash IN ({','.join('?' * len(chunk))})", chunk))
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO texts (content_hash, format, body) VALUES (?, ?, ?)",
+                [(h, fmt, zlib.compress(body.encode("utf-8"), self.LEVEL))
+                 for h, (fmt, body) in texts.items() if h not in known])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO posting_texts (key, fetched_at, content_hash) VALUES (?, ?, ?)",
+                links)
+        return len(links)
+
+    def content_hash(self, key: str, fetched_at: str | None = None) -> str | None:
+        """Hash of the description behind the row stored for `key` at
+        `fetched_at`: the latest one archived at or before it, else the latest."""
+        if fetched_at:
+            row = self._db.execute(
+                "SELECT content_hash FROM posting_texts WHERE key = ? AND fetched_at <= ?"
+                " ORDER BY fetched_at DESC LIMIT 1", (key, fetched_at)).fetchone()
+            if row:
+                return row[0]
+        row = self._db.execute(
+            "SELECT content_hash FROM posting_texts WHERE key = ? ORDER BY fetched_at DESC LIMIT 1",
+            (key,)).fetchone()
+        return row[0] if row else None
+
+    def raw(self, content_hash: str) -> Dict[str, str] | None:
+        """The archived description as a raw posting fragment
+        ({"description_text": ...} or {"description_html": ...})."""
+        row = self._db.execute("SELECT format, body FROM texts WHERE content_hash = ?",
+                               (content_hash,)).fetchone()
+        if row is None:
+            return None
+        return {f"description_{row[0]}": zlib.decompress(row[1]).decode("utf-8")}
+
+    def merge(self, path: str):
+        """Copy in every description and link of another archive (e.g. a shard's)."""
+        self._db.execute("ATTACH DATABASE ? AS other", (path,))
+        try:
+            with self._db:
+                self._db.execute("INSERT OR IGNORE INTO texts SELECT content_hash, format, body FROM other.texts")
+                self._db.execute("INSERT OR REPLACE INTO posting_texts"
+                                 " SELECT key, fetched_at, content_hash FROM other.posting_texts")
+        finally:
+            self._db.execute("DETACH DATABASE other")
+
+    def sizes(self) -> Tuple[int, int]:
+        """(descriptions stored, compressed bytes)."""
+        return self._db.execute("SELECT COUNT(*), COALESCE(SUM(length(body)), 0) FROM texts").fetchone()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM posting_texts").fetchone()[0]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,65 @@
+import socketserver
+import threading
+
+import pytest
+
+from benchmarks.stub_boards import StubBoards
+
+@pytest.fixture
+def stub_boards():
+    with StubBoards() as stub:
+        yield stub
+
+class StubSMTP:
+    """Minimal local SMTP server (plain, AUTH accepted) recording each
+    connection and each message's raw text."""
+
+    def __init__(self):
+        self.connections = 0
+        self.messages: list[str] = []
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                stub.connections += 1
+                self.reply("220 stub ESMTP")
+                while line := self.rfile.readline():
+                    cmd = line.decode().strip().upper()
+                    if cmd.startswith("EHLO"):
+                        self.reply("250-stub")
+                        self.reply("250 AUTH PLAIN LOGIN")
+                    elif cmd.startswith("AUTH"):
+                        self.reply("235 ok")
+                    elif cmd == "DATA":
+                        self.reply("354 go on")
+                        body = []
+                        while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                            body.append(data.decode())
+                        stub.messages.append("".join(body))
+                        self.reply("250 queued")
+                    elif cmd == "QUIT":
+                        self.reply("221 bye")
+                        return
+                    else:
+                        self.reply("250 ok")
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def smtp_server():
+    with StubSMTP() as stub:
+        yield stub
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from src.alerts import AlertState, Mailer, digest, run_alerts
+from src.config import Settings
+
+def _days(n, start=date(2024, 1, 1)):
+    return [(start + timedelta(days=i)).isoformat() for i in range(n)]
+
+def test_spikes_need_history_and_a_real_jump():
+    state = AlertState(":memory:", alpha=0.2, z=3, min_days=5, min_mentions=10)
+    days = _days(12)
+    for i, day in enumerate(days[:10]):
+        # python steady around 20, sql noisy around 15, spark nearly absent
+        assert state.observe(day, {"python": 20 + i % 2, "sql": 10 + 10 * (i % 2)},
+                             skills=["python", "sql", "spark"]) == []
+    spikes = state.observe(days[10], {"python": 60, "sql": 22, "spark": 12}, skills=["python", "sql", "spark"])
+    assert [s.skill for s in spikes] == ["python", "spark"]
+    assert spikes[0].mentions == 60 and 19 < spikes[0].mean < 22 and spikes[0].z > 3
+    # A later run the same day replaces the count rather than adding to it
+    again = state.observe(days[10], {"python": 61, "sql": 22, "spark": 12}, skills=["python", "sql", "spark"])
+    assert [s.skill for s in again] == ["python", "spark"]
+    state.alerted(days[10], again)
+    assert state.observe(days[10], {"python": 61}, skills=["python"]) == []  # once per day
+    # The spike is folded in, but one day barely moves the mean
+    assert state.observe(days[11], {"python": 21}, skills=["python"]) == []
+    mean = state._db.execute("SELECT mean FROM skill_stats WHERE skill = 'python'").fetchone()[0]
+    assert 25 < mean < 30
+
+def test_state_persists_between_runs(tmp_path):
+    path = str(tmp_path / "alerts.sqlite")
+    for day in _days(8):
+        state = AlertState(path, min_days=7)
+        assert state.observe(day, {"dbt": 12}, skills=["dbt"]) == []
+        state.close()
+    state = AlertState(path, min_days=7)
+    assert [s.skill for s in state.observe(_days(9)[-1], {"dbt": 40})] == ["dbt"]
+
+def test_digest_goes_out_once_over_one_connection(tmp_path, smtp_server):
+    settings = Settings(ALERT_STATE=str(tmp_path / "alerts.sqlite"), ALERT_MIN_DAYS=3,
+                        ALERT_MIN_MENTIONS=5, SKILL_LIST="python,sql,dbt,kafka",
+                        EMAIL_FROM="bot@example.com", EMAIL_TO="me@example.com",
+                        EMAIL_APP_PASSWORD="secret", SMTP_HOST="127.0.0.1",
+                        SMTP_PORT=smtp_server.port, SMTP_SECURITY="none")
+    days = _days(6)
+    for day in days[:5]:
+        assert run_alerts({"python": 10, "sql": 10, "dbt": 1, "kafka": 1}, settings, day=day) == []
+    spikes = run_alerts({"python": 40, "sql": 35, "dbt": 20, "kafka": 1}, settings, day=days[5])
+    assert {s.skill for s in spikes} == {"python", "sql", "dbt"}
+    assert smtp_server.connections == 1 and len(smtp_server.messages) == 1
+    msg = smtp_server.messages[0]
+    assert "3 skill spikes on " + days[5] in msg
+    assert all(f"- {skill}:" in msg for skill in ("python", "sql", "dbt"))
+    # Already sent today: a rerun finds nothing new to mail
+    assert run_alerts({"python": 40, "sql": 35, "dbt": 20}, settings, day=days[5]) == []
+    assert len(smtp_server.messages) == 1
+
+def test_mailer_reuses_its_connection(smtp_server):
+    state = AlertState(":memory:", min_days=0, min_mentions=0)
+    spikes = state.observe("2024-01-01", {"python": 5})
+    with Mailer("127.0.0.1", smtp_server.port, "none", "bot@example.com", "pw") as mailer:
+        for _ in range(3):
+            mailer.send(digest(spikes, "2024-01-01", "bot@example.com", "me@example.com"))
+    assert smtp_server.connections == 1 and len(smtp_server.messages) == 3
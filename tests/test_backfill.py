@@ -0,0 +1,84 @@
+import pytest
+
+from src.backfill import Rescanner, backfill
+from src.rollups import RollupStore
+from src.scraper import Sink, extract, run
+from src.storage import CSVStorage, ParquetStorage, PostingIndex, SQLiteStorage
+from src.texts import TextArchive
+
+def _rows(day, skills, changed=False):
+    raws = [{"description_html": "<p>Python and Airflow</p>"},
+            {"description_html": "<p>SQL, dbt, Airflow</p>" if changed else "<p>SQL, dbt</p>"},
+            {"description_text": "Python only"}]
+    for i, raw in enumerate(raws):
+        raw.update(source="lever", title=f"Engineer {i}", company="acme",
+                   url=f"https://jobs.lever.co/acme/{i}")
+    for r in extract(raws, skills):
+        r["fetched_at"] = f"{day}T12:00:00+00:00"
+        yield r
+
+def _open(kind, tmp_path):
+    if kind == "csv":
+        return CSVStorage(str(tmp_path / "jobs.csv"), PostingIndex(str(tmp_path / "index.sqlite")))
+    if kind == "sqlite":
+        return SQLiteStorage(str(tmp_path / "jobs.sqlite"))
+    pytest.importorskip("pyarrow")
+    return ParquetStorage(str(tmp_path / "jobs"), PostingIndex(str(tmp_path / "index.sqlite")))
+
+def _skills(store):
+    return sorted((r["title"], tuple(r["skills"])) for r in store.iter_rows())
+
+@pytest.mark.parametrize("kind", ["csv", "sqlite", "parquet"])
+@pytest.mark.parametrize("workers", [0, 2])
+def test_backfill_new_skill_over_history(kind, workers, tmp_path):
+    texts_path, rollup_path = str(tmp_path / "texts.sqlite"), str(tmp_path / "rollups.sqlite")
+    for day, changed in (("2024-01-01", False), ("2024-01-02", True)):
+        run(_rows(day, ["python"], changed),
+            Sink(_open(kind, tmp_path), RollupStore(rollup_path), TextArchive(texts_path)), batch_size=2)
+
+    store, texts, rollups = _open(kind, tmp_path), TextArchive(texts_path), RollupStore(rollup_path)
+    assert texts.sizes()[0] == 4  # one copy per distinct description
+    rescan = Rescanner(texts, ["python", "airflow"], workers=workers, chunk_size=1)
+    assert backfill(store, rescan, rollups) == 2
+    assert rescan.missing == 0
+
+    latest = [("Engineer 0", ("airflow", "python")), ("Engineer 1", ("airflow",)), ("Engineer 2", ("python",))]
+    if kind == "sqlite":  # one row per posting, holding its latest description
+        assert _skills(store) == latest
+    else:  # full history, each row rescanned from the description it was stored with
+        assert _skills(store) == sorted(latest + [("Engineer 1", ())])
+    counts = rollups.daily_skill_counts()
+    assert ("2024-01-02", "airflow", 1) in counts
+    if kind != "sqlite":
+        assert ("2024-01-01", "airflow", 1) in counts
+
+    # Stored fingerprints follow the rewrite: the same postings with the new
+    # skill list are not written again
+    assert store.write(list(_rows("2024-01-03", ["python", "airflow"], changed=True))) == []
+    store.close()
+
+def test_archive_compresses_and_resolves_by_time(tmp_path):
+    texts = TextArchive(str(tmp_path / "texts.sqlite"))
+    body = "<p>" + "Python and SQL. " * 200 + "</p>"
+    rows = [{"source": "lever", "url": "u", "content_hash": "h1", "description": ("html", body),
+             "fetched_at": "2024-01-01"},
+            {"source": "lever", "url": "u", "content_hash": "h2", "description": ("text", "Rust"),
+             "fetched_at": "2024-01-05"}]
+    assert texts.add(rows) == 2
+    assert texts.sizes()[1] < len(body) // 10
+    assert texts.content_hash("lever:url:u", "2024-01-03") == "h1"
+    assert texts.content_hash("lever:url:u") == "h2"
+    assert texts.raw("h1") == {"description_html": body}
+    assert texts.raw("h2") == {"description_text": "Rust"}
+
+@pytest.mark.parametrize("kind", ["csv", "sqlite", "parquet"])
+def test_backfilling_one_skill_keeps_the_others(kind, tmp_path):
+    texts_path = str(tmp_path / "texts.sqlite")
+    run(_rows("2024-01-01", ["python", "sql"]), Sink(_open(kind, tmp_path), texts=TextArchive(texts_path)),
+        batch_size=10)
+
+    store, texts = _open(kind, tmp_path), TextArchive(texts_path)
+    assert backfill(store, Rescanner(texts, ["airflow"])) == 1
+    assert _skills(store) == [("Engineer 0", ("airflow", "python")), ("Engineer 1", ("sql",)),
+                              ("Engineer 2", ("python",))]
+    store.close()
@@ -0,0 +1,23 @@
+import json
+
+from benchmarks.run import SCENARIOS, main
+from benchmarks.synthetic import SyntheticPostings
+
+def test_synthetic_postings_are_deterministic():
+    a, b = SyntheticPostings(seed=3, density=0.1), SyntheticPostings(seed=3, density=0.1)
+    assert a.description("lever:acme:1") == b.description("lever:acme:1")
+    assert a.rows(5) == b.rows(5)
+    assert a.text(1) != SyntheticPostings(seed=4, density=0.1).text(1)
+    assert all(r["skills"] for r in SyntheticPostings(density=0.2).rows(20))
+
+def test_suite_writes_results(tmp_path):
+    out = tmp_path / "results.json"
+    main(["--postings", "40", "--boards", "3", "--jobs-per-board", "4", "--latency", "0",
+          "--throttle-every", "2", "--repeat", "1", "--out", str(out)])
+    results = json.loads(out.read_text())
+    by_name = {r["name"]: r for r in results["results"]}
+    assert list(by_name) == list(SCENARIOS)
+    assert all(r["seconds"] > 0 for r in by_name.values())
+    assert by_name["fetch_lever"]["throttled"] >= 1
+    assert by_name["fetch_lever"]["missing"] == 0  # throttled requests are retried
+    assert results["meta"]["params"]["postings"] == 40
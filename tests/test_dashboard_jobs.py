@@ -0,0 +1,65 @@
+import json
+import time
+
+from benchmarks.stub_boards import StubBoards
+from dashboards.frames import CsvTail
+from dashboards.jobs import ScrapeJob
+from src import scraper
+from src.config import Settings
+from src.sources.lever import LeverSource
+
+def _settings(tmp_path, **kw):
+    base = dict(
+        SKILL_LIST="python,sql", HTTP_CACHE="", HTTP_MIN_INTERVAL=0, HTTP_CONCURRENCY=1, BATCH_SIZE=3,
+        OUTPUT_CSV=str(tmp_path / "jobs.csv"), POSTING_INDEX=str(tmp_path / "index.sqlite"),
+        ROLLUP_PATH="", TEXT_ARCHIVE="", EXTRACT_CACHE="", METRICS_REPORT=str(tmp_path / "runs.jsonl"),
+        ALERT_STATE="", DISCOVERY_PATH="", WORKERS=0,
+    )
+    return Settings(**{**base, **kw})
+
+def test_job_runs_in_background_with_live_progress(tmp_path, monkeypatch):
+    with StubBoards(latency=0.2) as stub:
+        monkeypatch.setattr(LeverSource, "API_URL", stub.url + "/v0/postings/{company}?mode=json")
+        monkeypatch.setattr(scraper, "settings", _settings(tmp_path, LEVER_COMPANIES="a,b,c,d"))
+        job = ScrapeJob()
+        assert job.progress().state == "idle"
+        assert job.start()
+        assert not job.start()  # one run at a time; a second click attaches to it
+        tail, grew = CsvTail(str(tmp_path / "jobs.csv")), []
+        deadline = time.time() + 10
+        while job.progress().running and time.time() < deadline:
+            grew.append(len(tail.load()))
+            time.sleep(0.05)
+        job.join(5)
+
+    p = job.progress()
+    assert (p.run, p.state) == (1, "done")
+    assert (p.boards_total, p.boards_done) == (4, 4)
+    assert p.seen == p.written == 4 * stub.jobs_per_board
+    assert p.errors == 0 and p.rate > 0
+    assert "Wrote 12 new/changed rows" in p.message
+    # Batches were readable while the run was still going
+    assert any(0 < n < p.seen for n in grew)
+    assert len(tail.load()) == p.seen
+    record = json.loads((tmp_path / "runs.jsonl").read_text().splitlines()[-1])
+    assert (record["mode"], record["status"]) == ("dashboard", "ok")
+
+def test_job_reports_failed_boards_and_restarts(tmp_path, monkeypatch):
+    with StubBoards(throttle_every=2, retry_after=0) as stub:
+        monkeypatch.setattr(LeverSource, "API_URL", stub.url + "/v0/postings/{company}?mode=json")
+        monkeypatch.setattr(scraper, "settings", _settings(tmp_path, LEVER_COMPANIES="a,b,c,d", HTTP_RETRIES=0))
+        job = ScrapeJob()
+        job.start()
+        job.join(10)
+        p = job.progress()
+        assert (p.state, p.boards_done, p.errors) == ("done", 4, 2)
+        assert len(job.failed_boards()) == 2
+        assert all(f.startswith("lever:") and f.endswith("(HTTPError)") for f in job.failed_boards())
+
+        monkeypatch.setattr(scraper, "settings", _settings(tmp_path, LEVER_COMPANIES=""))
+        assert job.start()
+        job.join(10)
+    p = job.progress()
+    assert (p.run, p.state, p.boards_total, p.errors) == (2, "done", 0, 0)
+    assert "No sources configured" in p.message
+    assert job.failed_boards() == []
@@ -0,0 +1,103 @@
+import random
+import sqlite3
+from collections import Counter
+from datetime import date, timedelta
+
+from src.discovery import (CountMinSketch, Discovery, HeavyHitters, candidate_terms,
+                           known_terms, rising)
+
+def _day(i):
+    return (date(2024, 3, 1) + timedelta(days=i)).isoformat()
+
+def _row(day, text, n=0):
+    return {"source": "lever", "url": f"u{day}{n}", "fetched_at": day + "T09:00:00+00:00", "text": text}
+
+def test_candidate_terms():
+    terms = candidate_terms("Experience with Apache Iceberg and node.js, C++ for 5 years")
+    assert {"apache", "iceberg", "apache iceberg", "node.js", "c++"} <= terms
+    assert not {"with", "experience with", "and", "5", "iceberg and"} & terms
+    assert "apache iceberg and node.js" not in terms  # at most 3 tokens
+
+def test_sketch_never_undercounts_and_stays_small():
+    sketch = CountMinSketch(width=512, depth=4)
+    rng = random.Random(2)
+    truth = Counter(f"term{rng.randrange(5000)}" for _ in range(20000))
+    for term, c in truth.items():
+        for _ in range(c):
+            sketch.add(term)
+    assert all(sketch.estimate(t) >= c for t, c in truth.items())
+    assert len(sketch.table) == 512 * 4  # fixed, whatever the vocabulary
+
+def test_heavy_hitters_keep_the_top_terms():
+    hh = HeavyHitters(k=3)
+    for key, est in [("a", 1), ("b", 5), ("c", 2), ("d", 9), ("e", 1), ("a", 7), ("f", 3)]:
+        hh.offer(key, est)
+    assert [k for k, _ in hh.top()] == ["d", "a", "b"]
+
+def test_counts_persist_and_continue_within_a_day(tmp_path):
+    path = str(tmp_path / "discovery.sqlite")
+    d = Discovery(path, width=1024)
+    assert d.add([_row(_day(0), "Apache Iceberg pipelines", 1), _row(_day(0), "Apache Iceberg", 2)]) == 2
+    d.close()
+    d = Discovery(path, width=1024)
+    d.add([_row(_day(0), "apache iceberg tables", 3), {"fetched_at": None, "text": "x"}])
+    d.close()
+    postings, terms = Discovery(path).daily()
+    assert postings == {_day(0): 3}
+    assert terms["apache iceberg"] == {_day(0): 3} and terms["pipelines"] == {_day(0): 1}
+
+def test_rising_terms_report(tmp_path):
+    d = Discovery(str(tmp_path / "discovery.sqlite"), width=4096, keep_sketch_days=1)
+    for i in range(14):
+        rows = [_row(_day(i), "python and sql data engineer", n) for n in range(20)]
+        # "duckdb" appears in the last 7 days only; "data engineer" is steady
+        rows += [_row(_day(i), "duckdb analytics python", 100 + n) for n in range(8 if i >= 7 else 0)]
+        d.add(rows)
+        d.flush()
+    report = rising(d, _day(13), days=7, baseline=7, exclude=known_terms(["python"]))
+    terms = [r["term"] for r in report]
+    assert set(terms[:5]) == {"duckdb", "analytics", "duckdb analytics", "analytics python",
+                              "duckdb analytics python"}
+    assert report[0]["baseline_share"] == 0 and report[0]["postings"] == 56
+    assert "python" not in terms and "sql" not in terms
+    assert terms.index("data engineer") > terms.index("duckdb analytics")
+    # Only the newest day keeps its sketch
+    assert d._db.execute("SELECT COUNT(*) FROM days WHERE sketch IS NOT NULL").fetchone()[0] == 1
+
+def test_report_leaves_the_database_untouched(tmp_path, capsys):
+    import hashlib
+    from src.discovery import main
+    path = tmp_path / "discovery.sqlite"
+    d = Discovery(str(path), width=4096, keep_sketch_days=3)
+    for i in range(3):
+        d.add([_row(_day(i), "duckdb analytics", n) for n in range(6)])
+    d.close()
+    digest = lambda: hashlib.sha1(path.read_bytes()).hexdigest()
+    before = digest()
+    main(["report", "--path", str(path), "--days", "1", "--baseline", "2"])
+    assert "Rising terms, 1 days to " + _day(2) in capsys.readouterr().out
+    assert digest() == before  # no sketch dropped, nothing flushed
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT COUNT(*) FROM days WHERE sketch IS NOT NULL").fetchone() == (3,)
+    main(["report", "--path", str(tmp_path / "missing.sqlite")])
+    assert "No postings counted" in capsys.readouterr().out
+    assert not (tmp_path / "missing.sqlite").exists()
+
+def test_sink_counts_each_posting_once_per_change(tmp_path):
+    from src.scraper import Sink
+    from src.storage import CSVStorage, PostingIndex
+    day = _day(0)
+
+    def poll(rows):
+        sink = Sink(CSVStorage(str(tmp_path / "jobs.csv"), PostingIndex(str(tmp_path / "index.sqlite"))),
+                    discovery=Discovery(str(tmp_path / "d.sqlite")))
+        sink.write(rows)
+        sink.close()
+
+    rows = [_row(day, "Apache Iceberg and dbt", n) for n in range(3)]
+    poll(rows)
+    poll(rows)  # seen again unchanged: not recounted
+    poll([_row(day, "Apache Iceberg and Polars", 0)])  # edited: counted as changed
+    postings, terms = Discovery(str(tmp_path / "d.sqlite")).daily()
+    assert postings == {day: 4}
+    assert terms["apache iceberg"] == {day: 4} and terms["polars"] == {day: 1}
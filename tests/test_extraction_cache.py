@@ -0,0 +1,84 @@
+from src.extraction_cache import ExtractionCache
+from src.scraper import extract, extract_parallel
+
+def _raws():
+    return [
+        {"title": "Data Engineer", "url": "u1", "description_html": "<p>Python, SQL &amp; Airflow</p>"},
+        {"title": "Analyst", "url": "u2", "description_text": "Excel and Tableau"},
+        {"title": "ML Engineer", "url": "u3", "description_html": "<li>PySpark</li><li>python</li>"},
+    ]
+
+def test_hits_skip_parsing_and_match_uncached(tmp_path, monkeypatch):
+    from src import scraper
+    skills = ["python", "sql", "spark"]
+    expected = list(extract(_raws(), skills))
+    path = str(tmp_path / "extract.sqlite")
+
+    cache = ExtractionCache(path)
+    assert list(extract(_raws(), skills, cache)) == expected
+    assert (cache.stats.hits, cache.stats.misses) == (0, 3)
+    cache.close()
+
+    def boom(*a, **k):
+        raise AssertionError("cache hit should not re-extract")
+    monkeypatch.setattr(scraper, "extract_skills", boom)
+    cache = ExtractionCache(path)
+    rows = list(extract(_raws(), skills, cache))
+    assert [r["skills"] for r in rows] == [r["skills"] for r in expected]
+    assert all(r["text"] is None for r in rows)
+    assert cache.stats.hits == 3 and cache.stats.hit_rate == 1.0
+    # A narrower skill list is served from the same entries
+    assert [r["skills"] for r in extract(_raws(), ["sql"], cache)] == [["sql"], [], []]
+
+def test_new_skill_rescans_only_that_skill(tmp_path, monkeypatch):
+    from src import scraper
+    cache = ExtractionCache(str(tmp_path / "extract.sqlite"))
+    list(extract(_raws(), ["python", "sql"], cache))
+
+    scanned = []
+    real = scraper.extract_skills
+    monkeypatch.setattr(scraper, "extract_skills",
+                        lambda text, whitelist=None: scanned.append(whitelist) or real(text, whitelist))
+    rows = list(extract(_raws(), ["python", "sql", "tableau"], cache))
+    assert scanned == [["tableau"]] * 3
+    assert cache.stats.partial == 3
+    assert [r["skills"] for r in rows] == [["python", "sql"], ["tableau"], ["python"]]
+    assert [r["skills"] for r in rows] == [r["skills"] for r in extract(_raws(), ["python", "sql", "tableau"])]
+
+def test_changed_description_and_aliases_invalidate(tmp_path, monkeypatch):
+    from src import extraction_cache
+    path = str(tmp_path / "extract.sqlite")
+    cache = ExtractionCache(path)
+    list(extract(_raws(), ["python"], cache))
+    changed = _raws()
+    changed[0]["description_html"] = "<p>Rust</p>"
+    assert list(extract(changed, ["python"], cache))[0]["skills"] == []
+    assert cache.stats.misses == 4
+    cache.close()
+
+    monkeypatch.setattr(extraction_cache, "SKILL_ALIASES", {"python": ["py"]})
+    cache = ExtractionCache(path)
+    list(extract(_raws(), ["python"], cache))
+    assert cache.stats.misses == 3
+
+def test_lru_eviction(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "extract.sqlite"), max_entries=2)
+    raws = _raws()
+    list(extract(raws[:2], ["python"], cache))
+    cache.flush()
+    list(extract(raws[:1], ["python"], cache))  # touch u1
+    list(extract(raws[2:], ["python"], cache))
+    cache.flush()
+    assert len(cache) == 2
+    rows = list(extract(raws, ["python"], cache))
+    assert [r["text"] is None for r in rows] == [True, False, True]  # u2 was evicted
+
+def test_parallel_uses_cache(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "extract.sqlite"))
+    raws = _raws() * 5
+    serial = list(extract([dict(r) for r in raws], ["python", "sql"]))
+    list(extract(raws[:3], ["python", "sql"], cache))
+    parallel = list(extract_parallel([dict(r) for r in raws], ["python", "sql"], workers=2,
+                                     batch_size=4, cache=cache))
+    assert [r["skills"] for r in parallel] == [r["skills"] for r in serial]
+    assert cache.stats.hits == 15
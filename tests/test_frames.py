@@ -0,0 +1,98 @@
+import pandas as pd
+
+from dashboards.frames import COLUMNS, CsvTail, filter_df, skill_columns, trend_matrix, week_over_week
+
+HEADER = ",".join(COLUMNS) + "\n"
+
+def _line(i, skills="python", day="2024-01-01"):
+    return f'lever,Engineer {i},acme,Remote,{day},https://x.test/{i},"{skills}",{day}T10:00:00+00:00\n'
+
+def test_csv_tail_waits_for_a_partial_last_line(tmp_path):
+    path = tmp_path / "jobs.csv"
+    full = _line(2)
+    path.write_text(HEADER + _line(1) + full[:20])
+    tail = CsvTail(str(path))
+    assert tail.load()["title"].tolist() == ["Engineer 1"]
+    with open(path, "a") as f:
+        f.write(full[20:] + _line(3)[:5])
+    assert tail.load()["title"].tolist() == ["Engineer 1", "Engineer 2"]
+    with open(path, "a") as f:
+        f.write(_line(3)[5:])
+    df = tail.load()
+    assert df["title"].tolist() == ["Engineer 1", "Engineer 2", "Engineer 3"]
+    assert str(df["fetched_at"].dt.tz) == "UTC"
+
+def test_csv_tail_rereads_a_truncated_or_replaced_file(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(HEADER + _line(1) + _line(2) + _line(3))
+    tail = CsvTail(str(path))
+    assert len(tail.load()) == 3
+    # Shrunk in place: the old offset is past the end
+    with open(path, "r+") as f:
+        f.truncate(len(HEADER) + len(_line(1)))
+    assert tail.load()["title"].tolist() == ["Engineer 1"]
+    # Replaced by a rewrite (new inode), even one that isn't shorter
+    other = tmp_path / "rewritten.csv"
+    other.write_text(HEADER + _line(7) + _line(8))
+    other.replace(path)
+    assert tail.load()["title"].tolist() == ["Engineer 7", "Engineer 8"]
+    path.unlink()
+    assert tail.load().empty
+
+def test_skill_matrix_stays_aligned_across_incremental_loads(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(HEADER + _line(1, "python,sql") + _line(2, ""))
+    tail = CsvTail(str(path))
+    assert skill_columns(tail.load()) == ["skill:python", "skill:sql"]
+    with open(path, "a") as f:
+        f.write(_line(3, "Rust") + _line(4, "python"))
+    df = tail.load()
+    # A skill new in the appended rows is False for the earlier ones, and vice versa
+    assert sorted(skill_columns(df)) == ["skill:python", "skill:rust", "skill:sql"]
+    assert df["skill:rust"].tolist() == [False, False, True, False]
+    assert df["skill:sql"].tolist() == [True, False, False, False]
+    assert df["skill:python"].tolist() == [True, False, False, True]
+    assert all(df[c].dtype == bool for c in skill_columns(df))
+    # Same matrix as loading the whole file at once
+    whole = CsvTail(str(path)).load()
+    assert (df[sorted(skill_columns(df))] == whole[sorted(skill_columns(whole))]).all().all()
+
+def test_filter_df(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(HEADER + _line(1, "python,sql", "2024-01-01") + _line(2, "rust", "2024-01-05")
+                    + _line(3, "", "2024-01-09"))
+    df = CsvTail(str(path)).load()
+    titles = lambda out: out["title"].tolist()
+    assert titles(filter_df(df, None, None, None, ["SQL", "rust"])) == ["Engineer 1", "Engineer 2"]
+    assert titles(filter_df(df, None, None, None, ["cobol"])) == []
+    window = (pd.Timestamp("2024-01-02", tz="UTC"), pd.Timestamp("2024-01-10", tz="UTC"))
+    assert titles(filter_df(df, window, ["LEVER"], ["Acme"], None)) == ["Engineer 2", "Engineer 3"]
+    assert filter_df(df, None, ["greenhouse"], None, None).empty
+
+def _counts(*rows):
+    return pd.DataFrame([(pd.Timestamp(d, tz="UTC"), s, n) for d, s, n in rows],
+                        columns=["period", "skill", "mentions"])
+
+def test_trend_matrix_fills_missing_periods():
+    counts = _counts(("2024-01-01", "python", 3), ("2024-01-02", "python", 1),
+                     ("2024-01-02", "sql", 1), ("2024-01-16", "python", 2))
+    wide = trend_matrix(counts, "W")
+    assert [d.date().isoformat() for d in wide.index] == ["2024-01-07", "2024-01-14", "2024-01-21"]
+    assert wide["python"].tolist() == [4, 0, 2] and wide["sql"].tolist() == [1, 0, 0]
+    daily = trend_matrix(counts, "D")
+    assert len(daily) == 16 and daily["python"].sum() == 6 and daily.loc["2024-01-10"].sum() == 0
+    assert trend_matrix(_counts(), "D").empty
+
+def test_week_over_week_across_a_missing_week():
+    counts = _counts(("2024-01-01", "python", 4), ("2024-01-01", "sql", 2), ("2024-01-15", "python", 2))
+    wow = week_over_week(trend_matrix(counts, "W"), "W")
+    # The week before the latest had no postings: it counts as 0, with no percentage
+    assert wow.loc["python", ["latest", "week_ago", "delta"]].tolist() == [2, 0, 2]
+    assert pd.isna(wow.loc["python", "pct"])
+    assert wow.loc["sql", ["latest", "week_ago", "delta"]].tolist() == [0, 0, 0]
+    assert wow.index.tolist() == ["python", "sql"]  # biggest gain first
+
+    daily = trend_matrix(_counts(("2024-01-01", "python", 4), ("2024-01-08", "python", 5)), "D")
+    wow = week_over_week(daily, "D")
+    assert wow.loc["python"].tolist() == [5, 4, 1, 0.25]
+    assert week_over_week(daily.iloc[:7], "D").empty  # less than a week of history
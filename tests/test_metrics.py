@@ -0,0 +1,62 @@
+import json
+import logging
+
+from benchmarks.stub_boards import StubBoards
+from src.metrics import NO_METRICS, Metrics
+
+def test_disabled_metrics_record_nothing():
+    m = Metrics(enabled=False)
+    with m.timer("fetch", board="acme"):
+        pass
+    m.inc("postings", 3)
+    m.observe("extract", 1.0)
+    assert not m.stages and not m.counters
+    assert NO_METRICS.timer("x") is m.timer("y")  # one shared no-op timer
+
+def test_report_and_prometheus_format():
+    m = Metrics()
+    with m.timer("fetch", source="lever", board="acme"):
+        pass
+    m.observe("extract", 0.5, calls=10)
+    m.inc("bytes_downloaded", 2_500_000, source="lever", board="acme")
+    m.error(ValueError("bad"), source="lever", board='a"b')
+    report = m.report(status="ok")
+    assert report["status"] == "ok"
+    assert {"stage": "extract", "calls": 10, "seconds": 0.5} in report["stages"]
+    assert m.total("errors", source="lever") == 1
+
+    prom = m.prometheus()
+    assert '# TYPE jobskills_stage_seconds gauge' in prom
+    assert 'jobskills_stage_calls{stage="extract"} 10' in prom
+    assert 'jobskills_bytes_downloaded{board="acme",source="lever"} 2500000' in prom
+    assert 'jobskills_errors{board="a\\"b",source="lever",type="ValueError"} 1' in prom
+
+def test_run_report_counts_failed_boards(tmp_path, monkeypatch, caplog):
+    from src import scraper
+    from src.config import Settings
+    from src.sources.lever import LeverSource
+
+    with StubBoards(throttle_every=2, retry_after=0) as stub:
+        monkeypatch.setattr(LeverSource, "API_URL", stub.url + "/v0/postings/{company}?mode=json")
+        monkeypatch.setattr(scraper, "settings", Settings(
+            LEVER_COMPANIES="a,b,c,d", SKILL_LIST="python,sql", HTTP_CACHE="", HTTP_MIN_INTERVAL=0,
+            HTTP_CONCURRENCY=1, HTTP_RETRIES=0, OUTPUT_CSV=str(tmp_path / "jobs.csv"),
+            POSTING_INDEX=str(tmp_path / "index.sqlite"), ROLLUP_PATH="", TEXT_ARCHIVE="",
+            EXTRACT_CACHE="", METRICS_REPORT=str(tmp_path / "runs.jsonl"),
+            METRICS_PROM=str(tmp_path / "jobskills.prom"), ALERT_STATE="", DISCOVERY_PATH="", EMAIL_FROM=None,
+        ))
+        with caplog.at_level(logging.WARNING):
+            scraper.main(["--profile", str(tmp_path / "run.pstats")])
+        throttled = stub.throttled
+
+    record = json.loads((tmp_path / "runs.jsonl").read_text().splitlines()[-1])
+    assert record["status"] == "ok"
+    errors = [c for c in record["counters"] if c["name"] == "errors"]
+    assert sum(c["value"] for c in errors) == throttled == 2
+    assert all(c["type"] == "HTTPError" and c["source"] == "lever" for c in errors)
+    fetched = sum(c["value"] for c in record["counters"] if c["name"] == "postings_fetched")
+    assert fetched == 2 * stub.jobs_per_board
+    assert {"fetch", "normalize", "extract", "store"} <= {s["stage"] for s in record["stages"]}
+    assert sum("failed" in r.getMessage() for r in caplog.records) == 2
+    assert "jobskills_postings_written" in (tmp_path / "jobskills.prom").read_text()
+    assert (tmp_path / "run.pstats").exists()
@@ -0,0 +1,25 @@
+from src.parsers import html_to_text, normalize_posting
+
+LEVER_HTML = (
+    "<div><h3>About us</h3><p>We build <b>data</b> tools&nbsp;for teams.</p>"
+    "<!-- internal note --><ul><li>Python &amp; SQL</li><li>Power BI</li></ul>"
+    "<script>track()</script><style>.x{}</style><br/>Apply&#33;</div>"
+)
+
+def test_html_to_text_matches_beautifulsoup():
+    from bs4 import BeautifulSoup
+    from src.parsers import CLEAN_RE
+    expected = CLEAN_RE.sub(" ", BeautifulSoup(LEVER_HTML, "html.parser").get_text(" ", strip=True)).strip()
+    assert html_to_text(LEVER_HTML) == expected
+    assert expected == "About us We build data tools for teams. Python & SQL Power BI Apply!"
+
+def test_html_to_text_plain_and_empty():
+    assert html_to_text("") == ""
+    assert html_to_text("  plain\n text ") == "plain text"
+
+def test_normalize_posting_strips_html_description():
+    norm = normalize_posting({"title": " Engineer ", "description_html": LEVER_HTML})
+    assert norm["title"] == "Engineer"
+    assert norm["text"].startswith("About us We build data tools")
+    norm = normalize_posting({"description_text": "a \n b", "description_html": "<p>x</p>"})
+    assert norm["text"] == "a b"
@@ -0,0 +1,49 @@
+from src.rollups import RollupStore
+
+def _row(i, day, skills, source="lever", company="acme"):
+    return {"source": source, "company": company, "title": f"Engineer {i}",
+            "url": f"https://example.com/{i}", "skills": skills,
+            "fetched_at": f"{day}T12:00:00+00:00"}
+
+def test_incremental_add_matches_rebuild():
+    rows = [
+        _row(1, "2024-01-01", ["python", "sql"]),
+        _row(2, "2024-01-01", ["python"], company="globex"),
+        _row(3, "2024-01-02", ["sql"], source="greenhouse"),
+    ]
+    inc = RollupStore(":memory:")
+    inc.add(rows[:2])
+    inc.add(rows[2:])
+    full = RollupStore(":memory:")
+    assert full.rebuild(rows, batch_size=2) == 3
+
+    expected = [("2024-01-01", "python", 2), ("2024-01-01", "sql", 1), ("2024-01-02", "sql", 1)]
+    assert inc.daily_skill_counts() == full.daily_skill_counts() == expected
+    assert inc.postings() == 3
+
+def test_rollup_filters():
+    store = RollupStore(":memory:")
+    store.add([_row(1, "2024-01-01", ["python"]), _row(2, "2024-01-03", ["python", "dbt"], company="globex")])
+    assert store.daily_skill_counts(start="2024-01-02") == [("2024-01-03", "dbt", 1), ("2024-01-03", "python", 1)]
+    assert store.daily_skill_counts(companies=["acme"], skills=["python"]) == [("2024-01-01", "python", 1)]
+    assert store.postings(companies=["globex"]) == 1
+
+def test_posting_edited_on_a_later_day_moves_its_counts(tmp_path):
+    from src.storage import SQLiteStorage
+    store, inc = SQLiteStorage(str(tmp_path / "jobs.sqlite")), RollupStore(":memory:")
+    inc.add(store.write([_row(1, "2024-01-01", ["python", "sql"]), _row(2, "2024-01-01", ["sql"])]))
+    # Posting 1 is edited the next day: its single row moves to 2024-01-02
+    edited = _row(1, "2024-01-02", ["python", "rust"])
+    edited["content_hash"] = "v2"
+    written = store.write([edited, _row(2, "2024-01-02", ["sql"])])
+    assert [r["url"] for r in written] == ["https://example.com/1"]
+    assert written[0]["replaces"]["skills"] == ["python", "sql"]
+    inc.add(written)
+
+    full = RollupStore(":memory:")
+    full.rebuild(store.iter_rows())
+    assert inc.daily_skill_counts() == full.daily_skill_counts() == [
+        ("2024-01-01", "sql", 1), ("2024-01-02", "python", 1), ("2024-01-02", "rust", 1)]
+    assert [inc.postings(d, d) for d in ("2024-01-01", "2024-01-02")] == [1, 1]
+    assert len(inc) == len(full) == 2
+    store.close()
@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.scheduler import Schedule
+
+def test_intervals_adapt_to_change_within_bounds(tmp_path):
+    s = Schedule(str(tmp_path / "schedule.sqlite"), interval=100, min_interval=30,
+                 max_interval=150, jitter=0)
+    s.sync({"lever": ["busy", "quiet"], "greenhouse": ["gone"]}, now=0)
+    s.sync({"lever": ["busy", "quiet"]}, now=0)
+    assert s.due(now=0) == {"lever": ["busy", "quiet"]}
+    for _ in range(3):
+        s.polled("lever", "busy", True, now=0)
+        s.polled("lever", "quiet", False, now=0)
+    s.polled("lever", "busy", None, now=0)  # failed polls keep the interval
+    s.close()
+
+    s = Schedule(str(tmp_path / "schedule.sqlite"), interval=100, min_interval=30,
+                 max_interval=150, jitter=0)
+    # busy hit the 30s floor, then was scaled back so the pair stays near 2 polls / 100s;
+    # its pending poll moved back with it
+    assert s.intervals() == {("lever", "busy"): 60, ("lever", "quiet"): 150}
+    assert s.due(now=59) == {}
+    assert s.due(now=60) == {"lever": ["busy"]}
+    assert s.next_at() == 60
+
+def test_total_poll_rate_is_capped():
+    s = Schedule(":memory:", interval=100, min_interval=10, max_interval=1000, jitter=0)
+    s.sync({"lever": ["a", "b", "c", "d"]}, now=0)
+    for board in "abc":
+        s.polled("lever", board, True, now=0)
+    s.polled("lever", "d", False, now=0)
+    s.commit()
+    intervals = s.intervals()
+    assert sum(1 / i for i in intervals.values()) <= 4 / 100 + 1e-9
+    assert intervals[("lever", "a")] < intervals[("lever", "d")]
+
+def test_rate_cap_holds_over_the_first_cycle():
+    # Every board keeps changing, so each poll halves its interval; the
+    # polls in any SERVE_INTERVAL window must still stay at one per board
+    s = Schedule(":memory:", interval=100, min_interval=10, max_interval=1000, jitter=0)
+    boards = {"lever": ["a", "b", "c", "d"]}
+    s.sync(boards, now=0)
+    polls = []
+    for now in range(0, 400):
+        for source, names in s.due(now=now).items():
+            for board in names:
+                s.polled(source, board, True, now=now)
+                polls.append(now)
+        s.commit(now=now)
+    assert polls[:4] == [0, 0, 0, 0]
+    assert s.next_at() >= 100
+    for start in range(0, 300):
+        assert sum(start <= t < start + 100 for t in polls) <= 4
+
+def test_jitter_spreads_next_polls():
+    s = Schedule(":memory:", interval=100, jitter=0.2)
+    s.sync({"lever": [f"b{i}" for i in range(20)]}, now=0)
+    for i in range(20):
+        s.polled("lever", f"b{i}", False, now=0)
+    times = [t for (t,) in s._db.execute("SELECT next_at FROM boards")]
+    assert len(set(times)) > 1 and all(100 <= t <= 150 for t in times)
+
+def test_serve_polls_due_boards_and_stops(tmp_path, monkeypatch, stub_boards):
+    from src import scraper
+    from src.config import Settings
+    from src.sources.lever import LeverSource
+
+    monkeypatch.setattr(LeverSource, "API_URL", stub_boards.url + "/v0/postings/{company}?mode=json")
+    monkeypatch.setattr(scraper, "settings", Settings(
+        LEVER_COMPANIES="acme,globex", SKILL_LIST="python,sql", HTTP_CACHE="", HTTP_MIN_INTERVAL=0,
+        OUTPUT_CSV=str(tmp_path / "jobs.csv"), POSTING_INDEX=str(tmp_path / "index.sqlite"),
+        ROLLUP_PATH="", TEXT_ARCHIVE="", EXTRACT_CACHE=str(tmp_path / "extract.sqlite"),
+        METRICS_REPORT=str(tmp_path / "runs.jsonl"), SCHEDULE_PATH=str(tmp_path / "schedule.sqlite"),
+        DISCOVERY_PATH="", ALERT_STATE="", SERVE_INTERVAL=100, SERVE_MIN_INTERVAL=10, SERVE_MAX_INTERVAL=1000, SERVE_JITTER=0,
+    ))
+    stop = threading.Event()
+    daemon = threading.Thread(target=scraper.serve, args=(stop,))
+    daemon.start()
+    deadline = time.time() + 10
+    while len(stub_boards.requests) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.2)
+    stop.set()
+    daemon.join(5)
+    assert not daemon.is_alive()
+    assert len(stub_boards.requests) == 2  # the next poll isn't due yet
+    assert len((tmp_path / "jobs.csv").read_text().splitlines()) == 1 + 6
+
+    # Force both boards due: nothing new this time, so they are polled less often
+    with sqlite3.connect(tmp_path / "schedule.sqlite") as db:
+        db.execute("UPDATE boards SET next_at = 0")
+    scraper.serve(max_passes=1)
+    assert len(stub_boards.requests) == 4
+    schedule = Schedule(str(tmp_path / "schedule.sqlite"), interval=100)
+    # First pass: 100 -> 50, scaled back to 100 to stay within the request budget
+    assert set(schedule.intervals().values()) == {100 * 1.25}
+    assert (tmp_path / "runs.jsonl").read_text().count('"mode": "serve"') == 2
+
+def test_rss_feed_with_new_items_is_polled_sooner(tmp_path, monkeypatch, stub_boards):
+    # RSS rows carry no company, so the feed must be recognized by its board (URL)
+    from src import scraper
+    from src.config import Settings
+
+    feeds = [f"{stub_boards.url}/rss/{name}" for name in ("busy", "quiet")]
+    monkeypatch.setattr(scraper, "settings", Settings(
+        LEVER_COMPANIES="", GREENHOUSE_BOARDS="", SOURCE_BOARDS="company_rss=" + ",".join(feeds),
+        SKILL_LIST="python,kafka", HTTP_CACHE="", HTTP_MIN_INTERVAL=0,
+        OUTPUT_CSV=str(tmp_path / "jobs.csv"), POSTING_INDEX=str(tmp_path / "index.sqlite"),
+        ROLLUP_PATH="", TEXT_ARCHIVE="", EXTRACT_CACHE="", METRICS_REPORT="",
+        SCHEDULE_PATH=str(tmp_path / "schedule.sqlite"), DISCOVERY_PATH="", ALERT_STATE="",
+        SERVE_INTERVAL=100, SERVE_MIN_INTERVAL=10, SERVE_MAX_INTERVAL=1000, SERVE_JITTER=0,
+    ))
+    scraper.serve(max_passes=1)
+    assert len((tmp_path / "jobs.csv").read_text().splitlines()) == 1 + 6
+
+    stub_boards.feeds["busy"] = 4  # one new item on one feed
+    with sqlite3.connect(tmp_path / "schedule.sqlite") as db:
+        db.execute("UPDATE boards SET next_at = 0")
+    scraper.serve(max_passes=1)
+    intervals = Schedule(str(tmp_path / "schedule.sqlite"), interval=100).intervals()
+    busy, quiet = intervals[("company_rss", feeds[0])], intervals[("company_rss", feeds[1])]
+    assert busy < quiet
+    assert busy == pytest.approx(50 * 1.4) and quiet == pytest.approx(125 * 1.4)
+
+def test_serve_alerts_when_the_day_rolls_over(tmp_path, monkeypatch, stub_boards):
+    from src import scraper
+    from src.config import Settings
+    from src.sources.lever import LeverSource
+    from src.storage import read_csv_rows
+
+    monkeypatch.setattr(LeverSource, "API_URL", stub_boards.url + "/v0/postings/{company}?mode=json")
+    monkeypatch.setattr(scraper, "settings", Settings(
+        LEVER_COMPANIES="acme,globex", SKILL_LIST="python,sql", HTTP_CACHE="", HTTP_MIN_INTERVAL=0,
+        OUTPUT_CSV=str(tmp_path / "jobs.csv"), POSTING_INDEX=str(tmp_path / "index.sqlite"),
+        ROLLUP_PATH="", TEXT_ARCHIVE="", EXTRACT_CACHE="", METRICS_REPORT="", DISCOVERY_PATH="",
+        SCHEDULE_PATH=str(tmp_path / "schedule.sqlite"), ALERT_STATE=str(tmp_path / "alerts.sqlite"),
+        EMAIL_FROM=None, SERVE_INTERVAL=0.05, SERVE_MIN_INTERVAL=0.01, SERVE_MAX_INTERVAL=0.1, SERVE_JITTER=0,
+    ))
+    today, polls, real_poll = ["2024-01-01"], [], scraper.poll
+
+    def poll(*args):
+        metrics = real_poll(*args)
+        polls.append(today[0])
+        if len(polls) == 2:
+            assert not (tmp_path / "alerts.sqlite").exists()  # same day: nothing yet
+            today[0] = "2024-01-02"
+        return metrics
+    monkeypatch.setattr(scraper, "utc_day", lambda: today[0])
+    monkeypatch.setattr(scraper, "poll", poll)
+    scraper.serve(max_passes=2)
+
+    assert polls == ["2024-01-01", "2024-01-01"] and len(stub_boards.requests) == 4
+    expected = sum("python" in r["skills"] for r in read_csv_rows(str(tmp_path / "jobs.csv")))
+    assert expected > 0
+    with sqlite3.connect(tmp_path / "alerts.sqlite") as db:
+        # Every board polled twice that day, yet each posting counts once
+        assert db.execute("SELECT day, mentions FROM skill_stats WHERE skill = 'python'").fetchone() == (
+            "2024-01-01", expected)
@@ -0,0 +1,93 @@
+from src.scraper import Sink, batched, extract, extract_parallel, run
+
+class MemoryStore:
+    path = "memory"
+
+    def __init__(self, fail_after=None):
+        self.batches = []
+        self.fail_after = fail_after
+        self.closed = False
+
+    def write(self, rows):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError("disk full")
+        self.batches.append(list(rows))
+        return rows
+
+    def close(self):
+        self.closed = True
+
+def _raws(n):
+    for i in range(n):
+        yield {"source": "lever", "title": f"Engineer {i}", "url": f"u{i}",
+               "description_text": "Python and SQL" if i % 2 else "Python"}
+
+def test_batched():
+    assert [len(b) for b in batched(range(7), 3)] == [3, 3, 1]
+
+def test_pipeline_flushes_batches_and_counts():
+    sink = run(extract(_raws(5), ["python", "sql"]), Sink(MemoryStore()), batch_size=2)
+    assert [len(b) for b in sink.store.batches] == [2, 2, 1]
+    assert sink.counts == {"python": 5, "sql": 2}
+    assert (sink.seen, sink.written) == (5, 5)
+    assert sink.store.closed
+
+def test_pipeline_keeps_flushed_batches_on_failure():
+    consumed = []
+
+    def rows():
+        for r in extract(_raws(10), ["python"]):
+            consumed.append(r)
+            yield r
+
+    store = MemoryStore(fail_after=2)
+    try:
+        run(rows(), Sink(store), batch_size=3)
+    except RuntimeError:
+        pass
+    assert [len(b) for b in store.batches] == [3, 3]
+    assert len(consumed) == 9  # the stream is pulled one batch at a time
+    assert store.closed
+
+def test_main_end_to_end(stub_boards, tmp_path, monkeypatch):
+    import csv
+    from src import scraper
+    from src.config import Settings
+    from src.discovery import Discovery
+    from src.rollups import RollupStore
+    from src.sources.lever import LeverSource
+
+    monkeypatch.setattr(LeverSource, "API_URL", stub_boards.url + "/v0/postings/{company}?mode=json")
+    monkeypatch.setattr(scraper, "settings", Settings(
+        LEVER_COMPANIES="acme,globex", SKILL_LIST="python,sql,airflow",
+        OUTPUT_CSV=str(tmp_path / "jobs.csv"), POSTING_INDEX=str(tmp_path / "index.sqlite"),
+        ROLLUP_PATH=str(tmp_path / "rollups.sqlite"), HTTP_CACHE="", HTTP_MIN_INTERVAL=0,
+        EXTRACT_CACHE=str(tmp_path / "extract.sqlite"), TEXT_ARCHIVE=str(tmp_path / "texts.sqlite"),
+        METRICS_REPORT=str(tmp_path / "runs.jsonl"),
+        BATCH_SIZE=4, ALERT_STATE=str(tmp_path / "alerts.sqlite"),
+        DISCOVERY_PATH=str(tmp_path / "discovery.sqlite"), EMAIL_FROM=None,
+    ))
+    scraper.main([])
+    scraper.main([])  # second run: everything unchanged
+
+    with open(tmp_path / "jobs.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6
+    assert {r["skills"] for r in rows} == {"airflow,python,sql"}
+    assert RollupStore(str(tmp_path / "rollups.sqlite")).postings() == 6
+    postings, terms = Discovery(str(tmp_path / "discovery.sqlite")).daily()
+    assert sum(postings.values()) == 6 and "airflow" in terms
+
+def test_parallel_extraction_matches_serial():
+    # HTML only, so stripping happens in the worker processes too
+    raws = []
+    for i, r in enumerate(_raws(50)):
+        del r["description_text"]
+        body = "<p>Python &amp; <b>SQL</b></p>" if i % 3 else "<ul><li>Python</li><li>Spark</li></ul>"
+        raws.append(dict(r, description_html=f"<div>{body}<p>Role {i}</p></div>"))
+    serial = list(extract([dict(r) for r in raws], ["python", "sql"]))
+    parallel = list(extract_parallel([dict(r) for r in raws], ["python", "sql"], workers=2, batch_size=7))
+    assert parallel == serial
+    assert parallel[1]["text"].split() == ["Python", "&", "SQL", "Role", "1"]
+    assert [r["skills"] for r in parallel[:3]] == [["python"], ["python", "sql"], ["python", "sql"]]
+    assert all(r["description"][0] == "html" for r in parallel)
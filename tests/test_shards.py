@@ -0,0 +1,120 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from benchmarks.stub_boards import StubBoards
+from src.config import Settings
+from src.discovery import Discovery
+from src.shards import merge, merge_alerts, parse_shard, segment_path, shard_boards, shard_of, shard_settings
+from src.storage import read_csv_rows
+
+BOARDS = [f"co{i}" for i in range(12)]
+
+def _settings(tmp, **kw):
+    return Settings(**{**dict(
+        LEVER_COMPANIES=",".join(BOARDS), SKILL_LIST="python,sql", HTTP_MIN_INTERVAL=0,
+        OUTPUT_CSV=f"{tmp}/jobs.csv", POSTING_INDEX=f"{tmp}/index.sqlite",
+        ROLLUP_PATH=f"{tmp}/rollups.sqlite", TEXT_ARCHIVE=f"{tmp}/texts.sqlite",
+        HTTP_CACHE=f"{tmp}/http.sqlite", EXTRACT_CACHE=f"{tmp}/extract.sqlite",
+        METRICS_REPORT=f"{tmp}/runs.jsonl", ALERT_STATE=f"{tmp}/alerts.sqlite",
+        DISCOVERY_PATH=f"{tmp}/discovery.sqlite",
+        EMAIL_FROM=None), **kw})
+
+def _scrape_shard(url, tmp, shard):
+    # Runs in a fresh process: point it at the stub and its own settings
+    from src import scraper
+    from src.sources.lever import LeverSource
+    LeverSource.API_URL = url + "/v0/postings/{company}?mode=json"
+    scraper.settings = _settings(tmp)
+    scraper.main(["--shard", shard])
+
+def test_shard_assignment_is_stable_and_disjoint():
+    assert parse_shard("1/4") == (1, 4)
+    for bad in ("4/4", "-1/2", "x", "1/2/3"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+    boards = {"lever": BOARDS, "greenhouse": ["gh1", "gh2"]}
+    slices = [shard_boards(boards, i, 3) for i in range(3)]
+    for source, names in boards.items():
+        taken = [b for s in slices for b in s[source]]
+        assert sorted(taken) == sorted(names)
+    assert shard_of("lever", "co1", 3) == shard_of("lever", " CO1", 3)
+    assert segment_path("data/jobs.csv", 1, 4) == "data/jobs.shard-1-of-4.csv"
+    assert segment_path("data/jobs", 0, 2) == "data/jobs.shard-0-of-2"
+    assert segment_path("", 0, 2) == ""
+    s = shard_settings(Settings(OUTPUT_CSV="d/jobs.csv", METRICS_PROM=""), 2, 3)
+    assert (s.SHARD, s.OUTPUT_CSV, s.METRICS_PROM) == ("2/3", "d/jobs.shard-2-of-3.csv", "")
+
+def test_shards_scrape_concurrently_and_merge(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    with StubBoards(latency=0.05) as stub:
+        procs = [ctx.Process(target=_scrape_shard, args=(stub.url, str(tmp_path), f"{i}/3"))
+                 for i in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(60)
+        assert [p.exitcode for p in procs] == [0, 0, 0]
+        assert len(stub.requests) == len(BOARDS)
+
+    companies = []
+    for i in range(3):
+        rows = list(read_csv_rows(str(tmp_path / f"jobs.shard-{i}-of-3.csv")))
+        companies.append({r["company"] for r in rows})
+    assert set().union(*companies) == set(BOARDS)
+    assert sum(map(len, companies)) == len(BOARDS)
+
+    base = _settings(tmp_path)
+    assert merge(base, 3) == (36, 36)
+    assert merge(base, 3) == (36, 0)  # repeatable
+    rows = list(read_csv_rows(str(tmp_path / "jobs.csv")))
+    assert len(rows) == 36 and {r["company"] for r in rows} == set(BOARDS)
+    with sqlite3.connect(tmp_path / "rollups.sqlite") as db:
+        assert db.execute("SELECT SUM(postings) FROM posting_counts").fetchone()[0] == 36
+    with sqlite3.connect(tmp_path / "texts.sqlite") as db:
+        assert db.execute("SELECT COUNT(*) FROM posting_texts").fetchone()[0] == 36
+    postings, terms = Discovery(str(tmp_path / "discovery.sqlite")).daily()
+    assert sum(postings.values()) == 36  # counted once at merge, not again on the repeat
+    assert sum(terms["python"].values()) == 36
+    assert (tmp_path / "runs.jsonl").read_text().count('"shard"') == 3
+
+    # Shards leave alerts and discovery to the merge: no per-shard state, just counts
+    assert not list(tmp_path.glob("discovery.shard-*")) and not list(tmp_path.glob("alerts.shard-*.sqlite"))
+    assert len(list(tmp_path.glob("alerts.shard-*-of-3.counts.json"))) == 3
+    assert merge_alerts(base, 3) == []  # no history yet, so no spike
+    with sqlite3.connect(tmp_path / "alerts.sqlite") as db:
+        assert db.execute("SELECT mentions FROM skill_stats WHERE skill = 'python'").fetchone() == (36,)
+
+def test_shard_run_leaves_module_settings_alone(tmp_path, monkeypatch):
+    from src import scraper
+    base = _settings(tmp_path, LEVER_COMPANIES="")
+    monkeypatch.setattr(scraper, "settings", base)
+    scraper.main(["--shard", "1/2"])
+    assert scraper.settings is base
+
+@pytest.mark.parametrize("batch_size", [1, 10000])
+def test_merge_keeps_every_version_once(tmp_path, batch_size):
+    from src.storage import CSVStorage
+    base = _settings(tmp_path, DISCOVERY_PATH="", TEXT_ARCHIVE="")
+    seg = CSVStorage(shard_settings(base, 0, 2).OUTPUT_CSV)
+    posting = {"source": "lever", "title": "Data Engineer", "company": "co1",
+               "url": "https://x.test/1", "skills": ["python"]}
+    seg.write([{**posting, "fetched_at": "2024-01-01T10:00:00+00:00"},
+               {**posting, "url": "https://x.test/2", "fetched_at": "2024-01-01T10:00:00+00:00"}])
+    # Edited the next day: the segment holds both versions
+    seg.write([{**posting, "skills": ["python", "sql"], "fetched_at": "2024-01-02T10:00:00+00:00"}])
+
+    assert merge(base, 2, batch_size) == (3, 3)
+    assert merge(base, 2, batch_size) == (3, 0)
+    rows = list(read_csv_rows(str(tmp_path / "jobs.csv")))
+    assert [(r["url"][-1], r["skills"]) for r in rows] == [("1", ["python"]), ("2", ["python"]),
+                                                          ("1", ["python", "sql"])]
+    with sqlite3.connect(tmp_path / "rollups.sqlite") as db:
+        assert db.execute("SELECT day, SUM(postings) FROM posting_counts GROUP BY day").fetchall() == [
+            ("2024-01-01", 2), ("2024-01-02", 1)]
+
+    # A new version after the last merge is the only thing the next one adds
+    seg.write([{**posting, "title": "Senior Data Engineer", "fetched_at": "2024-01-03T10:00:00+00:00"}])
+    assert merge(base, 2, batch_size) == (4, 1)
+    assert len(list(read_csv_rows(str(tmp_path / "jobs.csv")))) == 4
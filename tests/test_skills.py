@@ -6,3 +6,17 @@ def test_extract_basic():
     assert "python" in found
     assert "sql" in found
     assert "airflow" in found
+
+def test_extract_aliases():
+    found = extract_skills("Experience with PySpark and PowerBI dashboards", ["spark", "power bi"])
+    assert found == ["power bi", "spark"]
+
+def test_matcher_overlapping_terms():
+    from src.skills import SkillMatcher
+    m = SkillMatcher(["power", "power bi", "bi", "c", "c++"], aliases={})
+    assert m.find("Power BI and C++") == ["bi", "c", "power", "power bi"]
+    assert m.find("powerbi") == []
+
+def test_matcher_word_boundaries():
+    found = extract_skills("pythonic sqlite ragtime", ["python", "sql", "rag"])
+    assert found == []
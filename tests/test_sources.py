@@ -0,0 +1,219 @@
+import time
+
+import pytest
+import requests
+
+from benchmarks.stub_boards import StubBoards
+from src.metrics import Metrics
+from src.sources.http import HttpClient, _HostGate, retry_after
+from src.sources.lever import LeverSource
+from src.sources.greenhouse import GreenhouseSource
+
+def _lever(stub, companies, client):
+    src = LeverSource(companies, client=client)
+    src.API_URL = stub.url + "/v0/postings/{company}?mode=json"
+    return src
+
+def _greenhouse(stub, boards, client):
+    src = GreenhouseSource(boards, client=client)
+    src.API_URL = stub.url + "/v1/boards/{token}/jobs"
+    return src
+
+def test_lever_and_greenhouse_fetch(stub_boards):
+    client = HttpClient(concurrency=4, min_interval=0)
+    lever = list(_lever(stub_boards, ["acme", "globex"], client).fetch())
+    gh = list(_greenhouse(stub_boards, ["initech"], client).fetch())
+    assert len(lever) == 6 and len(gh) == 3
+    assert {p["company"] for p in lever} == {"acme", "globex"}
+    assert lever[0]["description_text"] == "Python, SQL and Airflow on AWS."
+    assert gh[0]["location"] == "New York"
+
+def test_failed_board_is_skipped(stub_boards):
+    client = HttpClient(concurrency=2, min_interval=0, retries=2, backoff=0.01)
+    src = _greenhouse(stub_boards, ["ok", "missing"], client)
+    stub_boards.route = lambda path: (500, {}) if "missing" in path else (200, {"jobs": [{"title": "x"}]})
+    assert [p["company"] for p in src.fetch()] == ["ok"]
+    assert sum("missing" in p for p in stub_boards.requests) == 3  # first try + 2 retries
+
+def test_fetch_is_concurrent_and_bounded(stub_boards):
+    stub_boards.latency = 0.2
+    client = HttpClient(concurrency=5, min_interval=0)
+    start = time.perf_counter()
+    rows = list(_lever(stub_boards, [f"c{i}" for i in range(10)], client).fetch())
+    elapsed = time.perf_counter() - start
+    assert len(rows) == 30
+    assert stub_boards.peak_in_flight <= 5
+    assert elapsed < 1.2  # serial would take >= 2s
+
+def test_min_interval_spaces_requests(stub_boards):
+    client = HttpClient(concurrency=4, min_interval=0.1)
+    start = time.perf_counter()
+    list(_lever(stub_boards, ["a", "b", "c", "d"], client).fetch())
+    assert time.perf_counter() - start >= 0.3
+
+def test_greenhouse_bulk_content(stub_boards):
+    client = HttpClient(min_interval=0)
+    src = _greenhouse(stub_boards, ["initech"], client)
+    src.content = "bulk"
+    rows = list(src.fetch())
+    assert rows[0]["description_text"] == "We use dbt and Snowflake."
+    assert stub_boards.requests == ["/v1/boards/initech/jobs?content=true"]
+
+def test_greenhouse_detail_content_is_cached(stub_boards):
+    from src.sources.greenhouse import ContentCache
+    client = HttpClient(concurrency=2, min_interval=0)
+    cache = ContentCache(":memory:")
+    src = _greenhouse(stub_boards, ["initech"], client)
+    src.content, src.cache = "detail", cache
+    src.JOB_URL = stub_boards.url + "/v1/boards/{token}/jobs/{job_id}"
+
+    first = list(src.fetch())
+    assert {r["description_text"] for r in first} == {"We use dbt and Snowflake."}
+    assert len(stub_boards.requests) == 4  # listing + 3 details
+
+    stub_boards.requests.clear()
+    second = list(src.fetch())
+    assert sorted(r["url"] for r in second) == sorted(r["url"] for r in first)
+    assert stub_boards.requests == ["/v1/boards/initech/jobs"]
+
+def test_greenhouse_detail_cache_uses_listing_timestamp():
+    from src.sources.greenhouse import ContentCache
+
+    class DetailClock(StubBoards):
+        def greenhouse_job(self, token, i, content=True):
+            job = super().greenhouse_job(token, i, content)
+            if content:  # the detail endpoint reports the same time in UTC
+                job["updated_at"] = "2024-01-01T05:00:00Z"
+            return job
+
+    with DetailClock() as stub:
+        src = _greenhouse(stub, ["initech"], HttpClient(min_interval=0))
+        src.content, src.cache = "detail", ContentCache(":memory:")
+        src.JOB_URL = stub.url + "/v1/boards/{token}/jobs/{job_id}"
+        list(src.fetch())
+        stub.requests.clear()
+        assert len(list(src.fetch())) == 3
+        assert stub.requests == ["/v1/boards/initech/jobs"]
+
+def test_greenhouse_content_cache_is_closed_after_a_run(stub_boards, tmp_path, monkeypatch):
+    import sqlite3
+    from src import scraper
+    from src.config import Settings
+    from src.sources.greenhouse import ContentCache
+
+    opened, real_init = [], ContentCache.__init__
+    def init(self, path):
+        real_init(self, path)
+        opened.append(self)
+    monkeypatch.setattr(ContentCache, "__init__", init)
+    monkeypatch.setattr(GreenhouseSource, "API_URL", stub_boards.url + "/v1/boards/{token}/jobs")
+    monkeypatch.setattr(GreenhouseSource, "JOB_URL", stub_boards.url + "/v1/boards/{token}/jobs/{job_id}")
+    s = Settings(LEVER_COMPANIES="", GREENHOUSE_BOARDS="initech", SOURCE_BOARDS="", GREENHOUSE_CONTENT="detail",
+                 GREENHOUSE_CONTENT_CACHE=str(tmp_path / "gh.sqlite"), HTTP_CACHE="", EXTRACT_CACHE="",
+                 HTTP_MIN_INTERVAL=0, SKILL_LIST="dbt")
+    assert len(list(scraper.collect(s=s))) == 3
+    assert len(opened) == 1
+    with pytest.raises(sqlite3.ProgrammingError):  # closed, not leaked
+        opened[0]._db.execute("SELECT 1")
+    with sqlite3.connect(tmp_path / "gh.sqlite") as db:
+        assert db.execute("SELECT COUNT(*) FROM content").fetchone() == (3,)
+
+def test_conditional_requests_replay_or_skip(stub_boards):
+    from src.sources.http import ResponseCache
+    cache = ResponseCache(":memory:")
+    client = HttpClient(min_interval=0, cache=cache)
+    src = _lever(stub_boards, ["acme", "globex"], client)
+
+    first = list(src.fetch())
+    assert (cache.stats.hits, cache.stats.misses) == (0, 2)
+
+    second = list(src.fetch())
+    assert sorted(r["url"] for r in second) == sorted(r["url"] for r in first)
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+    assert cache.stats.bytes_saved > 0
+
+    client.skip_unchanged = True
+    assert list(src.fetch()) == []
+    assert cache.stats.hits == 4
+
+def test_not_modified_without_cached_body_is_refetched(stub_boards):
+    from src.sources.http import ResponseCache
+    url = stub_boards.url + "/v0/postings/acme?mode=json"
+    etag = HttpClient(min_interval=0, cache=ResponseCache(":memory:")).get(url).headers["ETag"]
+
+    # Validators that outlived their cached body (e.g. the cache file was replaced)
+    cache = ResponseCache(":memory:")
+    client = HttpClient(min_interval=0, cache=cache)
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and len(r.json()) == stub_boards.jobs_per_board
+    assert not r.from_cache and cache.validators(url) == {"If-None-Match": etag}
+    assert stub_boards.requests == ["/v0/postings/acme?mode=json"] * 3
+    assert client.get(url).from_cache
+
+def test_endless_not_modified_is_an_error_not_a_loop():
+    from src.sources.http import ResponseCache
+
+    class AlwaysNotModified(StubBoards):
+        def route(self, path):
+            return 304, ""
+
+    with AlwaysNotModified() as stub:
+        url = stub.url + "/v0/postings/acme?mode=json"
+        client = HttpClient(min_interval=0, cache=ResponseCache(":memory:"))
+        with pytest.raises(requests.HTTPError, match="304"):
+            client.get(url, headers={"If-None-Match": '"stale"'})
+        assert len(stub.requests) == 2  # the conditional request, then one plain refetch
+        with pytest.raises(requests.HTTPError, match="304"):
+            client.get(url, cache=False)
+        assert len(stub.requests) == 3
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_throttled_requests_are_retried(status):
+    with StubBoards(throttle_every=2, retry_after=None, throttle_status=status) as stub:
+        metrics = Metrics()
+        client = HttpClient(concurrency=1, min_interval=0, backoff=0.01, metrics=metrics)
+        rows = list(_lever(stub, ["a", "b", "c", "d"], client).fetch())
+    assert len(rows) == 12 and stub.throttled == 3  # every retry lands on an odd request
+    assert metrics.total("retries", reason=str(status)) == 3
+    assert metrics.total("errors") == 0
+
+def test_retry_after_is_honored_for_the_whole_host():
+    with StubBoards(throttle_every=3, retry_after=0.3) as stub:
+        client = HttpClient(concurrency=1, min_interval=0)
+        start = time.perf_counter()
+        rows = list(_lever(stub, ["a", "b", "c"], client).fetch())
+        elapsed = time.perf_counter() - start
+    assert len(rows) == 9 and stub.throttled == 1
+    assert elapsed >= 0.3
+
+def test_long_retry_after_fails_fast():
+    with StubBoards(throttle_every=1, retry_after=3600) as stub:
+        client = HttpClient(min_interval=0, max_retry_after=60)
+        with pytest.raises(requests.HTTPError):
+            client.get(stub.url + "/v0/postings/a?mode=json")
+    assert len(stub.requests) == 1
+
+def test_retry_after_parses_seconds_and_dates():
+    r = requests.Response()
+    assert retry_after(r) is None
+    r.headers["Retry-After"] = "7"
+    assert retry_after(r) == 7
+    r.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert retry_after(r) == 0  # in the past
+    r.headers["Retry-After"] = "soon"
+    assert retry_after(r) is None
+
+def test_host_gate_speeds_up_and_backs_off():
+    gate = _HostGate(concurrency=1, rate=4, max_rate=6)
+    for _ in range(3 * gate.INCREASE_AFTER):
+        gate.succeeded()
+    assert gate.rate == 6
+    gate.throttled(0.05)
+    assert gate.rate == 3 and gate.tokens == 0
+    start = time.perf_counter()
+    with gate:
+        pass
+    assert time.perf_counter() - start >= 0.05
+    for _ in range(10):
+        gate.throttled(0)
+    assert gate.rate == gate.min_rate
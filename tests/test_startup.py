@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from src.config import Settings
+from src.sources import registry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only loaded once a run actually fetches, alerts or uses those backends
+HEAVY = ("bs4", "requests", "urllib3", "smtplib", "concurrent.futures.process", "pandas", "pyarrow",
+         "src.sources.lever", "src.sources.greenhouse", "src.sources.company_rss")
+
+# Seconds `import src.scraper` may take (best of 3); it was ~0.2s with every
+# source and requests imported eagerly
+IMPORT_BUDGET = 0.15
+
+def _python(code, *flags):
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True,
+                          text=True, check=True)
+
+def test_scraper_import_stays_light():
+    out = _python("import sys, src.scraper; print('\\n'.join(sys.modules))").stdout.split()
+    assert [m for m in HEAVY if m in out] == []
+
+def test_scraper_import_time_budget():
+    def once():
+        err = _python("import src.scraper", "-X", "importtime").stderr
+        line = next(l for l in err.splitlines() if l.rstrip().endswith("| src.scraper"))
+        return int(line.split("|")[1]) / 1e6
+    assert min(once() for _ in range(3)) < IMPORT_BUDGET
+
+def test_no_op_run_opens_nothing(tmp_path, monkeypatch, capsys):
+    from src import scraper
+    monkeypatch.setattr(scraper, "settings", Settings(
+        LEVER_COMPANIES="", GREENHOUSE_BOARDS="", SOURCE_BOARDS="", OUTPUT_CSV=str(tmp_path / "jobs.csv"),
+        POSTING_INDEX=str(tmp_path / "index.sqlite"), ROLLUP_PATH=str(tmp_path / "rollups.sqlite"),
+        TEXT_ARCHIVE="", EXTRACT_CACHE="", HTTP_CACHE="", METRICS_REPORT=str(tmp_path / "runs.jsonl"),
+        ALERT_STATE="", DISCOVERY_PATH="",
+    ))
+    scraper.main([])
+    assert "No sources configured" in capsys.readouterr().out
+    assert os.listdir(tmp_path) == []
+
+def test_source_boards_setting():
+    s = Settings(LEVER_COMPANIES="Acme", GREENHOUSE_BOARDS="",
+                 SOURCE_BOARDS="company_rss=https://x.test/Jobs.rss ; lever=beta,acme,beta;;")
+    assert s.boards == {"lever": ["acme", "beta"], "greenhouse": [],
+                        "company_rss": ["https://x.test/Jobs.rss"]}
+
+def test_registry_builtins_and_unknown():
+    assert {"lever", "greenhouse", "company_rss"} <= set(registry.available())
+    from src.sources.lever import LeverSource
+    assert registry.load("lever") is LeverSource
+    with pytest.raises(ValueError, match="unknown source 'nope'"):
+        registry.load("nope")
+
+def test_entry_point_source_runs_end_to_end(tmp_path, monkeypatch):
+    # A third-party package, installed the way pip would lay it out
+    (tmp_path / "fake_boards.py").write_text(textwrap.dedent("""
+        class FakeSource:
+            name = "fake"
+
+            def __init__(self, boards, client=None):
+                self.boards = boards
+
+            def fetch(self):
+                for b in self.boards:
+                    yield {"title": "Data Engineer", "company": b, "url": f"https://fake.test/{b}",
+                           "description_text": "Python and SQL"}
+    """))
+    dist = tmp_path / "fake_boards-1.0.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text("Metadata-Version: 2.1\nName: fake-boards\nVersion: 1.0\n")
+    (dist / "entry_points.txt").write_text("[jobskills.sources]\nfake = fake_boards:FakeSource\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(registry._loaded, "fake", raising=False)
+    assert "fake" in registry.available()
+
+    from src import scraper
+    from src.storage import read_csv_rows
+    out = tmp_path / "out"
+    monkeypatch.setattr(scraper, "settings", Settings(
+        LEVER_COMPANIES="", GREENHOUSE_BOARDS="", SOURCE_BOARDS="fake=one,two", SKILL_LIST="python,sql",
+        OUTPUT_CSV=str(out / "jobs.csv"), POSTING_INDEX=str(out / "index.sqlite"), ROLLUP_PATH="",
+        TEXT_ARCHIVE="", EXTRACT_CACHE="", HTTP_CACHE="", METRICS_REPORT="", ALERT_STATE="",
+        DISCOVERY_PATH="",
+    ))
+    scraper.main([])
+    rows = list(read_csv_rows(str(out / "jobs.csv")))
+    assert sorted(r["company"] for r in rows) == ["one", "two"]
+    assert {r["source"] for r in rows} == {"fake"}
@@ -0,0 +1,202 @@
+import csv
+
+import pytest
+
+from src.storage import PostingIndex, ingest_rows, posting_key
+
+def _row(i, **kw):
+    row = {"source": "lever", "title": f"Engineer {i}", "company": "acme",
+           "url": f"https://jobs.lever.co/acme/{i}", "source_id": f"id{i}",
+           "skills": ["python"], "text": "Python"}
+    row.update(kw)
+    return row
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+@pytest.mark.parametrize("drop, key", [
+    ({"source_id": None}, "lever:url:https://jobs.lever.co/acme/1"),
+    ({"url": None}, "lever:id:id1"),
+    ({"url": "", "source_id": 0}, "lever:id:0"),
+])
+def test_posting_key_tiers(drop, key):
+    assert posting_key(_row(1, **drop)) == key
+
+def test_posting_key_fallbacks():
+    # URL wins over the job id: it is the only identifier jobs.csv history keeps
+    assert posting_key(_row(1)) == "lever:url:https://jobs.lever.co/acme/1"
+    a = posting_key(_row(1, source_id=None, url=None))
+    assert a.startswith("lever:hash:") and a == posting_key(_row(1, source_id="", url=""))
+    assert a != posting_key(_row(1, source_id=None, url=None, location="Berlin"))
+    assert a != posting_key(_row(1, source_id=None, url=None, source="greenhouse"))
+
+def test_ingest_writes_only_new_or_changed(tmp_path):
+    path = str(tmp_path / "jobs.csv")
+    index = PostingIndex(str(tmp_path / "index.sqlite"))
+
+    assert ingest_rows(path, [_row(1), _row(2)], index) == 2
+    assert ingest_rows(path, [_row(1), _row(2)], index) == 0
+    assert ingest_rows(path, [_row(1), _row(2, skills=["python", "sql"]), _row(3)], index) == 2
+
+    rows = _csv_rows(path)
+    assert [r["title"] for r in rows] == ["Engineer 1", "Engineer 2", "Engineer 2", "Engineer 3"]
+    assert len(index) == 3
+
+def test_failed_append_leaves_rows_unseen(tmp_path, monkeypatch):
+    from src import storage
+    path, index = str(tmp_path / "jobs.csv"), PostingIndex(str(tmp_path / "index.sqlite"))
+    store = storage.CSVStorage(path, index)
+
+    def disk_full(*args):
+        raise OSError("No space left on device")
+    monkeypatch.setattr(storage, "append_rows", disk_full)
+    with pytest.raises(OSError):
+        store.write([_row(1), _row(2)])
+    with pytest.raises(OSError):
+        ingest_rows(path, [_row(3)], index)
+    assert len(index) == 0
+    monkeypatch.undo()
+    # The next run stores them instead of skipping them as already seen
+    assert len(store.write([_row(1), _row(2)])) == 2
+    assert ingest_rows(path, [_row(3)], index) == 1
+    assert len(_csv_rows(path)) == 3 and len(index) == 3
+
+def test_index_tracks_first_and_last_seen(tmp_path):
+    index = PostingIndex(str(tmp_path / "index.sqlite"))
+    index.upsert([_row(1)], seen_at="2024-01-01")
+    index.upsert([_row(1)], seen_at="2024-01-05")
+    assert index.seen(posting_key(_row(1))) == ("2024-01-01", "2024-01-05")
+    index.close()
+    assert PostingIndex(str(tmp_path / "index.sqlite")).seen(posting_key(_row(1)))[1] == "2024-01-05"
+    index = PostingIndex(str(tmp_path / "index.sqlite"))
+    index.upsert([_row(2, url=None)], seen_at="2024-01-06")
+    assert index.seen("lever:id:id2") == ("2024-01-06", "2024-01-06")
+
+def test_index_is_namespaced_per_output(tmp_path):
+    import sqlite3
+    from src.config import Settings
+    from src.storage import open_storage
+    idx = str(tmp_path / "index.sqlite")
+    # An index written before namespacing is adopted by the first output that opens it
+    db = sqlite3.connect(idx)
+    db.execute("CREATE TABLE postings (key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL,"
+               " first_seen TEXT NOT NULL, last_seen TEXT NOT NULL)")
+    db.execute("INSERT INTO postings VALUES ('k', 'fp', '2024-01-01', '2024-01-02')")
+    db.commit()
+    db.close()
+    assert PostingIndex(idx, "csv:a").seen("k") == ("2024-01-01", "2024-01-02")
+    assert len(PostingIndex(idx, "parquet:b")) == 0
+
+    def store(backend, **kw):
+        return open_storage(Settings(STORAGE_BACKEND=backend, POSTING_INDEX=idx, **{
+            "OUTPUT_CSV": str(tmp_path / "jobs.csv"), "PARQUET_ROOT": str(tmp_path / "jobs"), **kw}))
+    rows = [_row(1), _row(2)]
+    assert len(store("csv").write(rows)) == 2
+    assert len(store("csv").write(rows)) == 0
+    # Same postings, new output: nothing there yet, so nothing is skipped
+    assert len(store("csv", OUTPUT_CSV=str(tmp_path / "other.csv")).write(rows)) == 2
+    assert len(_csv_rows(tmp_path / "other.csv")) == 2
+    pytest.importorskip("pyarrow")
+    assert len(store("parquet").write(rows)) == 2
+
+def test_sqlite_upserts_and_indexed_queries(tmp_path):
+    from src.storage import SQLiteStorage
+    store = SQLiteStorage(str(tmp_path / "jobs.sqlite"))
+    assert len(store.write([_row(1, fetched_at="2024-01-01"), _row(2, fetched_at="2024-01-02")])) == 2
+    assert store.write([_row(1, fetched_at="2024-01-03")]) == []
+    written = store.write([_row(2, skills=["sql"], fetched_at="2024-01-04")])
+    assert [(r["title"], r["fetched_at"]) for r in written] == [("Engineer 2", "2024-01-04")]
+    assert len(store) == 2
+
+    cols, rows = store.query(skills=["sql"])
+    assert [dict(zip(cols, r))["title"] for r in rows] == ["Engineer 2"]
+    cols, rows = store.query(skills=["python"])
+    assert [dict(zip(cols, r))["title"] for r in rows] == ["Engineer 1"]
+    _, rows = store.query(start="2024-01-02", end="2024-01-05")
+    assert len(rows) == 1
+    assert store.distinct("skill") == ["python", "sql"]
+    assert store.bounds() == ("2024-01-01", "2024-01-04")
+
+def test_migrate_csv_collapses_repeats(tmp_path):
+    from src.storage import SQLiteStorage, append_rows, migrate_csv
+    csv_path = str(tmp_path / "jobs.csv")
+    append_rows(csv_path, [_row(1, source_id=None), _row(2, source_id=None)])
+    append_rows(csv_path, [_row(1, source_id=None)])
+    store = SQLiteStorage(":memory:")
+    assert migrate_csv(csv_path, store, batch_size=2) == 2
+    assert len(store) == 2
+    assert store.distinct("company") == ["acme"]
+
+def test_parquet_partitions_and_compaction(tmp_path):
+    pytest.importorskip("pyarrow")
+    from src.storage import ParquetStorage, compact_parquet, parquet_partitions, read_parquet
+    root = str(tmp_path / "jobs")
+    store = ParquetStorage(root)
+    store.write([_row(1, fetched_at="2024-01-01T10:00:00+00:00"),
+                 _row(2, fetched_at="2024-01-02T10:00:00+00:00")])
+    store.write([_row(3, fetched_at="2024-01-02T12:00:00Z", skills=["sql", "dbt"])])
+    assert [d for d, _ in parquet_partitions(root)] == ["2024-01-01", "2024-01-02"]
+
+    table = read_parquet(root, start="2024-01-02", columns=["title", "skills", "fetched_at"])
+    assert table.column_names == ["title", "skills", "fetched_at"]
+    assert sorted(table.column("title").to_pylist()) == ["Engineer 2", "Engineer 3"]
+    assert str(table.schema.field("fetched_at").type) == "timestamp[us, tz=UTC]"
+
+    assert compact_parquet(root) == 1
+    assert read_parquet(root).num_rows == 3
+
+def test_interrupted_compaction_never_doubles_rows(tmp_path):
+    import json, os
+    pytest.importorskip("pyarrow")
+    from src.storage import SUPERSEDED, ParquetStorage, compact_parquet, parquet_partitions, read_parquet
+    root = str(tmp_path / "jobs")
+    store = ParquetStorage(root)
+    for i in range(3):
+        store.write([_row(i, fetched_at="2024-01-01T10:00:00+00:00")])
+    (_, part_dir), = parquet_partitions(root)
+    old = sorted(os.listdir(part_dir))
+
+    # Crash after the compacted part was moved in, before the old parts were deleted
+    real_remove = os.remove
+    def crash(path):
+        if path.endswith(".parquet"):
+            raise KeyboardInterrupt
+        real_remove(path)
+    os.remove = crash
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            compact_parquet(root)
+    finally:
+        os.remove = real_remove
+    assert set(old) < set(os.listdir(part_dir))
+    assert read_parquet(root).num_rows == 3  # the old parts are already ignored
+    ParquetStorage(root)  # opening cleans up
+    assert len([f for f in os.listdir(part_dir) if f.endswith(".parquet")]) == 1
+    assert SUPERSEDED not in os.listdir(part_dir)
+
+    # Crash before the new part was moved in: the marker is dropped, the old parts stay
+    with open(os.path.join(part_dir, SUPERSEDED), "w") as f:
+        json.dump({"by": "part-never-written.parquet", "parts": os.listdir(part_dir)}, f)
+    assert read_parquet(root).num_rows == 3
+    ParquetStorage(root)
+    assert read_parquet(root).num_rows == 3 and SUPERSEDED not in os.listdir(part_dir)
+
+def test_failed_parquet_part_leaves_rows_unseen(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.storage import ParquetStorage, read_parquet
+    index = PostingIndex(str(tmp_path / "index.sqlite"))
+    store = ParquetStorage(str(tmp_path / "jobs"), index)
+    real_write = pq.write_table
+
+    def torn(table, where):
+        with open(where, "wb") as f:
+            f.write(b"PAR1")  # half a file, then the crash
+        raise OSError("No space left on device")
+    monkeypatch.setattr(pq, "write_table", torn)
+    with pytest.raises(OSError):
+        store.write([_row(1, fetched_at="2024-01-01T10:00:00+00:00")])
+    assert len(index) == 0
+    monkeypatch.setattr(pq, "write_table", real_write)
+    assert len(store.write([_row(1, fetched_at="2024-01-01T10:00:00+00:00")])) == 1
+    assert read_parquet(str(tmp_path / "jobs")).num_rows == 1  # the torn file is never read